@@ -17,6 +17,11 @@ from datetime import datetime
 from WebScraper.webscraper_without_ai import get_url_details_without_ai
 from Common_Utils.common_utils import *
 from Common_Utils.common_utils import set_global_message
+from Common_Utils.background_jobs import (
+    get_job_queue, JOB_QUEUED, JOB_PARSING, JOB_EMBEDDING, JOB_EXTRACTING, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+)
+from Common_Utils.pain_points_extractor import run_pain_points_job
+from Common_Utils.upload_persistence import persist_uploaded_file
 
 
 def normalize_url(url: str) -> str:
@@ -35,8 +40,12 @@ def normalize_url(url: str) -> str:
 
     return url
 
-def save_uploaded_file_and_get_path(uploaded_file, logger, client_enterprise_name):
-    """Save uploaded file to a temporary directory and return the file path"""
+def save_uploaded_file_with_hash(uploaded_file, logger, client_enterprise_name):
+    """Stream the uploaded file to the enterprise upload directory.
+
+    Returns (file_path, sha256, size_bytes); the hash is computed while
+    writing and reused by ingestion instead of re-reading the file.
+    """
     logger.info(f"Starting file upload process for file: {uploaded_file.name if uploaded_file else 'None'}")
     
     try:
@@ -61,28 +70,23 @@ def save_uploaded_file_and_get_path(uploaded_file, logger, client_enterprise_nam
                     logger.error(f"Failed to create directory {enterprise_upload_dir}: {str(e)}")
                     raise
             
-            # Full file path
-            file_path = os.path.join(enterprise_upload_dir, uploaded_file.name)
-            logger.debug(f"Full file path: {file_path}")
-            
             # Save the file
             try:
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                logger.info(f"Successfully saved file to: {file_path}")
-                return file_path
+                file_path, file_hash, file_size = persist_uploaded_file(uploaded_file, enterprise_upload_dir)
+                logger.info(f"Successfully saved file to: {file_path} ({file_size} bytes, sha256 {file_hash[:12]})")
+                return file_path, file_hash, file_size
             except IOError as e:
     
-                logger.error(f"Failed to save file {file_path}: {str(e)}")
+                logger.error(f"Failed to save file {uploaded_file.name}: {str(e)}")
                 raise
                 
         else:
             logger.warning("No file provided for upload")
-            return None
+            return None, None, None
             
     except Exception as e:
         set_global_message(str(e))
-        logger.error(f"Unexpected error in save_uploaded_file_and_get_path: {str(e)}")
+        logger.error(f"Unexpected error in save_uploaded_file_with_hash: {str(e)}")
         raise
 
 def validate_client_mandatory_fields():
@@ -704,6 +708,7 @@ def doc_upload_section(logger, client_data, is_locked):
                             key="analyze_rfi_document_btn",
                             help="Process RFI document",
                             type="secondary",
+                            disabled=bool(client_state_manager.get_client_data().rfi_job_id),
                             use_container_width=True
                         )
                         
@@ -720,67 +725,27 @@ def doc_upload_section(logger, client_data, is_locked):
                             set_global_message("Client name required - Please enter your client's enterprise name to continue", 'error')
                         else:
                             logger.info("Starting RFI analysis process")
-                            
-                            # Create a placeholder for the spinner
-                            spinner_placeholder = st.empty()
-                            
-                            # Show spinner while processing
-                            with spinner_placeholder:
-                                with st.spinner("🔍 Analyzing document and extracting pain points..."):
-                                    
-                                    # Perform the actual processing
-                                    try:
-                                        logger.info("Starting RFI document processing")
-                                        file_path = save_uploaded_file_and_get_path(rfi_document_upload, logger, client_enterprise_name)
-                                        
-                                        if file_path and client_enterprise_name:
-                                            logger.info(f"Processing RFI file: {file_path}")
-                                            pain_points_data = get_pain_points(file_path, client_enterprise_name)
-                                            
-                                            # Clear the spinner
-                                            spinner_placeholder.empty()
-                                            
-                                            # Check if we got pain points data
-                                            if pain_points_data and len(pain_points_data) > 0:
-                                                logger.info(f"Successfully extracted pain points, count: {len(pain_points_data)}")
-                                                
-                                                client_state_manager.update_client_data(
-                                                    uploaded_file_path=file_path,
-                                                    rfi_pain_points_items=pain_points_data,
-                                                    document_analyzed=True,
-                                                    processing_rfi=False
-                                                )
-                                                
-                                                # Success message with count
-                                                pain_points_count = len(pain_points_data)
-                                                set_global_message(f" AI has successfully suggested {pain_points_count} pain point categories from your document!", "success")
-                            
-
-                                            else:
-                                                logger.warning("No pain points extracted from document")
-                                                client_state_manager.update_client_data(
-                                                    uploaded_file_path=file_path,
-                                                    rfi_pain_points_items={},
-                                                    document_analyzed=False,
-                                                    processing_rfi=False
-                                                )
-                                                set_global_message("⚠️ No pain points could be extracted from this document. Please try a different file or use the default suggestions.", 'warning')
-                                        else:
-                                            # Clear the spinner
-                                            spinner_placeholder.empty()
-                                            logger.error("Error saving the uploaded file or missing client name")
-                                            set_global_message("Uploaded  document does not have pain points.  Please upload the correct document OR select from the default pain points displayed", 'error')
-                                            
-                                    except Exception as e:
-                                        # Clear the spinner
-                                        spinner_placeholder.empty()
-                                        logger.error(f"Error analyzing RFI document: {str(e)}")
-                                        set_global_message(" There was an issue analyzing your document. Please try uploading again or use the default suggestions.", 'error')
-                                        client_state_manager.update_client_data(
-                                            rfi_pain_points_items={},
-                                            document_analyzed=False,
-                                            processing_rfi=False
-                                        )
+                            file_path, file_hash, _ = save_uploaded_file_with_hash(rfi_document_upload, logger, client_enterprise_name)
+
+                            if file_path:
+                                # Ingestion runs on the shared worker pool; the status fragment below polls it
+                                job = get_job_queue().submit(
+                                    run_pain_points_job,
+                                    file_path,
+                                    client_enterprise_name,
+                                    file_hash=file_hash,
+                                    name=f"RFI {rfi_document_upload.name}",
+                                    key=f"rfi:{client_enterprise_name}:{file_path}"
+                                )
+                                logger.info(f"Queued RFI job {job.job_id} for {file_path}")
+                                client_state_manager.update_client_data(
+                                    uploaded_file_path=file_path,
+                                    processing_rfi=True,
+                                    rfi_job_id=job.job_id
+                                )
+                            else:
+                                logger.error("Error saving the uploaded file or missing client name")
+                                set_global_message("Uploaded  document does not have pain points.  Please upload the correct document OR select from the default pain points displayed", 'error')
                                         
                     except Exception as e:
                         logger.error(f"Error handling analyze button click: {str(e)}")
@@ -789,11 +754,95 @@ def doc_upload_section(logger, client_data, is_locked):
             except Exception as e:
                 logger.error(f"Error in file info section: {str(e)}")
                 set_global_message("File information display issue - Please refresh the page to restore functionality", 'error')
-                
+
     except Exception as e:
         logger.error(f"Error in file upload section: {str(e)}")
         set_global_message("File upload section temporarily unavailable - Please refresh the page to continue", 'error')
 
+    # Outside the try: the job status may call st.rerun()
+    if client_state_manager.get_client_data().rfi_job_id:
+        render_rfi_job_status(logger)
+
+
+RFI_JOB_STAGES = {
+    JOB_QUEUED: (0.0, "⏳ Waiting for a free worker..."),
+    JOB_PARSING: (0.05, "📄 Reading document..."),
+    JOB_EMBEDDING: (0.7, "🧮 Indexing document..."),
+    JOB_EXTRACTING: (0.85, "🔍 Extracting pain points..."),
+}
+
+@st.fragment(run_every=1)
+def render_rfi_job_status(logger):
+    """Poll the background RFI job and apply its pain points once it finishes"""
+    # st.rerun() raises Streamlit's rerun exception, so it must not run inside poll_rfi_job's try
+    if poll_rfi_job(logger):
+        st.rerun()
+
+def poll_rfi_job(logger) -> bool:
+    """Show the RFI job's progress, or apply its result; True when the page must be redrawn"""
+    try:
+        client_data = client_state_manager.get_client_data()
+        job_id = client_data.rfi_job_id
+        if not job_id:
+            return False
+
+        job = get_job_queue().get(job_id)
+        if job is None:
+            # Expired or lost with a server restart
+            logger.warning(f"RFI job {job_id} no longer exists")
+            client_state_manager.update_client_data(rfi_job_id=None, processing_rfi=False)
+            return True
+
+        if not job.is_finished:
+            base_progress, text = RFI_JOB_STAGES.get(job.state, (0.0, "🔍 Analyzing document..."))
+            progress = base_progress
+            if job.state == JOB_PARSING and job.total > 1:
+                # Scanned pages dominate parsing time, so spread them over the parsing share
+                progress = base_progress + job.progress * (RFI_JOB_STAGES[JOB_EMBEDDING][0] - base_progress)
+                text = f"📄 Reading page {job.done} of {job.total}..."
+
+            col_progress, col_cancel = st.columns([2.5, 1])
+            with col_progress:
+                st.progress(progress, text=text)
+            with col_cancel:
+                if st.button("Cancel", key="cancel_rfi_job_btn", type="secondary", use_container_width=True):
+                    get_job_queue().cancel(job_id)
+                    logger.info(f"Cancellation requested for RFI job {job_id}")
+            return False
+
+        pain_points_data = job.result if job.state == JOB_DONE else None
+        if pain_points_data and len(pain_points_data) > 0:
+            logger.info(f"Successfully extracted pain points, count: {len(pain_points_data)}")
+            client_state_manager.update_client_data(
+                rfi_pain_points_items=pain_points_data,
+                document_analyzed=True,
+                processing_rfi=False,
+                rfi_job_id=None
+            )
+            set_global_message(f" AI has successfully suggested {len(pain_points_data)} pain point categories from your document!", "success")
+        else:
+            client_state_manager.update_client_data(
+                rfi_pain_points_items={},
+                document_analyzed=False,
+                processing_rfi=False,
+                rfi_job_id=None
+            )
+            if job.state == JOB_CANCELLED:
+                logger.info(f"RFI job {job_id} cancelled")
+                set_global_message("Document analysis cancelled.", 'warning')
+            elif job.state == JOB_FAILED:
+                logger.error(f"Error analyzing RFI document: {job.error}")
+                set_global_message(" There was an issue analyzing your document. Please try uploading again or use the default suggestions.", 'error')
+            else:
+                logger.warning("No pain points extracted from document")
+                set_global_message("⚠️ No pain points could be extracted from this document. Please try a different file or use the default suggestions.", 'warning')
+
+        # Redraw the pain points section with the new results
+        return True
+
+    except Exception as e:
+        logger.error(f"Error polling RFI job: {str(e)}")
+        return False
 
 @st.fragment
 def render_second_section(logger, client_data, is_locked):
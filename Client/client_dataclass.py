@@ -53,6 +53,7 @@ class ClientTabState:
     # Processing states
     show_validation: bool = False
     processing_rfi: bool = False
+    rfi_job_id: Optional[str] = None
     scraping_in_progress: bool = False
     pending_scrape_url: Optional[str] = None
     url_search_in_progress: bool = False
@@ -0,0 +1,206 @@
+import os
+import time
+import uuid
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+# Finished jobs are kept this long so a rerun can still pick up their result
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+
+JOB_QUEUED = "queued"
+JOB_PARSING = "parsing"
+JOB_EMBEDDING = "embedding"
+JOB_EXTRACTING = "extracting"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+# Lower runs first; queued jobs of equal priority run in submission order
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+# Progress stages reported by the ingestion pipeline, mapped to job states
+STAGE_STATES = {
+    'parsing': JOB_PARSING,
+    'summarizing': JOB_PARSING,
+    'embedding': JOB_EMBEDDING,
+    'extracting': JOB_EXTRACTING,
+}
+
+
+class JobCancelled(BaseException):
+    """Raised inside a job once it has been cancelled.
+
+    Derives from BaseException (like asyncio.CancelledError) so the broad
+    `except Exception` fallbacks of the ingestion pipeline let it through.
+    """
+
+
+@dataclass
+class Job:
+    """A unit of background work and its observable progress"""
+
+    job_id: str
+    name: str = ""
+    state: str = JOB_QUEUED
+    done: int = 0
+    total: int = 0
+    result: Any = None
+    # Part of the result a job publishes while it is still running, e.g. streamed suggestions
+    partial: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    _cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def progress(self) -> float:
+        return min(self.done / self.total, 1.0) if self.total else 0.0
+
+    @property
+    def is_finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self.state == JOB_QUEUED:
+            self._finish(JOB_CANCELLED)
+
+    def check_cancelled(self):
+        if self.is_cancelled:
+            raise JobCancelled(self.job_id)
+
+    def report_progress(self, stage: str, done: int, total: int):
+        """progress_callback(stage, done, total) for the ingestion pipeline; also a cancellation point"""
+        self.check_cancelled()
+        self.state = STAGE_STATES.get(stage, self.state)
+        self.done, self.total = done, total
+
+    def _finish(self, state: str, result: Any = None, error: str = None):
+        self.result, self.error = result, error
+        self.finished_at = time.time()
+        self.state = state
+
+
+class JobQueue:
+    """Thread pool running jobs off the Streamlit script thread.
+
+    Jobs never touch Streamlit; the UI polls get() and renders job.state and
+    job.progress. Submitting with a key returns the running job for that key
+    instead of starting a duplicate. Queued jobs are started by priority, so
+    speculative work submitted with PRIORITY_LOW never delays a job a user is
+    waiting for; reprioritize() promotes it once the user does wait for it.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}_job")
+        self._jobs: Dict[str, Job] = {}
+        self._keys: Dict[str, str] = {}
+        self._pending = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, name: str = "", key: str = None,
+               priority: int = PRIORITY_NORMAL, **kwargs) -> Job:
+        """Run fn(job, *args, **kwargs) in the background and return its Job"""
+        with self._lock:
+            self._prune()
+            if key and key in self._keys:
+                existing = self._jobs.get(self._keys[key])
+                if existing and not existing.is_finished:
+                    self._raise_priority(existing.job_id, priority)
+                    return existing
+
+            job = Job(job_id=uuid.uuid4().hex, name=name)
+            self._jobs[job.job_id] = job
+            if key:
+                self._keys[key] = job.job_id
+            heapq.heappush(self._pending, (priority, next(self._sequence), job.job_id, fn, args, kwargs))
+        # Each worker call starts whichever queued job has the highest priority at that moment
+        self._executor.submit(self._run_next)
+        return job
+
+    def reprioritize(self, job_id: str, priority: int) -> bool:
+        """Move a queued job up to priority; True if it was still queued"""
+        with self._lock:
+            return self._raise_priority(job_id, priority)
+
+    def _raise_priority(self, job_id: str, priority: int) -> bool:
+        for i, entry in enumerate(self._pending):
+            if entry[2] == job_id:
+                if priority < entry[0]:
+                    self._pending[i] = (priority,) + entry[1:]
+                    heapq.heapify(self._pending)
+                return True
+        return False
+
+    def _run_next(self):
+        with self._lock:
+            if not self._pending:
+                return
+            _, _, job_id, fn, args, kwargs = heapq.heappop(self._pending)
+            job = self._jobs.get(job_id)
+        if job is not None:
+            self._run(job, fn, args, kwargs)
+
+    def _run(self, job: Job, fn: Callable, args, kwargs):
+        if job.is_cancelled:
+            job._finish(JOB_CANCELLED)
+            return
+        try:
+            job.state = JOB_PARSING
+            result = fn(job, *args, **kwargs)
+            job.check_cancelled()
+            job._finish(JOB_DONE, result=result)
+        except JobCancelled:
+            print(f"Job {job.name or job.job_id} cancelled")
+            job._finish(JOB_CANCELLED)
+        except Exception as e:
+            print(f"Error in job {job.name or job.job_id}: {e}")
+            job._finish(JOB_FAILED, error=str(e))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job.is_finished:
+            return False
+        job.cancel()
+        return True
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self._keys = {key: job_id for key, job_id in self._keys.items() if job_id in self._jobs}
+
+
+_job_queues = {}
+_job_queues_lock = threading.Lock()
+
+
+def get_job_queue(name: str = "ingestion", max_workers: int = None) -> JobQueue:
+    """Process-wide job queue, shared by every session and surviving reruns"""
+    with _job_queues_lock:
+        if name not in _job_queues:
+            _job_queues[name] = JobQueue(name, max_workers or INGESTION_WORKERS)
+        return _job_queues[name]
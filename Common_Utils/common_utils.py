@@ -10,6 +10,7 @@ from datetime import datetime
 from Search.WebsiteUrl_Agent.agent_runner import get_urls
 import asyncio 
 from Common_Utils.pain_points_extractor import *
+from Common_Utils.upload_persistence import persist_uploaded_file
 
 def check_field_validation(field_name: str, field_value: str, is_mandatory: bool = False) -> bool:
     """Check if field validation should show warning"""
@@ -90,18 +91,8 @@ def save_uploaded_file_and_get_path(uploaded_file, logger, client_enterprise_nam
 def save_uploaded_file_and_get_path(uploaded_file):
     """Save uploaded file to a temporary directory and return the file path"""
     if uploaded_file is not None:
-        # Create uploads directory if it doesn't exist
-        upload_dir = "uploads"
-        if not os.path.exists(upload_dir):
-            os.makedirs(upload_dir)
-        
-        # Create file path
-        file_path = os.path.join(upload_dir, uploaded_file.name)
-        
-        # Save the file
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
+        # Streamed to disk in blocks rather than copied in one buffer
+        file_path, _, _ = persist_uploaded_file(uploaded_file, "uploads")
         return file_path
     return None
 
@@ -225,18 +216,8 @@ def save_uploaded_file(uploaded_file, save_dir="uploaded_rf_is"):
 def save_uploaded_file_and_get_path(uploaded_file):
     """Save uploaded file to a temporary directory and return the file path"""
     if uploaded_file is not None:
-        # Create uploads directory if it doesn't exist
-        upload_dir = "uploads"
-        if not os.path.exists(upload_dir):
-            os.makedirs(upload_dir)
-        
-        # Create file path
-        file_path = os.path.join(upload_dir, uploaded_file.name)
-        
-        # Save the file
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
+        # Streamed to disk in blocks rather than copied in one buffer
+        file_path, _, _ = persist_uploaded_file(uploaded_file, "uploads")
         return file_path
     return None
 
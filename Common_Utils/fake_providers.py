@@ -0,0 +1,393 @@
+"""Offline stand-ins for the chat model, URL search, LinkedIn search and embeddings.
+
+Set LLM_PROVIDER=fake, SEARCH_PROVIDER=fake and/or EMBEDDING_PROVIDER=fake to
+run the app end to end (or load test it) without API keys or network calls.
+Responses are canned templates in the shape each prompt asks for (pain point
+dict, priority list, spec dicts, section list, proposal JSON, URL list,
+LinkedIn profiles), so every parser downstream sees valid output.
+
+Every call sleeps for a log-normal latency (FAKE_LATENCY_MEDIAN_MS,
+FAKE_LATENCY_SIGMA) and fails with a retryable 429 error at FAKE_ERROR_RATE.
+Content, latency and failures are drawn from a generator seeded with
+FAKE_SEED, the request and how many times it has been made, so a run is
+reproducible. Point CHROMA_PATH / CACHE_DB_PATH at a scratch directory when
+using fake embeddings or responses, so they do not mix with real data.
+"""
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from collections import Counter
+from typing import Any, List, Optional
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from dotenv import load_dotenv
+load_dotenv()
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "google").lower()
+SEARCH_PROVIDER = os.getenv("SEARCH_PROVIDER", "serpapi").lower()
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "huggingface").lower()
+
+FAKE_SEED = os.getenv("FAKE_SEED", "0")
+FAKE_LATENCY_MEDIAN_MS = float(os.getenv("FAKE_LATENCY_MEDIAN_MS", "800"))
+FAKE_LATENCY_SIGMA = float(os.getenv("FAKE_LATENCY_SIGMA", "0.5"))
+FAKE_SEARCH_LATENCY_MEDIAN_MS = float(os.getenv("FAKE_SEARCH_LATENCY_MEDIAN_MS", "1500"))
+FAKE_ERROR_RATE = float(os.getenv("FAKE_ERROR_RATE", "0"))
+FAKE_STREAM_CHUNK_WORDS = int(os.getenv("FAKE_STREAM_CHUNK_WORDS", "8"))
+FAKE_EMBEDDING_SIZE = int(os.getenv("FAKE_EMBEDDING_SIZE", "768"))
+
+
+class FakeProviderError(RuntimeError):
+    """Injected failure; the message matches the gateway's retryable markers"""
+
+
+_call_counts = Counter()
+_call_counts_lock = threading.Lock()
+
+
+def get_rng(kind: str, request: str) -> random.Random:
+    """Generator for one call: same seed, request and repeat count give the same draws"""
+    digest = hashlib.sha256(f"{kind}:{request}".encode('utf-8')).hexdigest()
+    with _call_counts_lock:
+        attempt = _call_counts[digest]
+        _call_counts[digest] += 1
+    return random.Random(f"{FAKE_SEED}:{digest}:{attempt}")
+
+
+def get_content_rng(kind: str, request: str) -> random.Random:
+    """Generator for response content only, so retries of a request return the same text"""
+    return random.Random(f"{FAKE_SEED}:{kind}:{request}")
+
+
+def sample_latency(rng: random.Random, median_ms: float = FAKE_LATENCY_MEDIAN_MS) -> float:
+    """Seconds to wait, log-normal around median_ms"""
+    if median_ms <= 0:
+        return 0.0
+    return rng.lognormvariate(0, FAKE_LATENCY_SIGMA) * median_ms / 1000.0
+
+
+def maybe_fail(rng: random.Random, what: str):
+    if FAKE_ERROR_RATE > 0 and rng.random() < FAKE_ERROR_RATE:
+        raise FakeProviderError(f"429 Resource exhausted (fake {what})")
+
+
+PAIN_POINTS = {
+    "Legacy System Constraints": "Ageing core platforms slow down releases and make integrations costly to maintain.",
+    "Data Fragmentation": "Customer and operational data sits in silos, blocking a single view for reporting and decisions.",
+    "Cost Pressure": "Leadership expects measurable reductions in run costs while keeping service levels unchanged.",
+    "Security and Compliance": "Growing regulatory scrutiny requires stronger access controls, auditability and data residency.",
+    "Scalability": "Peak season volumes exceed current capacity, causing outages and manual workarounds.",
+    "Customer Experience": "Inconsistent digital journeys lead to drop-offs and rising support volumes.",
+    "Vendor Dependency": "Reliance on several small vendors creates delivery risk and unclear accountability.",
+    "Talent Gaps": "Internal teams lack cloud and data engineering skills needed for the transformation."
+}
+
+PRIORITIES = [
+    {"title": "Strategic Growth and Vision", "icon": "📈"},
+    {"title": "Operational Efficiency", "icon": "⚙️"},
+    {"title": "Customer Experience", "icon": "💡"},
+    {"title": "Cost Optimization", "icon": "💰"},
+    {"title": "Risk and Compliance", "icon": "🛡️"},
+    {"title": "Digital Transformation", "icon": "🚀"},
+    {"title": "Talent and Culture", "icon": "👥"}
+]
+
+SPEC_SECTIONS = {
+    'scope': {
+        "Project Planning": ["Define project objectives and success criteria", "Create detailed work breakdown structure", "Establish milestones and deliverables"],
+        "Requirements Analysis": ["Conduct stakeholder interviews and workshops", "Document functional and non-functional requirements", "Create user stories and acceptance criteria"],
+        "Solution Design": ["Develop system architecture and technical specifications", "Create wireframes and interface mockups", "Design data model and integration points"]
+    },
+    'timeline': {
+        "Phase 1 - Discovery (2-3 weeks)": ["Stakeholder interviews and requirement gathering", "Current state analysis and gap assessment", "Technical feasibility study"],
+        "Phase 2 - Design (3-4 weeks)": ["System architecture and technical design", "User experience and interface design", "Development environment setup"],
+        "Phase 3 - Development (8-12 weeks)": ["Core functionality development", "Integration with existing systems", "Unit testing and code reviews"]
+    },
+    'team': {
+        "Core Team (4-6 members)": ["Project Manager and Scrum Master", "Senior Business Analyst", "Lead Developer and Frontend Developer"],
+        "Extended Team (2-3 members)": ["UI/UX Designer", "Database Administrator", "Security Specialist"],
+        "Support Team (1-2 members)": ["Technical Writer", "Change Management Specialist", "Subject Matter Experts as needed"]
+    },
+    'pricing': {
+        "Fixed Price Model": ["Total project cost: ₹12,00,000 - ₹16,00,000", "30% upfront, 40% on milestone delivery, 30% on completion", "Includes 3 months of post-launch support"],
+        "Time & Materials": ["Senior resources: ₹4,000–₹5,000/hour", "Mid-level resources: ₹2,500–₹3,500/hour", "Junior resources: ₹1,200–₹2,000/hour"],
+        "Hybrid Approach": ["Fixed price for core features: ₹10,00,000", "T&M billing for enhancements", "Monthly support retainer: ₹65,000/month"]
+    },
+    'effort': {
+        "Business Analysis (120-160 hours)": ["Requirements gathering and documentation", "Process mapping and workflow analysis", "Stakeholder communication"],
+        "Technical Development (400-600 hours)": ["Frontend and backend development", "Database design and implementation", "API development and integration"],
+        "Testing & QA (80-120 hours)": ["Test planning and test case creation", "Manual and automated testing", "Bug fixing and regression testing"]
+    }
+}
+
+DEFAULT_SECTIONS = [
+    "Executive Summary", "Understanding of Requirements", "Proposed Solution",
+    "Scope of Work", "Timeline and Milestones", "Team Structure", "Pricing", "Why Choose Us"
+]
+
+SENTENCES = [
+    "Our approach aligns delivery with the client's strategic goals and measurable business outcomes.",
+    "Each phase ends with a review, so stakeholders keep full visibility of progress and risks.",
+    "We combine proven accelerators with a dedicated team to shorten time to value.",
+    "Governance, security and compliance are built into the plan from the first week.",
+    "The solution is designed to scale with future growth without disruptive rework.",
+    "Success is tracked against agreed KPIs and reported in regular steering meetings.",
+    "Knowledge transfer and documentation ensure the client's teams can run the platform independently."
+]
+
+ROLES = [
+    "Chief Executive Officer", "Chief Technology Officer", "Chief Information Officer",
+    "VP Engineering", "Head of Digital Transformation", "Chief Financial Officer", "Director of Operations"
+]
+
+
+def _paragraphs(rng: random.Random, count: int) -> str:
+    return "\n\n".join(" ".join(rng.sample(SENTENCES, 3)) for _ in range(count))
+
+
+def _bullets(items) -> str:
+    return "\n• ".join(items)
+
+
+def _pain_points(rng: random.Random, prompt: str) -> dict:
+    match = re.search(r"\*\*(\d+) most important business pain points", prompt)
+    count = min(int(match.group(1)), len(PAIN_POINTS)) if match else 3
+    return dict(rng.sample(sorted(PAIN_POINTS.items()), count))
+
+
+def _spec_section(rng: random.Random, kind: str) -> dict:
+    return {
+        title: f"**{title}** • {_bullets(rng.sample(items, len(items)))}\n\n"
+        for title, items in SPEC_SECTIONS[kind].items()
+    }
+
+
+def _proposal_sections(prompt: str) -> List[str]:
+    """Section titles from the ```python block under "Required Sections" in the proposal prompt"""
+    match = re.search(r"Required Sections.*?```python\s*(.*?)```", prompt, re.S)
+    if not match:
+        return ["title of the sales proposal"] + DEFAULT_SECTIONS
+    sections = [line.strip().lstrip('-').strip() for line in match.group(1).splitlines()]
+    sections = [section for section in sections if section]
+    if not sections or sections[0].lower() != "title of the sales proposal":
+        sections = ["title of the sales proposal"] + [s for s in sections if s.lower() != "title of the sales proposal"]
+    return sections
+
+
+def _section_text(rng: random.Random, title: str) -> str:
+    if "scope" in title.lower():
+        return "\n\n".join(
+            f"**{phase}**\n- " + "\n- ".join(items)
+            for phase, items in SPEC_SECTIONS['timeline'].items()
+        )
+    return _paragraphs(rng, rng.randint(2, 4))
+
+
+def _proposal(rng: random.Random, prompt: str) -> list:
+    proposal = []
+    for title in _proposal_sections(prompt):
+        if title.lower() == "title of the sales proposal":
+            text = rng.choice(["A Unified Data Platform", "Accelerating Digital Transformation", "Modernizing Core Operations"])
+        else:
+            text = _section_text(rng, title)
+        proposal.append({"title": title, "text": text})
+    return proposal
+
+
+def _image_summary(rng: random.Random) -> str:
+    return (
+        "## Header\n- Document page (offline placeholder summary)\n\n"
+        "## Text Body\n- " + "\n- ".join(rng.sample(SENTENCES, 4)) + "\n\n"
+        "## Footnotes\n- None"
+    )
+
+
+def _additional_requirements(rng: random.Random) -> str:
+    return (
+        "---\n### ✅ Refined Client Requirements\n" + _paragraphs(rng, 1) + "\n\n---\n\n"
+        "### 💡 Innovative Suggestions\n- " + "\n- ".join(rng.sample(SENTENCES, 2)) + "\n\n---\n\n"
+        "### 📌 Best Practice Recommendations\n- Milestone-based payment terms tied to acceptance criteria\n"
+        "- A fixed budget contingency of 10-15% for change requests\n\n---"
+    )
+
+
+def get_prompt_kind(prompt: str, has_image: bool = False) -> str:
+    """Which app prompt a rendered request came from, matched on fixed phrases of each template"""
+    if has_image or "summarizes every possible piece of visual information" in prompt:
+        return 'image'
+    if "business pain points" in prompt:
+        return 'pain_points'
+    if "top 3 current business priorities" in prompt:
+        return 'priorities'
+    if "Refined Client Requirements" in prompt:
+        return 'additional_requirements'
+    for kind in ('timeline', 'team', 'pricing', 'effort'):
+        if f"`{kind}_data`" in prompt:
+            return kind
+    if '"Scope of the Project"' in prompt:
+        return 'scope'
+    if "list of high-level sections" in prompt:
+        return 'sections'
+    if "Write the title of the sales proposal" in prompt:
+        return 'proposal_title'
+    if "Write only the content of this one section" in prompt:
+        return 'proposal_section'
+    if "Sales Proposal Generator" in prompt:
+        return 'proposal'
+    return 'text'
+
+
+def render_response(prompt: str, has_image: bool = False) -> str:
+    """Canned response for a rendered prompt, in the format that prompt asks for"""
+    kind = get_prompt_kind(prompt, has_image)
+    rng = get_content_rng(kind, prompt)
+    if kind == 'image':
+        return _image_summary(rng)
+    if kind == 'pain_points':
+        return json.dumps(_pain_points(rng, prompt), indent=4, ensure_ascii=False)
+    if kind == 'priorities':
+        return json.dumps(rng.sample(PRIORITIES, 3), indent=4, ensure_ascii=False)
+    if kind == 'additional_requirements':
+        return _additional_requirements(rng)
+    if kind in SPEC_SECTIONS:
+        return json.dumps(_spec_section(rng, kind), indent=4, ensure_ascii=False)
+    if kind == 'sections':
+        return "\n".join(s for s in DEFAULT_SECTIONS if s == "Scope of Work" or rng.random() < 0.75)
+    if kind == 'proposal_title':
+        return rng.choice(["A Unified Data Platform", "Accelerating Digital Transformation", "Modernizing Core Operations"])
+    if kind == 'proposal_section':
+        match = re.search(r"Section to Write\s*\*\*(.*?)\*\*", prompt)
+        return _section_text(rng, match.group(1) if match else "")
+    if kind == 'proposal':
+        return "```json\n" + json.dumps(_proposal(rng, prompt), indent=2, ensure_ascii=False) + "\n```"
+    return _paragraphs(rng, 1)
+
+
+def _message_text(messages: List[BaseMessage]):
+    """(prompt text, has_image) of a message list"""
+    texts, has_image = [], False
+    for message in messages:
+        if isinstance(message.content, str):
+            texts.append(message.content)
+            continue
+        for part in message.content:
+            if isinstance(part, dict) and part.get('type') == 'image_url':
+                has_image = True
+            elif isinstance(part, dict):
+                texts.append(str(part.get('text', '')))
+            else:
+                texts.append(str(part))
+    return "\n".join(texts), has_image
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model returning canned, schema-valid responses after a simulated delay"""
+
+    model: str = "fake"
+    temperature: Optional[float] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _prepare(self, messages: List[BaseMessage]):
+        """(response text, latency) for a call, raising the injected error if drawn"""
+        prompt, has_image = _message_text(messages)
+        rng = get_rng(f"llm:{self.model}", prompt)
+        latency = sample_latency(rng)
+        maybe_fail(rng, self.model)
+        return render_response(prompt, has_image), latency
+
+    @staticmethod
+    def _chunks(text: str):
+        words = re.split(r'(?<=\s)', text)
+        step = max(1, FAKE_STREAM_CHUNK_WORDS)
+        return ["".join(words[i:i + step]) for i in range(0, len(words), step)]
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        text, latency = self._prepare(messages)
+        time.sleep(latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        text, latency = self._prepare(messages)
+        await asyncio.sleep(latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any):
+        text, latency = self._prepare(messages)
+        chunks = self._chunks(text)
+        # Half the latency before the first token, the rest spread over the stream
+        time.sleep(latency / 2)
+        for chunk in chunks:
+            if run_manager:
+                run_manager.on_llm_new_token(chunk)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+            time.sleep(latency / 2 / len(chunks))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any):
+        text, latency = self._prepare(messages)
+        chunks = self._chunks(text)
+        await asyncio.sleep(latency / 2)
+        for chunk in chunks:
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+            await asyncio.sleep(latency / 2 / len(chunks))
+
+
+def _slug(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '', name.lower()) or "example"
+
+
+def fake_url_list(company_name: str) -> List[str]:
+    slug = _slug(company_name)
+    pages = ["", "about", "services", "solutions", "careers", "investors", "newsroom", "contact"]
+    rng = get_content_rng('urls', slug)
+    return [f"https://www.{slug}.com/{page}" for page in pages[:1] + rng.sample(pages[1:], 6)]
+
+
+async def fake_get_urls(company_name: str) -> List[str]:
+    """Offline replacement for the URL search agent"""
+    rng = get_rng('urls', company_name)
+    latency = sample_latency(rng, FAKE_SEARCH_LATENCY_MEDIAN_MS)
+    maybe_fail(rng, 'url search')
+    await asyncio.sleep(latency)
+    return fake_url_list(company_name)
+
+
+def fake_search_linkedin(name: str) -> dict:
+    """Offline replacement for the SerpAPI LinkedIn search, same result shape"""
+    rng = get_rng('linkedin', name)
+    latency = sample_latency(rng, FAKE_SEARCH_LATENCY_MEDIAN_MS)
+    maybe_fail(rng, 'linkedin search')
+    time.sleep(latency)
+
+    content_rng = get_content_rng('linkedin', name)
+    slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or "profile"
+    results = {}
+    for role in content_rng.sample(ROLES, content_rng.randint(1, 5)):
+        link = f"https://www.linkedin.com/in/{slug}-{content_rng.randrange(16 ** 6):06x}"
+        results[link] = {
+            "name": name,
+            "role": f"{name} - {role}",
+            "top_3_priorities": [p["title"] for p in content_rng.sample(PRIORITIES, 3)]
+        }
+    return results
+
+
+def get_fake_embeddings() -> DeterministicFakeEmbedding:
+    """Embeddings derived from a hash of each text: identical texts get identical vectors"""
+    return DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
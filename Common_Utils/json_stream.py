@@ -0,0 +1,182 @@
+"""Tolerant JSON parsing for LLM output, in one piece or while it streams.
+
+Model responses wrap JSON in ``` fences, add a sentence before or after it,
+or answer with a Python literal. parse_llm_json handles a complete response;
+IncrementalJSONParser / iter_json_items yield each entry of the top-level
+dict or list as soon as it closes, so the UI can show results while the
+rest of the completion is still arriving (see the project spec jobs).
+"""
+import ast
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def strip_code_fences(result: str) -> str:
+    """Remove a leading ```json / ```python / ``` fence and a trailing ``` fence"""
+    result = result.strip()
+    if result.startswith('```python'):
+        result = result[len('```python'):].strip()
+    elif result.startswith('```json'):
+        result = result[len('```json'):].strip()
+    elif result.startswith('```'):
+        result = result[len('```'):].strip()
+    if result.endswith('```'):
+        result = result[:-3].strip()
+    return result
+
+
+def _loads(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return ast.literal_eval(text)
+
+
+class IncrementalJSONParser:
+    """Scan streamed text and return top-level items as they complete.
+
+    Text before the first { or [ is skipped and text after the matching
+    close is ignored. feed() returns (key, value) pairs for a top-level dict
+    and values for a top-level list. Single-quoted (Python literal) strings
+    are tolerated. An item that does not parse is logged and skipped, or
+    raises ValueError when strict=True. Once done, end is the offset just
+    past the closing bracket in all the text fed so far.
+    """
+
+    def __init__(self, strict: bool = False):
+        self.strict = strict
+        self.container = None
+        self.done = False
+        self.end = None
+        self._offset = 0
+        self._buffer = ""
+        self._pos = 0
+        self._item_start = 0
+        self._depth = 0
+        self._quote = None
+        self._escape = False
+
+    def feed(self, text: str) -> list:
+        items = []
+        self._buffer += text
+        while self._pos < len(self._buffer) and not self.done:
+            ch = self._buffer[self._pos]
+            if self.container is None:
+                if ch in '{[':
+                    self.container = ch
+                    self._depth = 1
+                    self._item_start = self._pos + 1
+            elif self._quote:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == self._quote:
+                    self._quote = None
+            elif ch in '"\'':
+                self._quote = ch
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(self._buffer[self._item_start:self._pos], items)
+                    self.done = True
+                    self.end = self._offset + self._pos + 1
+            elif ch == ',' and self._depth == 1:
+                self._emit(self._buffer[self._item_start:self._pos], items)
+                self._item_start = self._pos + 1
+            self._pos += 1
+
+        # Drop text that belongs to items already returned
+        if self.container is None:
+            self._offset += len(self._buffer)
+            self._buffer, self._pos = "", 0
+        elif self._item_start:
+            self._offset += self._item_start
+            self._buffer = self._buffer[self._item_start:]
+            self._pos -= self._item_start
+            self._item_start = 0
+        return items
+
+    def _emit(self, segment: str, items: list):
+        segment = segment.strip()
+        if not segment:
+            return
+        try:
+            if self.container == '[':
+                items.append(_loads(segment))
+            else:
+                items.extend(_loads('{' + segment + '}').items())
+        except (ValueError, SyntaxError) as e:
+            if self.strict:
+                raise ValueError(f"Unparseable item in model output: {segment[:80]!r}") from e
+            logger.warning(f"Skipping unparseable item in model output: {e}")
+
+
+def iter_json_items(chunks):
+    """Yield top-level items from an iterable of text or message chunks (e.g. chain.stream(...)).
+
+    The rest of the stream is still consumed after the value closes, so the
+    source finishes (and a cached model stream gets stored).
+    """
+    parser = IncrementalJSONParser()
+    for chunk in chunks:
+        if parser.done:
+            continue
+        text = chunk if isinstance(chunk, str) else getattr(chunk, 'content', str(chunk))
+        yield from parser.feed(text)
+
+
+def parse_llm_json(text: str):
+    """Parse a complete model response into a dict or list, tolerating fences and surrounding prose.
+
+    Every { or [ is tried as the start of the value and the longest value
+    that parses wins, so brackets in a preamble ("Note [1]: {...}") are not
+    mistaken for the answer. Raises ValueError when no complete value
+    parses, never returns a partial one.
+    """
+    cleaned = strip_code_fences(text)
+    try:
+        return json.loads(cleaned)
+    except ValueError:
+        pass
+
+    starts = [i for i, ch in enumerate(cleaned) if ch in '{[']
+    if not starts:
+        raise ValueError("No JSON found in model output")
+    decoder = json.JSONDecoder()
+    best, best_length, end = None, 0, 0
+    for start in starts:
+        # Values nested in one already parsed are shorter than it
+        if start < end:
+            continue
+        try:
+            value, end = decoder.raw_decode(cleaned, start)
+        except ValueError:
+            continue
+        if end - start > best_length:
+            best, best_length = value, end - start
+    if best_length:
+        return best
+
+    # Python literals (single quotes, True/None) parsed item by item; every item must parse
+    end = 0
+    for start in starts:
+        if start < end:
+            continue
+        parser = IncrementalJSONParser(strict=True)
+        try:
+            items = parser.feed(cleaned[start:])
+        except ValueError:
+            continue
+        if not parser.done:
+            continue
+        end = start + parser.end
+        if end - start > best_length:
+            best, best_length = (dict(items) if parser.container == '{' else items), end - start
+    if best_length:
+        return best
+    raise ValueError("No complete JSON value found in model output")
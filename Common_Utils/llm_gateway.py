@@ -0,0 +1,411 @@
+"""Single entry point for chat model calls.
+
+get_llm(model) returns a GatewayModel, a Runnable that composes like the
+ChatGoogleGenerativeAI it wraps (`prompt | get_llm(...) | parser`) but:
+
+- reuses one client per (model, temperature) across the process,
+- waits on per-model token buckets for requests (LLM_RPM) and estimated
+  tokens (LLM_TPM) before each call,
+- caps in-flight calls process-wide (LLM_MAX_CONCURRENCY),
+- retries rate-limit and transient errors with exponential backoff and full
+  jitter (LLM_MAX_RETRIES, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX),
+- answers repeated prompts from a persistent response cache keyed by
+  (model, temperature, rendered prompt), SQLite by default (LLM_CACHE_*).
+  Only deterministic calls are cached: models with temperature=0, or
+  get_llm(..., cache=True) for prompts whose output may be reused. Pass
+  config={"metadata": {"llm_cache": False}} to a chain call to bypass it
+  (e.g. on regenerate), or set_response_cache() to plug in another store.
+
+LLM_PROVIDER=fake swaps the Gemini clients for the offline FakeChatModel
+(see Common_Utils.fake_providers); rate limiting, retries and caching still
+apply, and fake responses are cached under their own keys.
+
+Every call is timed and recorded by the LLMMetricsHandler callback (see
+Common_Utils.llm_metrics); name chains with metadata={"chain_name": ...}.
+
+invoke/stream/batch and ainvoke/astream/abatch are all available.
+"""
+import os
+import json
+import time
+import hashlib
+import random
+import asyncio
+import threading
+from typing import Any, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig, ensure_config
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk
+from langchain_core.prompt_values import PromptValue
+
+from Common_Utils.sqlite_cache import get_cache
+from Common_Utils.fake_providers import LLM_PROVIDER, FakeChatModel
+from Common_Utils.llm_metrics import get_metrics_handler, record_cache_hit
+
+from dotenv import load_dotenv
+load_dotenv()
+
+LLM_RPM = int(os.getenv("LLM_RPM", "60"))
+LLM_TPM = int(os.getenv("LLM_TPM", "1000000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+# Output tokens charged to the TPM bucket per call, on top of the prompt estimate
+LLM_OUTPUT_TOKEN_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKEN_ESTIMATE", "500"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+# Gemini bills an image at a flat token count regardless of its byte size
+IMAGE_TOKEN_ESTIMATE = 258
+
+RETRYABLE_ERROR_MARKERS = (
+    "429", "resource exhausted", "resourceexhausted", "rate limit", "ratelimit", "quota",
+    "500 internal", "503", "unavailable", "deadline", "timeout", "timed out", "internal error"
+)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: int):
+        self.capacity = max(1, rate_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, amount: float) -> float:
+        """Take amount from the bucket; returns how long the caller must wait for it"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, amount: float = 1):
+        delay = self._reserve(amount)
+        if delay:
+            time.sleep(delay)
+
+    async def aacquire(self, amount: float = 1):
+        delay = self._reserve(amount)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+_request_buckets = {}
+_token_buckets = {}
+_buckets_lock = threading.Lock()
+_concurrency = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+
+
+async def _acquire_slot():
+    """Wait for a concurrency slot without blocking the event loop (safe to cancel)"""
+    while not _concurrency.acquire(blocking=False):
+        await asyncio.sleep(0.05)
+
+
+def _get_buckets(model_name: str):
+    with _buckets_lock:
+        if model_name not in _request_buckets:
+            _request_buckets[model_name] = TokenBucket(LLM_RPM)
+            _token_buckets[model_name] = TokenBucket(LLM_TPM)
+        return _request_buckets[model_name], _token_buckets[model_name]
+
+
+def estimate_input_tokens(model_input) -> int:
+    """Approximate prompt tokens: four characters per token, fixed cost per image"""
+    if isinstance(model_input, PromptValue):
+        model_input = model_input.to_messages()
+    if isinstance(model_input, str):
+        return len(model_input) // 4 + 1
+
+    tokens = 0
+    for message in model_input if isinstance(model_input, (list, tuple)) else [model_input]:
+        content = message.content if isinstance(message, BaseMessage) else message
+        if isinstance(content, str):
+            tokens += len(content) // 4 + 1
+        elif isinstance(content, (list, tuple)):
+            for part in content:
+                if isinstance(part, dict) and part.get("type") == "image_url":
+                    tokens += IMAGE_TOKEN_ESTIMATE
+                elif isinstance(part, dict):
+                    tokens += len(str(part.get("text", ""))) // 4 + 1
+                else:
+                    tokens += len(str(part)) // 4 + 1
+        else:
+            tokens += len(str(content)) // 4 + 1
+    return tokens
+
+
+def is_retryable_error(error: Exception) -> bool:
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in RETRYABLE_ERROR_MARKERS)
+
+
+def get_backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+
+_response_cache = get_cache("llm_responses", LLM_CACHE_TTL, LLM_CACHE_MAX_BYTES) if LLM_CACHE_ENABLED else None
+
+
+def set_response_cache(cache):
+    """Swap the response cache (any object with get(key) and set(key, value)); None disables it"""
+    global _response_cache
+    _response_cache = cache
+
+
+def get_response_cache_stats() -> dict:
+    if _response_cache is None:
+        return {}
+    return _response_cache.stats() if hasattr(_response_cache, 'stats') else {}
+
+
+def _serialize_input(model_input):
+    if isinstance(model_input, PromptValue):
+        model_input = model_input.to_messages()
+    if isinstance(model_input, str):
+        return [{'type': 'human', 'content': model_input}]
+    return [
+        {'type': message.type, 'content': message.content} if isinstance(message, BaseMessage) else str(message)
+        for message in (model_input if isinstance(model_input, (list, tuple)) else [model_input])
+    ]
+
+
+def get_model_id(model_name: str) -> str:
+    """Model name qualified by provider when it is not Gemini, e.g. 'fake:gemini-1.5-flash'"""
+    return model_name if LLM_PROVIDER == "google" else f"{LLM_PROVIDER}:{model_name}"
+
+
+def get_response_cache_key(model_name: str, temperature: Optional[float], model_input, call_kwargs: dict) -> str:
+    payload = json.dumps({
+        'model': get_model_id(model_name),
+        'temperature': temperature,
+        'input': _serialize_input(model_input),
+        'kwargs': call_kwargs
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(model_name: str, temperature: Optional[float]):
+    key = (model_name, temperature)
+    with _clients_lock:
+        if key not in _clients and LLM_PROVIDER == "fake":
+            _clients[key] = FakeChatModel(model=model_name, temperature=temperature)
+        elif key not in _clients:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            kwargs = {'model': model_name, 'max_retries': 1}  # retries are handled here
+            if temperature is not None:
+                kwargs['temperature'] = temperature
+            _clients[key] = ChatGoogleGenerativeAI(**kwargs)
+        return _clients[key]
+
+
+class GatewayModel(Runnable):
+    """Rate-limited, retrying chat model shared by every chain of the app"""
+
+    def __init__(self, model_name: str, temperature: Optional[float] = None, cache: Optional[bool] = None):
+        self.model_name = model_name
+        self.temperature = temperature
+        # Sampled output is meant to vary between calls, so only temperature 0 is cached unless asked for
+        self.cache = temperature == 0 if cache is None else cache
+
+    @property
+    def model(self) -> str:
+        return self.model_name
+
+    @property
+    def client(self):
+        return _get_client(self.model_name, self.temperature)
+
+    def _wait_for_capacity(self, model_input):
+        request_bucket, token_bucket = _get_buckets(self.model_name)
+        request_bucket.acquire(1)
+        token_bucket.acquire(estimate_input_tokens(model_input) + LLM_OUTPUT_TOKEN_ESTIMATE)
+
+    async def _await_capacity(self, model_input):
+        request_bucket, token_bucket = _get_buckets(self.model_name)
+        await request_bucket.aacquire(1)
+        await token_bucket.aacquire(estimate_input_tokens(model_input) + LLM_OUTPUT_TOKEN_ESTIMATE)
+
+    def _cache_key(self, model_input, config: Optional[RunnableConfig], call_kwargs: dict) -> Optional[str]:
+        """Response cache key, or None when caching is off for this model or this call"""
+        if _response_cache is None or not self.cache:
+            return None
+        if ((config or {}).get('metadata') or {}).get('llm_cache') is False:
+            return None
+        return get_response_cache_key(self.model_name, self.temperature, model_input, call_kwargs)
+
+    def _cached_message(self, cache_key: Optional[str], config: Optional[RunnableConfig]) -> Optional[AIMessage]:
+        if cache_key is None:
+            return None
+        started_at = time.perf_counter()
+        cached = _response_cache.get(cache_key)
+        if not cached:
+            return None
+        record_cache_hit((config or {}).get('metadata'), get_model_id(self.model_name),
+                         (time.perf_counter() - started_at) * 1000)
+        return AIMessage(content=cached['content'])
+
+    def _client_config(self, config: Optional[RunnableConfig]) -> RunnableConfig:
+        """Caller's config with the metrics handler attached and the model named for it"""
+        config = ensure_config(config)
+        metadata = {**config.get('metadata', {}), 'llm_model': get_model_id(self.model_name)}
+        handler = get_metrics_handler()
+        callbacks = config.get('callbacks')
+        if handler is not None:
+            if callbacks is None:
+                callbacks = [handler]
+            elif isinstance(callbacks, list):
+                callbacks = callbacks + [handler]
+            else:
+                callbacks = callbacks.copy()
+                callbacks.add_handler(handler, inherit=False)
+        return {**config, 'metadata': metadata, 'callbacks': callbacks}
+
+    @staticmethod
+    def _store_message(cache_key: Optional[str], message):
+        if cache_key is not None and isinstance(message.content, str) and message.content:
+            _response_cache.set(cache_key, {'content': message.content})
+
+    def invoke(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        cache_key = self._cache_key(input, config, kwargs)
+        cached = self._cached_message(cache_key, config)
+        if cached is not None:
+            return cached
+        message = self._invoke(input, config, **kwargs)
+        self._store_message(cache_key, message)
+        return message
+
+    async def ainvoke(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        cache_key = self._cache_key(input, config, kwargs)
+        cached = self._cached_message(cache_key, config)
+        if cached is not None:
+            return cached
+        message = await self._ainvoke(input, config, **kwargs)
+        self._store_message(cache_key, message)
+        return message
+
+    def stream(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        cache_key = self._cache_key(input, config, kwargs)
+        cached = self._cached_message(cache_key, config)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content)
+            return
+        full = None
+        for chunk in self._stream(input, config, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield chunk
+        if full is not None:
+            self._store_message(cache_key, full)
+
+    async def astream(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        cache_key = self._cache_key(input, config, kwargs)
+        cached = self._cached_message(cache_key, config)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content)
+            return
+        full = None
+        async for chunk in self._astream(input, config, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield chunk
+        if full is not None:
+            self._store_message(cache_key, full)
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        if attempt >= LLM_MAX_RETRIES or not is_retryable_error(error):
+            return False
+        print(f"{self.model_name} call failed ({error}), retry {attempt + 1}/{LLM_MAX_RETRIES}")
+        return True
+
+    def _invoke(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        attempt = 0
+        while True:
+            self._wait_for_capacity(input)
+            try:
+                with _concurrency:
+                    return self.client.invoke(input, self._client_config(config), **kwargs)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                time.sleep(get_backoff_delay(attempt))
+                attempt += 1
+
+    async def _ainvoke(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        attempt = 0
+        while True:
+            await self._await_capacity(input)
+            await _acquire_slot()
+            try:
+                return await self.client.ainvoke(input, self._client_config(config), **kwargs)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+            finally:
+                _concurrency.release()
+            await asyncio.sleep(get_backoff_delay(attempt))
+            attempt += 1
+
+    def _stream(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        """Stream chunks; a failure is only retried while nothing has been yielded yet"""
+        attempt = 0
+        while True:
+            self._wait_for_capacity(input)
+            started = False
+            try:
+                with _concurrency:
+                    for chunk in self.client.stream(input, self._client_config(config), **kwargs):
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                if started or not self._should_retry(e, attempt):
+                    raise
+            time.sleep(get_backoff_delay(attempt))
+            attempt += 1
+
+    async def _astream(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        attempt = 0
+        while True:
+            await self._await_capacity(input)
+            started = False
+            await _acquire_slot()
+            try:
+                async for chunk in self.client.astream(input, self._client_config(config), **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started or not self._should_retry(e, attempt):
+                    raise
+            finally:
+                _concurrency.release()
+            await asyncio.sleep(get_backoff_delay(attempt))
+            attempt += 1
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_llm(model_name: str, temperature: Optional[float] = None, cache: Optional[bool] = None) -> GatewayModel:
+    """Process-wide gateway model for a model name / temperature pair.
+
+    Responses are cached only for temperature=0 by default. cache=True also
+    caches a sampled model, for prompts whose output is fine to reuse (e.g.
+    extraction); cache=False never caches.
+    """
+    key = (model_name, temperature, cache)
+    with _models_lock:
+        if key not in _models:
+            _models[key] = GatewayModel(model_name, temperature, cache)
+        return _models[key]
@@ -0,0 +1,301 @@
+"""Per-call LLM metrics: latency, time to first token, tokens, cost, cache hits and errors.
+
+LLMMetricsHandler is a LangChain callback handler; the gateway attaches it to
+every model call, so each request (including each retry) becomes one row in
+a rolling SQLite store (LLM_METRICS_DB_PATH, newest LLM_METRICS_MAX_ROWS
+rows kept). Cache hits are recorded by the gateway with zero tokens.
+
+Calls are grouped by chain name, taken from the config metadata:
+
+    chain.with_config(metadata={"chain_name": "pain_points_map"})
+
+and by session, from metadata "session_id" or else the Streamlit session of
+the calling thread ("background" for worker threads).
+
+Summary of the last 24 hours, p50/p95 per chain or per session:
+
+    python -m Common_Utils.llm_metrics --by chain --hours 24
+"""
+import os
+import math
+import time
+import sqlite3
+import argparse
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from dotenv import load_dotenv
+load_dotenv()
+
+LLM_METRICS_ENABLED = os.getenv("LLM_METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_METRICS_DB_PATH = os.getenv("LLM_METRICS_DB_PATH") or os.path.join(os.getenv("CHROMA_PATH") or ".", "llm_metrics.sqlite3")
+LLM_METRICS_MAX_ROWS = int(os.getenv("LLM_METRICS_MAX_ROWS", "100000"))
+# Rows are trimmed to LLM_METRICS_MAX_ROWS once every this many inserts
+PRUNE_EVERY = 500
+
+# USD per million (prompt, completion) tokens
+MODEL_PRICES = {
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.0-flash-001": (0.10, 0.40),
+}
+
+
+def get_call_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prices = MODEL_PRICES.get((model or "").split(":")[-1])
+    if not prices:
+        return 0.0
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def get_session_id(metadata: Optional[dict] = None) -> str:
+    session_id = (metadata or {}).get("session_id")
+    if session_id:
+        return str(session_id)
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            return ctx.session_id
+    except Exception:
+        pass
+    return "background"
+
+
+class MetricsStore:
+    """Rolling SQLite table of LLM calls, safe to use from any thread"""
+
+    def __init__(self, db_path: str = LLM_METRICS_DB_PATH, max_rows: int = LLM_METRICS_MAX_ROWS):
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._inserts = 0
+
+    @contextmanager
+    def _connection(self):
+        with self._lock:
+            conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _connect(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_calls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    chain TEXT NOT NULL,
+                    session TEXT NOT NULL,
+                    model TEXT,
+                    prompt_tokens INTEGER,
+                    completion_tokens INTEGER,
+                    ttft_ms REAL,
+                    latency_ms REAL,
+                    cost REAL,
+                    cache_hit INTEGER NOT NULL,
+                    error TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_calls_created ON llm_calls (created_at)")
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def record(self, chain: str, session: str, model: str, latency_ms: float, ttft_ms: Optional[float] = None,
+               prompt_tokens: int = 0, completion_tokens: int = 0, cache_hit: bool = False,
+               error: Optional[str] = None):
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT INTO llm_calls (created_at, chain, session, model, prompt_tokens, completion_tokens, "
+                    "ttft_ms, latency_ms, cost, cache_hit, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (time.time(), chain, session, model, prompt_tokens, completion_tokens, ttft_ms, latency_ms,
+                     0.0 if cache_hit else get_call_cost(model, prompt_tokens, completion_tokens),
+                     int(cache_hit), error)
+                )
+                self._inserts += 1
+                if self._inserts % PRUNE_EVERY == 0:
+                    conn.execute(
+                        "DELETE FROM llm_calls WHERE id <= (SELECT MAX(id) FROM llm_calls) - ?", (self.max_rows,)
+                    )
+        except Exception as e:
+            print(f"Error recording LLM metrics: {e}")
+
+    def rows(self, since: Optional[float] = None) -> List[dict]:
+        with self._connection() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute(
+                "SELECT * FROM llm_calls WHERE created_at >= ? ORDER BY id", (since or 0,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, None for no values"""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(rows: List[dict], group_by: str = "chain") -> List[dict]:
+    """p50/p95 latency and TTFT, tokens, cost, cache hits and errors per chain or session"""
+    groups: Dict[str, List[dict]] = {}
+    for row in rows:
+        groups.setdefault(row[group_by], []).append(row)
+
+    summary = []
+    for key, calls in groups.items():
+        # Cache hits return in microseconds and would hide the model's own latency
+        model_calls = [c for c in calls if not c['cache_hit'] and not c['error']]
+        summary.append({
+            group_by: key,
+            'calls': len(calls),
+            'errors': sum(1 for c in calls if c['error']),
+            'cache_hits': sum(1 for c in calls if c['cache_hit']),
+            'p50_ms': percentile([c['latency_ms'] for c in model_calls], 50),
+            'p95_ms': percentile([c['latency_ms'] for c in model_calls], 95),
+            'p50_ttft_ms': percentile([c['ttft_ms'] for c in model_calls], 50),
+            'p95_ttft_ms': percentile([c['ttft_ms'] for c in model_calls], 95),
+            'prompt_tokens': sum(c['prompt_tokens'] or 0 for c in calls),
+            'completion_tokens': sum(c['completion_tokens'] or 0 for c in calls),
+            'cost': sum(c['cost'] or 0 for c in calls),
+        })
+    return sorted(summary, key=lambda s: (s['p95_ms'] or 0) * s['calls'], reverse=True)
+
+
+def _estimate_tokens(messages) -> int:
+    return sum(len(str(message.content)) // 4 + 1 for batch in messages for message in batch)
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Times each chat model run from start to first token and to end, and stores it on completion"""
+
+    # Run in the calling thread even for async calls, so timings are not skewed by an executor hop
+    run_inline = True
+
+    def __init__(self, store: MetricsStore):
+        self.store = store
+        self._runs: Dict[Any, dict] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        with self._lock:
+            self._runs[run_id] = {
+                'chain': metadata.get('chain_name') or kwargs.get('name') or 'unnamed',
+                'session': get_session_id(metadata),
+                'model': metadata.get('llm_model') or metadata.get('ls_model_name') or '',
+                'started_at': time.perf_counter(),
+                'first_token_at': None,
+                'prompt_estimate': _estimate_tokens(messages),
+            }
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None and run['first_token_at'] is None:
+                run['first_token_at'] = time.perf_counter()
+
+    def _finish(self, run_id) -> Optional[dict]:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is not None:
+            run['ended_at'] = time.perf_counter()
+        return run
+
+    @staticmethod
+    def _elapsed_ms(run: dict, until: Optional[float]) -> Optional[float]:
+        return None if until is None else (until - run['started_at']) * 1000
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        run = self._finish(run_id)
+        if run is None:
+            return
+        usage = {}
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None) or usage
+        completion_text = "".join(g.text for gens in response.generations for g in gens)
+        self.store.record(
+            run['chain'], run['session'], run['model'],
+            latency_ms=self._elapsed_ms(run, run['ended_at']),
+            ttft_ms=self._elapsed_ms(run, run['first_token_at']),
+            prompt_tokens=usage.get('input_tokens') or run['prompt_estimate'],
+            completion_tokens=usage.get('output_tokens') or len(completion_text) // 4 + 1
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        run = self._finish(run_id)
+        if run is None:
+            return
+        self.store.record(
+            run['chain'], run['session'], run['model'],
+            latency_ms=self._elapsed_ms(run, run['ended_at']),
+            ttft_ms=self._elapsed_ms(run, run['first_token_at']),
+            error=type(error).__name__
+        )
+
+
+_store = MetricsStore() if LLM_METRICS_ENABLED else None
+_handler = LLMMetricsHandler(_store) if _store else None
+
+
+def get_metrics_handler() -> Optional[LLMMetricsHandler]:
+    return _handler
+
+
+def record_cache_hit(metadata: Optional[dict], model: str, latency_ms: float):
+    if _store is None:
+        return
+    metadata = metadata or {}
+    _store.record(metadata.get('chain_name') or 'unnamed', get_session_id(metadata), model,
+                  latency_ms=latency_ms, cache_hit=True)
+
+
+def get_metrics_summary(group_by: str = "chain", hours: Optional[float] = None) -> List[dict]:
+    store = _store or MetricsStore()
+    since = time.time() - hours * 3600 if hours else None
+    return summarize(store.rows(since), group_by)
+
+
+def _format(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.4f}" if value < 1 else f"{value:.0f}"
+    return str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize recorded LLM calls")
+    parser.add_argument("--by", choices=["chain", "session", "model"], default="chain")
+    parser.add_argument("--hours", type=float, default=None, help="Only calls from the last N hours")
+    args = parser.parse_args()
+
+    summary = get_metrics_summary(args.by, args.hours)
+    if not summary:
+        print("No LLM calls recorded")
+        return
+    columns = list(summary[0].keys())
+    table = [columns] + [[_format(row[c]) for c in columns] for row in summary]
+    widths = [max(len(r[i]) for r in table) for i in range(len(columns))]
+    for r in table:
+        print("  ".join(cell.ljust(width) for cell, width in zip(r, widths)))
+
+
+if __name__ == "__main__":
+    main()
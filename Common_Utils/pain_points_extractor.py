@@ -1,25 +1,122 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 from langchain_core.output_parsers import StrOutputParser
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableLambda
 load_dotenv()
+from Common_Utils.llm_gateway import get_llm, get_model_id
+import os
+import re
 import json
+import hashlib
+from typing import Tuple
 
-llm = ChatGoogleGenerativeAI(model = 'gemini-1.5-flash')
+PAIN_POINT_MODEL = 'gemini-1.5-flash'
+# Extraction from a fixed document; the same chunks give reusable answers
+llm = get_llm(PAIN_POINT_MODEL, cache=True)
 
 from Document_Upload_Vectordb.prompts import *
 
 from langchain_core.prompts import ChatPromptTemplate
 
-from Document_Upload_Vectordb.doc_vectorizer import vectorize
+from Document_Upload_Vectordb.doc_vectorizer import vectorize, parse_document
+from Document_Upload_Vectordb.company_store import get_file_retriever
 
 from Document_Upload_Vectordb.doc_xtraction_utils import *
+from Common_Utils.sqlite_cache import get_cache
 
-def get_pain_points(file: str, company_name: str):
-    # Use a different variable name to avoid conflict with imported prompt
+# 'auto' runs map-reduce over every chunk while the document fits PAIN_POINT_TOKEN_BUDGET,
+# and falls back to top-k retrieval above it; 'retrieval' and 'map_reduce' force a mode
+PAIN_POINT_MODE = os.getenv("PAIN_POINT_MODE", "auto").lower()
+PAIN_POINT_TOKEN_BUDGET = int(os.getenv("PAIN_POINT_TOKEN_BUDGET", "200000"))
+# Context tokens sent with each map call
+PAIN_POINT_GROUP_TOKENS = int(os.getenv("PAIN_POINT_GROUP_TOKENS", "8000"))
+PAIN_POINT_MAX_CONCURRENCY = int(os.getenv("PAIN_POINT_MAX_CONCURRENCY", "4"))
+# Merged results with more categories than this are consolidated by the reduce prompt
+PAIN_POINT_MAX_ITEMS = int(os.getenv("PAIN_POINT_MAX_ITEMS", "6"))
+
+PAIN_POINT_QUERY = "Extract key business concerns and pain points from this RFI."
+
+PAIN_POINT_CACHE_TTL = int(os.getenv("PAIN_POINT_CACHE_TTL", str(30 * 24 * 3600)))
+PAIN_POINT_CACHE_MAX_BYTES = int(os.getenv("PAIN_POINT_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+pain_point_cache = get_cache("pain_points", PAIN_POINT_CACHE_TTL, PAIN_POINT_CACHE_MAX_BYTES)
+
+
+def get_pain_point_cache_key(file_hash: str) -> str:
+    """Cache key over the document, the prompts and extraction settings, and the model"""
+    prompt_version = hashlib.sha256(json.dumps({
+        'prompt': rfi_painpoint_prompt,
+        'reduce_prompt': rfi_painpoint_reduce_prompt,
+        'query': PAIN_POINT_QUERY,
+        'mode': PAIN_POINT_MODE,
+        'token_budget': PAIN_POINT_TOKEN_BUDGET,
+        'group_tokens': PAIN_POINT_GROUP_TOKENS,
+        'max_items': PAIN_POINT_MAX_ITEMS
+    }, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"{file_hash}:{prompt_version[:16]}:{get_model_id(PAIN_POINT_MODEL)}"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def parse_pain_points(result: str) -> dict:
+    pain_points = parse_llm_json(result)
+    if not isinstance(pain_points, dict):
+        raise ValueError(f"Expected a JSON dictionary, got {type(pain_points).__name__}")
+    return pain_points
+
+
+def get_file_chunks(vectorstore, file_hash: str):
+    """All chunk texts of one file in document order"""
+    if not file_hash:
+        return []
+    try:
+        data = vectorstore.get(where={'file_hash': file_hash}, include=['documents', 'metadatas'])
+    except Exception as e:
+        print(f"Error loading file chunks: {e}")
+        return []
+    rows = sorted(
+        zip(data['metadatas'], data['documents']),
+        key=lambda row: (row[0] or {}).get('chunk_index', 0)
+    )
+    return [document for _, document in rows if document]
+
+
+def group_chunks(chunks, max_tokens: int = PAIN_POINT_GROUP_TOKENS):
+    """Pack consecutive chunks into context groups of at most max_tokens"""
+    groups, current, current_tokens = [], [], 0
+    for chunk in chunks:
+        chunk_tokens = estimate_tokens(chunk)
+        if current and current_tokens + chunk_tokens > max_tokens:
+            groups.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(chunk)
+        current_tokens += chunk_tokens
+    if current:
+        groups.append('\n\n'.join(current))
+    return groups
+
+
+def merge_pain_points(partials) -> dict:
+    """Merge partial pain point dicts, de-duplicating categories case and punctuation insensitively"""
+    merged = {}
+    for partial in partials:
+        for category, summary in partial.items():
+            key = re.sub(r'[^a-z0-9]+', ' ', str(category).lower()).strip()
+            if not key:
+                continue
+            # Keep the more detailed summary when a category repeats
+            if key not in merged or len(str(summary)) > len(str(merged[key][1])):
+                merged[key] = (category, summary)
+    return {category: summary for category, summary in merged.values()}
+
+
+def extract_pain_points_by_retrieval(vectorstore, file_hash: str) -> dict:
+    """Fast mode: one call over the top-k chunks for a fixed pain point query"""
     pain_point_template = ChatPromptTemplate.from_template(rfi_painpoint_prompt)
-    retriever = vectorize(file, company_name).as_retriever()
+    # The company collection holds every document of the client, so only search this file
+    retriever = get_file_retriever(vectorstore, file_hash)
 
     # Extract the query string from input and pass to retriever
     context_chain = (
@@ -30,15 +127,98 @@ def get_pain_points(file: str, company_name: str):
 
     rag_chain = (
         {"context": context_chain}
-        | pain_point_template  # Use the renamed variable
+        | pain_point_template
         | llm
         | StrOutputParser()
+    ).with_config(metadata={"chain_name": "pain_points_retrieval"})
+    return parse_pain_points(rag_chain.invoke({"query": PAIN_POINT_QUERY}))
+
+
+def extract_pain_points_map_reduce(groups, progress_callback=None) -> Tuple[dict, bool]:
+    """Full-coverage mode: extract from every chunk group concurrently, then merge.
+
+    Returns (pain points, complete); complete is False when a group failed or
+    did not parse, or the reduce step fell back to the merged results.
+    """
+    map_chain = ChatPromptTemplate.from_template(rfi_painpoint_prompt) | llm | StrOutputParser()
+    if progress_callback:
+        progress_callback('extracting', 0, len(groups))
+
+    results = map_chain.batch(
+        [{"context": group} for group in groups],
+        config={"max_concurrency": PAIN_POINT_MAX_CONCURRENCY, "metadata": {"chain_name": "pain_points_map"}},
+        return_exceptions=True
     )
-    
+
+    partials = []
+    complete = True
+    for i, result in enumerate(results, 1):
+        try:
+            if isinstance(result, Exception):
+                raise result
+            partials.append(parse_pain_points(result))
+        except Exception as e:
+            print(f"Error extracting pain points from group {i}/{len(groups)}: {e}")
+            complete = False
+    if progress_callback:
+        progress_callback('extracting', len(groups), len(groups))
+
+    if not partials:
+        raise ValueError("No chunk group produced pain points")
+    merged = merge_pain_points(partials)
+    if len(partials) == 1 or len(merged) <= PAIN_POINT_MAX_ITEMS:
+        return merged, complete
+
     try:
-        result = rag_chain.invoke({"query": "Extract key business concerns and pain points from this RFI."})
-        print(type(json.loads(clean_to_list(result))))
-        return json.loads(clean_to_list(result))
+        reduce_chain = ChatPromptTemplate.from_template(rfi_painpoint_reduce_prompt) | llm | StrOutputParser()
+        return parse_pain_points(reduce_chain.invoke({
+            "pain_points": json.dumps(merged, indent=2),
+            "max_items": PAIN_POINT_MAX_ITEMS
+        }, config={"metadata": {"chain_name": "pain_points_reduce"}})), complete
+    except Exception as e:
+        print(f"Error reducing pain points, returning merged results: {e}")
+        return merged, False
+
+
+def get_pain_points(file: str, company_name: str, progress_callback=None, file_hash: str = None):
+    parsed = parse_document(file, file_hash)
+
+    # The same RFI (same bytes) gives the same pain points, whoever uploads it
+    cache_key = get_pain_point_cache_key(parsed.file_hash) if parsed.file_hash else None
+    cached = pain_point_cache.get(cache_key) if cache_key else None
+    if cached:
+        print(f"Pain point cache hit for {os.path.basename(parsed.filepath)}")
+        return cached
+
+    vectorstore = vectorize(parsed, company_name, progress_callback)
+
+    if progress_callback:
+        progress_callback('extracting', 0, 1)
+
+    try:
+        mode = PAIN_POINT_MODE
+        chunks = get_file_chunks(vectorstore, parsed.file_hash) if mode != 'retrieval' else []
+        document_tokens = sum(estimate_tokens(chunk) for chunk in chunks)
+        if mode == 'auto':
+            mode = 'map_reduce' if chunks and document_tokens <= PAIN_POINT_TOKEN_BUDGET else 'retrieval'
+        print(f"Pain point extraction: {mode} mode ({len(chunks)} chunks, ~{document_tokens} tokens)")
+
+        if mode == 'map_reduce' and chunks:
+            pain_points, complete = extract_pain_points_map_reduce(group_chunks(chunks), progress_callback)
+        else:
+            pain_points, complete = extract_pain_points_by_retrieval(vectorstore, parsed.file_hash), True
+
+        # A partial result is still shown, but only a complete one is kept for the next upload
+        if cache_key and pain_points and complete:
+            pain_point_cache.set(cache_key, pain_points)
+        elif cache_key:
+            print("Pain points incomplete or empty, not caching")
+        return pain_points
     except Exception as e:
         print(f"Error in get_pain_points: {e}")
-        return []
\ No newline at end of file
+        return []
+
+
+def run_pain_points_job(job, file: str, company_name: str, file_hash: str = None):
+    """Background job body for an RFI upload; see Common_Utils.background_jobs"""
+    return get_pain_points(file, company_name, progress_callback=job.report_progress, file_hash=file_hash)
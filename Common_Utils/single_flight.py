@@ -0,0 +1,113 @@
+"""Coalesce concurrent identical calls into one in-flight execution.
+
+The first caller for a key runs the function; callers arriving while it is
+still running wait on the same concurrent.futures.Future and get its result
+(or exception). Thread-based callers block on the future; asyncio callers
+await it through asyncio.wrap_future, so followers on any event loop or
+thread can share a leader's call. Nothing is cached once the call finishes.
+"""
+import copy
+import json
+import asyncio
+import inspect
+import functools
+import threading
+from concurrent.futures import Future
+
+
+def normalize_key_part(value):
+    """Case and whitespace insensitive strings, recursively, so 'Acme Corp ' and 'acme corp' coalesce"""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {str(k): normalize_key_part(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_key_part(v) for v in value]
+    return value
+
+
+def make_key(name: str, *args, **kwargs) -> str:
+    return json.dumps([name, normalize_key_part(args), normalize_key_part(kwargs)], sort_keys=True, default=str)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: str):
+        """(future, is_leader) for key"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key: str):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def do(self, key: str, fn, *args, **kwargs):
+        future, is_leader = self._join(key)
+        if not is_leader:
+            # Followers get their own copy so none of them can mutate another's result
+            return copy.deepcopy(future.result())
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key)
+
+    async def ado(self, key: str, coroutine_fn, *args, **kwargs):
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return copy.deepcopy(await asyncio.wrap_future(future))
+        try:
+            result = await coroutine_fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+_single_flight = SingleFlight()
+
+
+def single_flight(key=None):
+    """Decorator coalescing concurrent calls with the same normalized arguments.
+
+    key, if given, maps the call arguments to the part that identifies the
+    request (e.g. lambda company_name, **_: company_name), leaving out
+    arguments such as shared client objects.
+    """
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        def call_key(args, kwargs):
+            return make_key(name, key(*args, **kwargs)) if key else make_key(name, *args, **kwargs)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await _single_flight.ado(call_key(args, kwargs), fn, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return _single_flight.do(call_key(args, kwargs), fn, *args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH") or os.path.join(os.getenv("CHROMA_PATH") or ".", "result_cache.sqlite3")
+
+
+class SQLiteCache:
+    """JSON value cache in SQLite, shared by every session and surviving restarts.
+
+    Each namespace has its own TTL and byte budget; when a namespace grows
+    past max_bytes the least recently read entries are evicted. A connection
+    is opened per call, so one instance can be used from any thread.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: Optional[int] = None, max_bytes: Optional[int] = None,
+                 db_path: str = CACHE_DB_PATH):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connection(self):
+        """Connection committed on success and always closed"""
+        with self._lock:
+            conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _connect(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (namespace, accessed_at)")
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Any:
+        """Cached value for key, or None when missing or expired"""
+        try:
+            with self._connection() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row is None:
+                    self._count(False)
+                    return None
+                now = time.time()
+                if self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                    conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                    self._count(False)
+                    return None
+                conn.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key)
+                )
+            self._count(True)
+            return json.loads(row[0])
+        except Exception as e:
+            print(f"Error reading {self.namespace} cache: {e}")
+            self._count(False)
+            return None
+
+    def set(self, key: str, value: Any):
+        try:
+            data = json.dumps(value)
+            now = time.time()
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, data, len(data), now, now)
+                )
+                self._evict(conn, now)
+        except Exception as e:
+            print(f"Error writing {self.namespace} cache: {e}")
+
+    def delete(self, key: str):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def _evict(self, conn, now: float):
+        if self.ttl_seconds:
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND created_at < ?",
+                (self.namespace, now - self.ttl_seconds)
+            )
+        if not self.max_bytes:
+            return
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, size FROM cache WHERE namespace = ? ORDER BY accessed_at", (self.namespace,)
+        ).fetchall()
+        expired = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            expired.append((self.namespace, key))
+            total -= size
+        conn.executemany("DELETE FROM cache WHERE namespace = ? AND key = ?", expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        with self._connection() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        return {'namespace': self.namespace, 'hits': hits, 'misses': misses, 'entries': entries, 'bytes': size}
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, ttl_seconds: Optional[int] = None, max_bytes: Optional[int] = None) -> SQLiteCache:
+    """Process-wide cache instance per namespace"""
+    with _caches_lock:
+        if namespace not in _caches:
+            _caches[namespace] = SQLiteCache(namespace, ttl_seconds, max_bytes)
+        return _caches[namespace]
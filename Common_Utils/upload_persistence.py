@@ -0,0 +1,39 @@
+import os
+import uuid
+import hashlib
+
+# Uploads are copied and hashed this many bytes at a time
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+
+def persist_uploaded_file(uploaded_file, upload_dir: str):
+    """Stream an upload to upload_dir in fixed-size blocks, hashing it in the same pass.
+
+    The file is written to a temporary name and moved into place, so a reader
+    never sees a half-written upload. Returns (file_path, sha256 hex digest, size in bytes).
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    file_path = os.path.join(upload_dir, os.path.basename(uploaded_file.name))
+    tmp_path = f"{file_path}.{uuid.uuid4().hex}.part"
+
+    digest = hashlib.sha256()
+    size = 0
+    uploaded_file.seek(0)
+    try:
+        with open(tmp_path, "wb") as f:
+            while True:
+                block = uploaded_file.read(UPLOAD_BLOCK_SIZE)
+                if not block:
+                    break
+                digest.update(block)
+                f.write(block)
+                size += len(block)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        uploaded_file.seek(0)
+
+    return file_path, digest.hexdigest(), size
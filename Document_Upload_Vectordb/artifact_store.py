@@ -0,0 +1,89 @@
+"""Optional content-addressed store for intermediate ingestion artifacts (page summaries, OCR text).
+
+Set ARTIFACT_STORE_PATH to enable it. Contents are stored once under
+objects/<sha256[:2]>/<sha256>; every ingestion run gets its own manifest
+jobs/<job_id>.json mapping artifact names to digests. All writes go to a
+temporary file first and are moved into place, so concurrent sessions never
+share a file handle and readers never see a partial file.
+"""
+import os
+import json
+import hashlib
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+ARTIFACT_STORE_PATH = os.getenv("ARTIFACT_STORE_PATH")
+
+
+def _atomic_write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ArtifactStore:
+    def __init__(self, root: str):
+        self.root = root
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.root, "jobs", f"{job_id}.json")
+
+    def put(self, content: str) -> str:
+        """Store content once and return its sha256 digest"""
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            _atomic_write(path, data)
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        try:
+            with open(self._object_path(digest), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def save_job(self, job_id: str, artifacts: Dict[str, str], metadata: dict = None) -> str:
+        """Store a run's artifacts and write its manifest; returns the manifest path"""
+        manifest = {
+            'job_id': job_id,
+            'created_at': datetime.now().isoformat(),
+            'metadata': metadata or {},
+            'artifacts': {name: self.put(content) for name, content in artifacts.items()}
+        }
+        path = self._job_path(job_id)
+        _atomic_write(path, json.dumps(manifest, indent=2).encode("utf-8"))
+        return path
+
+    def load_job(self, job_id: str) -> Dict[str, str]:
+        """{artifact name: content} of a stored run"""
+        with open(self._job_path(job_id), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return {name: self.get(digest) for name, digest in manifest['artifacts'].items()}
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    return ArtifactStore(ARTIFACT_STORE_PATH) if ARTIFACT_STORE_PATH else None
+
+
+def save_job_artifacts(job_prefix: str, artifacts: Dict[str, str], metadata: dict = None) -> Optional[str]:
+    """Persist artifacts of one ingestion run when the store is enabled; never raises"""
+    store = get_artifact_store()
+    if store is None or not artifacts:
+        return None
+    job_id = f"{job_prefix}_{datetime.now().strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    try:
+        return store.save_job(job_id, artifacts, metadata)
+    except Exception as e:
+        print(f"Error saving artifacts for {job_id}: {e}")
+        return None
@@ -0,0 +1,107 @@
+import os
+import re
+import hashlib
+import threading
+
+from langchain_chroma import Chroma
+from .embeddings import get_embeddings
+
+from dotenv import load_dotenv
+load_dotenv()
+
+chroma_path = os.getenv("CHROMA_PATH")
+
+_company_stores = {}
+_company_stores_lock = threading.Lock()
+
+
+def get_company_collection_name(company_name: str) -> str:
+    """Chroma-safe collection name (3-63 chars of [a-z0-9._-]) for a company"""
+    name = re.sub(r'[^a-z0-9._-]+', '_', company_name.strip().lower()).strip('._-')
+    if len(name) < 3 or len(name) > 63:
+        digest = hashlib.sha256(company_name.encode('utf-8')).hexdigest()[:8]
+        name = f"{name[:50]}_{digest}".strip('._-')
+    return name
+
+
+def get_company_persist_directory(company_name: str) -> str:
+    return os.path.join(chroma_path, company_name)
+
+
+def get_company_store(company_name: str) -> Chroma:
+    """Return the cached Chroma handle holding every document of a company"""
+    with _company_stores_lock:
+        if company_name not in _company_stores:
+            persist_directory = get_company_persist_directory(company_name)
+            os.makedirs(persist_directory, exist_ok=True)
+            _company_stores[company_name] = Chroma(
+                collection_name=get_company_collection_name(company_name),
+                embedding_function=get_embeddings(),
+                persist_directory=persist_directory
+            )
+        return _company_stores[company_name]
+
+
+def is_company_store(vectorstore, company_name: str) -> bool:
+    return vectorstore is _company_stores.get(company_name)
+
+
+def has_file_chunks(vectorstore, file_hash: str) -> bool:
+    """Whether a file's chunks are present in the store"""
+    if not file_hash:
+        return False
+    try:
+        return bool(vectorstore.get(where={'file_hash': file_hash}, limit=1)['ids'])
+    except Exception as e:
+        print(f"Error checking file chunks: {e}")
+        return False
+
+
+def has_incomplete_chunks(vectorstore, file_hash: str) -> bool:
+    """Whether a file was stored with pages that could not be summarized"""
+    try:
+        return bool(vectorstore.get(
+            where={'$and': [{'file_hash': file_hash}, {'summary_incomplete': True}]}, limit=1
+        )['ids'])
+    except Exception as e:
+        print(f"Error checking file completeness: {e}")
+        return True
+
+
+def get_chunk_id(file_hash: str, chunk_index: int) -> str:
+    """Deterministic chunk id, so re-ingesting a file overwrites instead of duplicating"""
+    return f"{file_hash}_{chunk_index}"
+
+
+def get_chunk_ids(file_hash: str, count: int):
+    return [get_chunk_id(file_hash, i) for i in range(count)]
+
+
+def replace_file_texts(company_name: str, file_hash: str, texts, metadatas):
+    """Replace a file's chunks in the company collection with new texts"""
+    vectorstore = get_company_store(company_name)
+    vectorstore.delete(where={'file_hash': file_hash})
+    if texts:
+        vectorstore.add_texts(texts=texts, metadatas=metadatas, ids=get_chunk_ids(file_hash, len(texts)))
+    return vectorstore
+
+
+def replace_file_documents(company_name: str, file_hash: str, documents):
+    """Replace a file's chunks in the company collection with new documents"""
+    vectorstore = get_company_store(company_name)
+    vectorstore.delete(where={'file_hash': file_hash})
+    if documents:
+        vectorstore.add_documents(documents=documents, ids=get_chunk_ids(file_hash, len(documents)))
+    return vectorstore
+
+
+def get_file_retriever(vectorstore, file_hash: str, **search_kwargs):
+    """Retriever restricted to one file's chunks.
+
+    Raises ValueError when the store holds none of them (failed ingestion, wrong
+    hash) rather than searching the company's other documents.
+    """
+    if not has_file_chunks(vectorstore, file_hash):
+        raise ValueError(f"No chunks stored for file {file_hash}")
+    search_kwargs['filter'] = {'file_hash': file_hash}
+    return vectorstore.as_retriever(search_kwargs=search_kwargs)
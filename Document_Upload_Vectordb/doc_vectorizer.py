@@ -1,10 +1,7 @@
 import os
-import base64
-from io import BytesIO
-import filetype
-from pdf2image import convert_from_path
 from datetime import datetime
 import hashlib
+from typing import List
 
 # New imports for PPT and DOC support
 from pptx import Presentation
@@ -14,28 +11,64 @@ from langchain_community.document_loaders import UnstructuredPowerPointLoader, D
 from langchain_community.document_loaders import UnstructuredWordDocumentLoader
 
 from langchain_core.messages import HumanMessage
-from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document as LangchainDocument
 from langchain_chroma import Chroma
-from langchain_google_genai import ChatGoogleGenerativeAI
+from Common_Utils.llm_gateway import get_llm
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
+from .embeddings import get_embeddings, get_embedding_model_id
 from .prompts import image_prompt  # Make sure this exists
+from .page_summarizer import summarize_pages
+from .pdf_rasterizer import iter_pdf_pages, get_pdf_page_count, PDF_RASTER_DPI, PDF_RASTER_GRAYSCALE, PDF_MAX_PAGES
+from .parsed_document import ParsedDocument, guess_mime_type
+from .ocr import ocr_page_text, OCR_BACKEND
+from .image_payload import ImagePayload, build_image_payloads
+from .artifact_store import save_job_artifacts
+from .company_store import (
+    get_company_store, is_company_store, has_file_chunks, has_incomplete_chunks,
+    replace_file_texts, replace_file_documents
+)
+from .ingestion_cache import make_ingestion_key, lookup_ingestion, record_ingestion
 
 from dotenv import load_dotenv
 load_dotenv()
 
 chroma_path = os.getenv("CHROMA_PATH")
 
+# Chunking / embedding settings - part of the ingestion cache key, so changing
+# any of them re-vectorizes previously ingested files
+CHUNK_SIZE = 600
+TEXT_CHUNK_OVERLAP = 50
+PDF_CHUNK_OVERLAP = 80
+CHUNK_PARAMS = {
+    'chunk_size': CHUNK_SIZE,
+    'text_chunk_overlap': TEXT_CHUNK_OVERLAP,
+    'pdf_chunk_overlap': PDF_CHUNK_OVERLAP,
+    'splitter': 'recursive_character_text_splitter'
+}
+# Rasterization and OCR settings change what scanned pages summarize to, so they are cached on too
+INGESTION_PARAMS = dict(
+    CHUNK_PARAMS,
+    raster_dpi=PDF_RASTER_DPI,
+    raster_grayscale=PDF_RASTER_GRAYSCALE,
+    max_pages=PDF_MAX_PAGES,
+    ocr_backend=OCR_BACKEND
+)
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
 # --- Utility Functions ---
 
 def get_filename(file_path):
     return os.path.splitext(os.path.basename(file_path))[0]
 
 def get_file_hash(file_path):
-    """Generate SHA-256 hash of file for duplicate detection"""
+    """Generate SHA-256 hash of file for duplicate detection, reading it in 1 MiB blocks"""
     try:
+        digest = hashlib.sha256()
         with open(file_path, 'rb') as f:
-            return hashlib.sha256(f.read()).hexdigest()
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
     except:
         return None
 
@@ -46,7 +79,18 @@ def get_file_size(file_path):
     except:
         return None
 
-def create_base_metadata(file_path, company_name, file_type):
+def parse_document(file, file_hash: str = None):
+    """Wrap a file path in a ParsedDocument; the file is hashed once here and parsed lazily"""
+    if isinstance(file, ParsedDocument):
+        return file
+    return ParsedDocument(
+        filepath=file,
+        file_hash=file_hash or get_file_hash(file),
+        file_size_bytes=get_file_size(file),
+        mime_type=guess_mime_type(file)
+    )
+
+def create_base_metadata(file_path, company_name, file_type, file_hash: str = None):
     """Create base metadata common to all file types"""
     timestamp = datetime.now().isoformat()
     
@@ -59,13 +103,13 @@ def create_base_metadata(file_path, company_name, file_type):
         'processing_date': datetime.now().strftime('%Y-%m-%d'),
         'processing_time': datetime.now().strftime('%H:%M:%S'),
         'chunk_strategy': 'recursive_character_text_splitter',
-        'embedding_model': 'huggingface_default'
+        'embedding_model': get_embedding_model_id()
     }
     
     # Add file-specific metadata if it's a file path
     if isinstance(file_path, str) and os.path.exists(file_path):
         metadata.update({
-            'file_hash': get_file_hash(file_path),
+            'file_hash': file_hash or get_file_hash(file_path),
             'file_size_bytes': get_file_size(file_path),
             'file_extension': os.path.splitext(file_path)[1].lower()
         })
@@ -73,81 +117,59 @@ def create_base_metadata(file_path, company_name, file_type):
     return metadata
 
 def file_router(file):
-    """Enhanced file router with PPT and DOC support"""
-    try:
-        # Get file extension first
-        file_extension = os.path.splitext(file)[1].lower()
-        
-        # Handle specific extensions
-        if file_extension in ['.ppt', '.pptx']:
-            return 'powerpoint'
-        elif file_extension in ['.doc', '.docx']:
-            return 'word_document'
-        
-        # Use filetype for other formats
-        kind = filetype.guess(file)
-        if kind is None:
-            return "Unknown"
+    """Enhanced file router with PPT and DOC support.
 
-        file_type = kind.mime
-
-        if file_type.startswith("image/"):
-            return 'imagesingle'
-
-        # Check if it's a PDF with text or images
-        if file_type == 'application/pdf' or file_extension == '.pdf':
-            loader = PyPDFLoader(file)
-            docs = loader.load()
-
-            if not len(docs[0].page_content.strip()):
-                return 'imagepdf'
-            else:
-                return 'pdf'
-                
-        return 'pdf'  # Default fallback
-        
+    Accepts a path or a ParsedDocument; PDFs are classified page by page, so a
+    PDF whose cover is scanned but whose body has text routes as 'mixedpdf'.
+    """
+    try:
+        return parse_document(file).route
     except Exception as e:
         print(f"Error in file_router: {e}")
         return 'pdf'  # Default fallback
 
-def encode_image(image) -> str:
-    buffer = BytesIO()
-    image.save(buffer, format="PNG")
-    return base64.b64encode(buffer.getvalue()).decode("utf-8")
-
 # --- LLM Setup ---
 
-model = ChatGoogleGenerativeAI(model='gemini-2.0-flash')
-
-def image_summarize(model, base64_image: str, prompt: str) -> str:
-    msg = model.invoke([
-        HumanMessage(
-            content=[
-                {"type": "text", "text": prompt},
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{base64_image}"},
-                },
-            ]
-        )
-    ])
+# Page and image summaries describe fixed content, so re-ingesting a file reuses them
+model = get_llm('gemini-2.0-flash', cache=True)
+
+def encode_image(image) -> List[ImagePayload]:
+    """Downscaled, compressed and (for very tall pages) tiled payloads for one vision request"""
+    return build_image_payloads(image)
+
+def image_summarize(model, payloads: List[ImagePayload], prompt: str) -> str:
+    content = [{"type": "text", "text": prompt}]
+    content.extend({"type": "image_url", "image_url": {"url": payload.url}} for payload in payloads)
+    msg = model.invoke([HumanMessage(content=content)], config={'metadata': {'chain_name': 'image_summary'}})
     return msg.content
 
 # --- Image Handlers ---
 
 def image_handler(image):
-    base64_img = encode_image(image)
-    summary = image_summarize(model, base64_img, prompt=image_prompt)
-    with open('example.txt', 'w') as f:
-        f.write(summary)
-    return summary
-
-def image_handler_append(image):
-    base64_img = encode_image(image)
-    summary = image_summarize(model, base64_img, prompt=image_prompt)
-    with open('example.txt', 'a') as f:
-        f.write(summary + '\n')
-    return summary
+    """Summarize one image; the summary is returned, never written to a shared file"""
+    payloads = encode_image(image)
+    return image_summarize(model, payloads, prompt=image_prompt)
+
+def page_handler(image):
+    """Read one scanned page: local OCR when it is confident, the vision model otherwise"""
+    text = ocr_page_text(image)
+    if text is not None:
+        return text
+    return image_handler(image)
+
+def get_failure_metadata(failed_pages: List[int]) -> dict:
+    """Chunk metadata marking a file whose failed pages were left out, so it is not recorded as ingested"""
+    if not failed_pages:
+        return {}
+    print(f"Pages {failed_pages} could not be summarized and were left out")
+    return {'summary_incomplete': True, 'summary_failed_pages': ','.join(map(str, failed_pages))}
+
+def save_summary_artifacts(file_hash, filename: str, summaries: dict):
+    """Keep a run's page summaries in the artifact store, when ARTIFACT_STORE_PATH is set"""
+    save_job_artifacts(f"{filename}_{(file_hash or 'nohash')[:12]}", summaries, {
+        'filename': filename,
+        'file_hash': file_hash
+    })
 
 # --- PowerPoint Handler ---
 
@@ -248,19 +270,18 @@ def extract_word_content(filepath: str):
 
 # --- Enhanced Vectorization Functions ---
 
-def vectorize_text(text: str, company_name: str, filename: str = "text_input", base_metadata: dict = None):
-    """Vectorize text content with metadata"""
+def vectorize_text(text: str, company_name: str, filename: str = "text_input", base_metadata: dict = None, progress_callback=None):
+    """Vectorize text content with metadata.
+
+    Chunks of a real file (base_metadata carries its file_hash) go into the
+    company's shared collection; error placeholders stay in memory.
+    """
+    collection_name = f"{company_name}_{filename}".replace(" ", "_").replace("-", "_").lower()
+    docs = []
     try:
-        splitter = RecursiveCharacterTextSplitter(chunk_size=600, chunk_overlap=50)
+        splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=TEXT_CHUNK_OVERLAP)
         docs = splitter.split_text(text)
         
-        # Create persist directory
-        persist_directory = os.path.join(chroma_path, company_name, filename)
-        os.makedirs(persist_directory, exist_ok=True)
-        
-        # Create collection name (sanitize company name)
-        collection_name = f"{company_name}_{filename}".replace(" ", "_").replace("-", "_").lower()
-        
         # Create metadata for each chunk
         metadatas = []
         for i, chunk in enumerate(docs):
@@ -273,36 +294,44 @@ def vectorize_text(text: str, company_name: str, filename: str = "text_input", b
                 'source_document': filename
             })
             metadatas.append(chunk_metadata)
-        
-        vectorstore = Chroma.from_texts(
+
+        if progress_callback:
+            progress_callback('embedding', 0, len(docs))
+
+        file_hash = (base_metadata or {}).get('file_hash')
+        if file_hash:
+            return replace_file_texts(company_name, file_hash, docs, metadatas)
+
+        return Chroma.from_texts(
             texts=docs,
-            embedding=HuggingFaceEmbeddings(),
+            embedding=get_embeddings(),
             metadatas=metadatas,
-            persist_directory=persist_directory,
             collection_name=collection_name
         )
-        return vectorstore
         
     except Exception as e:
         print(f"Error in vectorize_text: {e}")
         # Fallback to in-memory store
+        docs = docs or [text or "Error processing text"]
         metadatas = [{'error': str(e), 'fallback': True} for _ in docs]
         vectorstore = Chroma.from_texts(
             texts=docs,
-            embedding=HuggingFaceEmbeddings(),
+            embedding=get_embeddings(),
             metadatas=metadatas,
             collection_name=f"fallback_{collection_name}"
         )
         return vectorstore
 
-def vectorize_powerpoint(filepath: str, company_name: str):
+def vectorize_powerpoint(filepath: str, company_name: str, progress_callback=None):
     """Vectorize PowerPoint presentations"""
     try:
+        parsed = parse_document(filepath)
+        filepath = parsed.filepath
         content, slide_count = extract_ppt_content(filepath)
         filename = get_filename(filepath)
         
         # Create base metadata
-        base_metadata = create_base_metadata(filepath, company_name, 'powerpoint')
+        base_metadata = create_base_metadata(filepath, company_name, 'powerpoint', parsed.file_hash)
         base_metadata.update({
             'total_slides': slide_count,
             'content_source': 'powerpoint_extraction',
@@ -311,7 +340,7 @@ def vectorize_powerpoint(filepath: str, company_name: str):
             'supports_shapes': True
         })
         
-        return vectorize_text(content, company_name, filename, base_metadata)
+        return vectorize_text(content, company_name, filename, base_metadata, progress_callback)
         
     except Exception as e:
         print(f"Error in vectorize_powerpoint: {e}")
@@ -322,14 +351,16 @@ def vectorize_powerpoint(filepath: str, company_name: str):
         }
         return vectorize_text("Error processing PowerPoint file", company_name, "error_ppt", error_metadata)
 
-def vectorize_word_document(filepath: str, company_name: str):
+def vectorize_word_document(filepath: str, company_name: str, progress_callback=None):
     """Vectorize Word documents"""
     try:
+        parsed = parse_document(filepath)
+        filepath = parsed.filepath
         content, paragraph_count = extract_word_content(filepath)
         filename = get_filename(filepath)
         
         # Create base metadata
-        base_metadata = create_base_metadata(filepath, company_name, 'word_document')
+        base_metadata = create_base_metadata(filepath, company_name, 'word_document', parsed.file_hash)
         base_metadata.update({
             'paragraph_count': paragraph_count,
             'content_source': 'word_extraction',
@@ -338,7 +369,7 @@ def vectorize_word_document(filepath: str, company_name: str):
             'supports_formatting': True
         })
         
-        return vectorize_text(content, company_name, filename, base_metadata)
+        return vectorize_text(content, company_name, filename, base_metadata, progress_callback)
         
     except Exception as e:
         print(f"Error in vectorize_word_document: {e}")
@@ -349,11 +380,13 @@ def vectorize_word_document(filepath: str, company_name: str):
         }
         return vectorize_text("Error processing Word document", company_name, "error_doc", error_metadata)
 
-def vectorize_single_image(image, company_name: str):
+def vectorize_single_image(image, company_name: str, progress_callback=None):
     """Vectorize single images"""
     try:
         # Create base metadata for image
-        base_metadata = create_base_metadata(image, company_name, 'single_image')
+        file_hash = image.file_hash if isinstance(image, ParsedDocument) else None
+        image = image.filepath if isinstance(image, ParsedDocument) else image
+        base_metadata = create_base_metadata(image, company_name, 'single_image', file_hash)
         base_metadata.update({
             'content_source': 'ai_image_summary',
             'ai_model_used': 'gemini-2.0-flash',
@@ -361,68 +394,110 @@ def vectorize_single_image(image, company_name: str):
         })
         
         summary = image_handler(image)
-        filename = "image_single"
-        return vectorize_text(summary, company_name, filename, base_metadata)
+        filename = get_filename(image) if isinstance(image, str) else "image_single"
+        save_summary_artifacts(base_metadata.get('file_hash'), filename, {'image': summary})
+        return vectorize_text(summary, company_name, filename, base_metadata, progress_callback)
     except Exception as e:
         print(f"Error in vectorize_single_image: {e}")
         error_metadata = {'error': str(e), 'file_type': 'single_image'}
         return vectorize_text("Error processing image", company_name, "error_image", error_metadata)
 
-def vectorize_multiple_images(image_path: str, company_name: str):
+def vectorize_multiple_images(image_path, company_name: str, progress_callback=None):
     """Vectorize PDF with images"""
     try:
-        images = convert_from_path(image_path)
+        parsed = parse_document(image_path)
+        image_path = parsed.filepath
+        page_count = get_pdf_page_count(image_path)
         filename = get_filename(image_path)
         
         # Create base metadata
-        base_metadata = create_base_metadata(image_path, company_name, 'pdf_images')
+        base_metadata = create_base_metadata(image_path, company_name, 'pdf_images', parsed.file_hash)
         base_metadata.update({
-            'total_pages': len(images),
+            'total_pages': page_count,
             'content_source': 'ai_image_summary',
             'ai_model_used': 'gemini-2.0-flash',
             'processing_method': 'pdf_to_images_to_text',
-            'conversion_tool': 'pdf2image'
+            'conversion_tool': 'pdf2image',
+            'raster_dpi': PDF_RASTER_DPI,
+            'raster_grayscale': PDF_RASTER_GRAYSCALE,
+            'ocr_backend': OCR_BACKEND
         })
         
-        summary = ''
-        for i, image in enumerate(images):
-            if i == 0:
-                summary = image_handler(image)
-            else:
-                summary += image_handler_append(image)
+        # Pages are rendered one at a time, summarized concurrently and reassembled in page order
+        summaries = summarize_pages(
+            iter_pdf_pages(image_path),
+            page_handler,
+            progress_callback=progress_callback,
+            total=page_count
+        )
+        save_summary_artifacts(parsed.file_hash, filename, {
+            f"page_{page_number:04d}": summary for page_number, summary in summaries.items() if summary is not None
+        })
+        base_metadata.update(get_failure_metadata(
+            [page_number for page_number, summary in summaries.items() if summary is None]
+        ))
+        summary = '\n\n'.join(summary for summary in summaries.values() if summary is not None)
 
-        return vectorize_text(summary, company_name, filename, base_metadata)
+        return vectorize_text(summary, company_name, filename, base_metadata, progress_callback)
     except Exception as e:
         print(f"Error in vectorize_multiple_images: {e}")
         error_metadata = {'error': str(e), 'file_type': 'pdf_images'}
         return vectorize_text("Error processing PDF images", company_name, "error_pdf_images", error_metadata)
 
-def vectorize_docs(filepath: str, company_name: str):
+def summarize_scanned_pages(parsed: ParsedDocument, progress_callback=None):
+    """Summarize only the scanned pages of a mixed PDF, as page-level documents.
+
+    Returns (documents, page numbers that could not be summarized).
+    """
+    page_numbers = parsed.image_page_numbers
+    if PDF_MAX_PAGES:
+        page_numbers = page_numbers[:PDF_MAX_PAGES]
+    summaries = summarize_pages(
+        iter_pdf_pages(parsed.filepath, page_numbers=page_numbers),
+        page_handler,
+        progress_callback=progress_callback,
+        total=len(page_numbers)
+    )
+    save_summary_artifacts(parsed.file_hash, get_filename(parsed.filepath), {
+        f"page_{page_number:04d}": summary for page_number, summary in summaries.items() if summary is not None
+    })
+    docs = [
+        LangchainDocument(
+            page_content=summary,
+            metadata={'source': parsed.filepath, 'page': page_number - 1, 'content_source': 'ai_image_summary'}
+        )
+        for page_number, summary in summaries.items() if summary is not None
+    ]
+    return docs, [page_number for page_number, summary in summaries.items() if summary is None]
+
+def vectorize_docs(filepath, company_name: str, progress_callback=None):
     """Vectorize PDF documents"""
     try:
-        loader = PyPDFLoader(filepath)
-        docs = loader.load()
-        splitter = RecursiveCharacterTextSplitter(chunk_size=600, chunk_overlap=80)
-        chunks = splitter.split_documents(docs)
+        parsed = parse_document(filepath)
+        filepath = parsed.filepath
         filename = get_filename(filepath)
+        docs = parsed.text_pages
+
+        # Scanned pages inside an otherwise text PDF go through the image path
+        scanned_docs, failed_pages = summarize_scanned_pages(parsed, progress_callback) if parsed.image_page_numbers else ([], [])
+        docs = sorted(docs + scanned_docs, key=lambda doc: doc.metadata.get('page', 0))
+
+        splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=PDF_CHUNK_OVERLAP)
+        chunks = splitter.split_documents(docs)
         
         # Create base metadata
-        base_metadata = create_base_metadata(filepath, company_name, 'pdf_document')
+        base_metadata = create_base_metadata(filepath, company_name, 'pdf_document', parsed.file_hash)
         base_metadata.update({
-            'total_pages': len(docs),
+            'total_pages': len(parsed.pages),
+            'text_pages': len(parsed.text_page_numbers),
+            'scanned_pages': len(scanned_docs),
             'total_chunks_created': len(chunks),
-            'chunk_size': 600,
-            'chunk_overlap': 80,
-            'content_source': 'direct_pdf_text',
+            'chunk_size': CHUNK_SIZE,
+            'chunk_overlap': PDF_CHUNK_OVERLAP,
+            'content_source': 'direct_pdf_text' if not scanned_docs else 'direct_pdf_text_with_ai_image_summary',
             'loader_used': 'PyPDFLoader'
         })
-        
-        # Create persist directory
-        persist_directory = os.path.join("chroma_store", company_name, filename)
-        os.makedirs(persist_directory, exist_ok=True)
-        
-        # Create collection name (sanitize)
-        collection_name = f"{company_name}_{filename}".replace(" ", "_").replace("-", "_").lower()
+        base_metadata.update(get_failure_metadata(failed_pages))
         
         # Add metadata to each chunk
         for i, chunk in enumerate(chunks):
@@ -433,22 +508,20 @@ def vectorize_docs(filepath: str, company_name: str):
                 'chunk_char_count': len(chunk.page_content)
             })
         
-        vectorstore = Chroma.from_documents(
-            documents=chunks,
-            embedding=HuggingFaceEmbeddings(),
-            persist_directory=persist_directory,
-            collection_name=collection_name
-        )
-        return vectorstore
+        if progress_callback:
+            progress_callback('embedding', 0, len(chunks))
+
+        # All files of a company share one collection; file_hash tells them apart
+        return replace_file_documents(company_name, parsed.file_hash, chunks)
         
     except Exception as e:
         print(f"Error in vectorize_docs: {e}")
         # Fallback to in-memory store
         try:
-            loader = PyPDFLoader(filepath)
-            docs = loader.load()
-            splitter = RecursiveCharacterTextSplitter(chunk_size=600, chunk_overlap=80)
-            chunks = splitter.split_documents(docs)
+            parsed = parse_document(filepath)
+            filename = get_filename(parsed.filepath)
+            splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=PDF_CHUNK_OVERLAP)
+            chunks = splitter.split_documents(parsed.pages)
             
             # Add error metadata to fallback
             error_metadata = {'error': str(e), 'fallback': True, 'file_type': 'pdf_document'}
@@ -457,7 +530,7 @@ def vectorize_docs(filepath: str, company_name: str):
             
             vectorstore = Chroma.from_documents(
                 documents=chunks,
-                embedding=HuggingFaceEmbeddings(),
+                embedding=get_embeddings(),
                 collection_name=f"fallback_{company_name}_{filename}".replace(" ", "_").lower()
             )
             return vectorstore
@@ -466,29 +539,84 @@ def vectorize_docs(filepath: str, company_name: str):
             # Return minimal vectorstore
             return Chroma.from_texts(
                 texts=["Error loading document"],
-                embedding=HuggingFaceEmbeddings(),
+                embedding=get_embeddings(),
                 metadatas=[{'error': str(fallback_error), 'critical_failure': True}],
                 collection_name="error_fallback"
             )
 
 # --- Entry Point for Routing ---
 
-def vectorize(filepath: str, company_name: str):
-    """Main vectorization function with enhanced file type support"""
+def load_cached_vectorstore(cache_key: str):
+    """Return the company collection recorded for an ingestion cache key, if it still holds the file"""
+    entry = lookup_ingestion(cache_key)
+    if not entry:
+        return None
+    try:
+        vectorstore = get_company_store(entry['company_name'])
+        return vectorstore if has_file_chunks(vectorstore, entry['file_hash']) else None
+    except Exception as e:
+        print(f"Error reopening cached vectorstore: {e}")
+        return None
+
+def remember_vectorstore(cache_key: str, vectorstore, filepath: str, company_name: str, file_hash: str):
+    """Record an ingested file in the ingestion manifest.
+
+    Error and in-memory fallback stores are never recorded, only files whose
+    chunks landed in the company collection. Files with pages that could not
+    be summarized are not recorded either, so the next upload retries them.
+    """
+    if not is_company_store(vectorstore, company_name) or not has_file_chunks(vectorstore, file_hash):
+        return
+    if has_incomplete_chunks(vectorstore, file_hash):
+        print(f"Not recording {os.path.basename(filepath)} as ingested: some pages could not be summarized")
+        return
+    record_ingestion(cache_key, {
+        'company_name': company_name,
+        'filename': os.path.basename(filepath),
+        'file_hash': file_hash,
+        'persist_directory': vectorstore._persist_directory,
+        'collection_name': vectorstore._collection.name,
+        'embedding_model': get_embedding_model_id(),
+        'chunk_params': INGESTION_PARAMS
+    })
+
+def vectorize(filepath, company_name: str, progress_callback=None):
+    """Main vectorization function with enhanced file type support.
+
+    filepath may be a path or an already built ParsedDocument.
+    progress_callback(stage, done, total) receives 'parsing', per-page
+    'summarizing' progress for scanned PDFs, then 'embedding'.
+    """
     try:
-        file_type = file_router(filepath)
+        if progress_callback:
+            progress_callback('parsing', 0, 1)
+        parsed = parse_document(filepath)
+        filepath = parsed.filepath
+
+        # Identical uploads (same bytes, same settings) reuse the existing collection
+        file_hash = parsed.file_hash
+        cache_key = make_ingestion_key(file_hash, company_name, INGESTION_PARAMS, get_embedding_model_id())
+        cached_vectorstore = load_cached_vectorstore(cache_key)
+        if cached_vectorstore is not None:
+            print(f"Ingestion cache hit for {os.path.basename(filepath)}")
+            return cached_vectorstore
+
+        file_type = file_router(parsed)
         print(f"Detected file type: {file_type}")
 
         if file_type == 'imagesingle':
-            return vectorize_single_image(filepath, company_name)
+            vectorstore = vectorize_single_image(parsed, company_name, progress_callback)
         elif file_type == 'imagepdf':
-            return vectorize_multiple_images(filepath, company_name)
+            vectorstore = vectorize_multiple_images(parsed, company_name, progress_callback)
         elif file_type == 'powerpoint':
-            return vectorize_powerpoint(filepath, company_name)
+            vectorstore = vectorize_powerpoint(parsed, company_name, progress_callback)
         elif file_type == 'word_document':
-            return vectorize_word_document(filepath, company_name)
+            vectorstore = vectorize_word_document(parsed, company_name, progress_callback)
         else:
-            return vectorize_docs(filepath, company_name)
+            vectorstore = vectorize_docs(parsed, company_name, progress_callback)
+
+        remember_vectorstore(cache_key, vectorstore, filepath, company_name, file_hash)
+        return vectorstore
             
     except Exception as e:
         print(f"Error in vectorize main function: {e}")
@@ -502,7 +630,7 @@ def vectorize(filepath: str, company_name: str):
         }
         return Chroma.from_texts(
             texts=[f"Error processing file: {str(e)}"],
-            embedding=HuggingFaceEmbeddings(),
+            embedding=get_embeddings(),
             metadatas=[error_metadata],
             collection_name="ultimate_fallback"
         )
@@ -1,14 +1,7 @@
+from Common_Utils.json_stream import strip_code_fences, parse_llm_json
+
 def format_docs(docs):
     return '\n\n'.join(doc.page_content for doc in docs)
 
-def clean_to_list(result:str) :
-    result = result.strip()
-    if result.startswith('```python'):
-        result = result[len('```python'):].strip()
-    elif result.startswith('```json'):
-        result = result[len('```json'):].strip()
-    elif result.startswith('```'):
-        result = result[len('```'):].strip()
-    if result.endswith('```'):
-        result = result[:-3].strip()
-    return result
+# Fence stripping and JSON parsing are shared by every chain; see Common_Utils/json_stream.py
+clean_to_list = strip_code_fences
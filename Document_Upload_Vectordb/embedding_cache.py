@@ -0,0 +1,169 @@
+import os
+import json
+import hashlib
+import threading
+from typing import List
+
+import numpy as np
+from filelock import FileLock
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_chunk_text(text: str) -> str:
+    """Collapse whitespace so re-flowed copies of the same boilerplate hit the cache"""
+    return " ".join(text.split())
+
+
+def get_text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Append-only on-disk vector cache: float16 rows in a memory-mapped file plus a JSON index.
+
+    vectors.f16 holds one row per cached chunk; index.json maps the chunk text
+    hash to its row. The index is rewritten atomically after the rows are
+    appended, so it never points past the end of the vector file.
+
+    Several processes may share a cache directory: appends take a file lock
+    (cache.lock), reload the index other processes saved, and drop rows an
+    interrupted append left past the end of the index before writing, so
+    every key keeps pointing at its own vector.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.vectors_path = os.path.join(cache_dir, "vectors.f16")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(os.path.join(cache_dir, "cache.lock"))
+        self._dim = None
+        self._rows = {}
+        self._vectors = None
+        self._index_mtime = None
+        self._load()
+
+    def _load(self):
+        try:
+            self._index_mtime = os.path.getmtime(self.index_path)
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self._dim = index['dim']
+            self._rows = index['rows']
+            self._open_vectors()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading embedding cache, starting empty: {e}")
+            self._dim, self._rows, self._vectors = None, {}, None
+
+    def _refresh(self):
+        """Pick up rows other processes appended since the index was last read (file lock held)"""
+        try:
+            mtime = os.path.getmtime(self.index_path)
+        except FileNotFoundError:
+            return
+        if mtime != self._index_mtime:
+            self._load()
+
+    def _truncate_orphan_rows(self):
+        """Cut rows past the end of the index, left by an append that never saved its index (file lock held)"""
+        if not self._dim or not os.path.exists(self.vectors_path):
+            return
+        expected_size = len(self._rows) * self._dim * np.dtype(np.float16).itemsize
+        if os.path.getsize(self.vectors_path) > expected_size:
+            print(f"Embedding cache: dropping {self.vectors_path} rows not in the index")
+            with open(self.vectors_path, 'r+b') as f:
+                f.truncate(expected_size)
+
+    def _open_vectors(self):
+        row_count = len(self._rows)
+        if not self._dim or not row_count:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float16, mode='r', shape=(row_count, self._dim))
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'dim': self._dim, 'rows': self._rows}, f)
+        os.replace(tmp_path, self.index_path)
+        self._index_mtime = os.path.getmtime(self.index_path)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get_many(self, keys: List[str]) -> dict:
+        """Return {key: vector} for the keys that are cached"""
+        with self._lock:
+            if self._vectors is None:
+                return {}
+            return {
+                key: self._vectors[self._rows[key]].astype(np.float32).tolist()
+                for key in keys if key in self._rows
+            }
+
+    def put_many(self, keys: List[str], vectors: List[List[float]]):
+        """Append new vectors; keys that are already cached are ignored"""
+        with self._lock:
+            if all(key in self._rows for key in keys):
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with self._file_lock:
+                self._refresh()
+                new_items = [(key, vector) for key, vector in zip(keys, vectors) if key not in self._rows]
+                if not new_items:
+                    return
+                array = np.asarray([vector for _, vector in new_items], dtype=np.float16)
+                if self._dim is None:
+                    self._dim = int(array.shape[1])
+                elif array.shape[1] != self._dim:
+                    print(f"Embedding cache dimension mismatch ({array.shape[1]} != {self._dim}), not caching")
+                    return
+
+                self._vectors = None  # release the map before growing the file
+                self._truncate_orphan_rows()
+                with open(self.vectors_path, 'ab') as f:
+                    f.write(array.tobytes())
+                next_row = len(self._rows)
+                for offset, (key, _) in enumerate(new_items):
+                    self._rows[key] = next_row + offset
+                self._save_index()
+                self._open_vectors()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only embeds chunks missing from an EmbeddingCache.
+
+    Misses are deduplicated and sent to the underlying model in batches of
+    batch_size. Queries are not cached.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, batch_size: int = 64):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        normalized = [normalize_chunk_text(text) for text in texts]
+        keys = [get_text_hash(text) for text in normalized]
+        vectors = self.cache.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, normalized):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+
+        missing_keys = list(missing)
+        for start in range(0, len(missing_keys), self.batch_size):
+            batch_keys = missing_keys[start:start + self.batch_size]
+            batch_vectors = self.embeddings.embed_documents([missing[key] for key in batch_keys])
+            self.cache.put_many(batch_keys, batch_vectors)
+            vectors.update(zip(batch_keys, batch_vectors))
+
+        if texts:
+            print(f"Embedding cache: {len(texts) - len(missing_keys)}/{len(texts)} chunks reused")
+        return [list(vectors[key]) for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
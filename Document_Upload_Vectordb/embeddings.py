@@ -0,0 +1,78 @@
+import os
+import threading
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+from .embedding_cache import EmbeddingCache, CachedEmbeddings
+from Common_Utils.fake_providers import EMBEDDING_PROVIDER, get_fake_embeddings
+from dotenv import load_dotenv
+load_dotenv()
+
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/all-mpnet-base-v2")
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE", "cpu")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH") or os.path.join(os.getenv("CHROMA_PATH") or ".", "embedding_cache")
+
+
+def get_embedding_model_id(model_name: str = None) -> str:
+    """Embedding model qualified by provider when it is not HuggingFace, e.g. 'fake:all-mpnet-base-v2'"""
+    model_name = model_name or EMBEDDING_MODEL_NAME
+    return model_name if EMBEDDING_PROVIDER == "huggingface" else f"{EMBEDDING_PROVIDER}:{model_name}"
+
+
+class SharedEmbeddings(Embeddings):
+    """Lazily loaded HuggingFace embedding model shared by every session in the process.
+
+    The sentence-transformers model is loaded on the first embed call, and
+    encoding is serialized because the underlying tokenizer is not safe to use
+    from several threads at once.
+    """
+
+    def __init__(self, model_name: str, device: str):
+        self.model_name = model_name
+        self.device = device
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            print(f"Loading embedding model {self.model_name} on {self.device}")
+            self._model = HuggingFaceEmbeddings(
+                model_name=self.model_name,
+                model_kwargs={'device': self.device}
+            )
+        return self._model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            return self._get_model().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with self._lock:
+            return self._get_model().embed_query(text)
+
+
+_shared_embeddings = {}
+_shared_embeddings_lock = threading.Lock()
+
+
+def get_embeddings(model_name: str = None, device: str = None) -> Embeddings:
+    """Return the process-wide embedding provider for a model/device pair.
+
+    Unless EMBEDDING_CACHE_ENABLED is off, chunk embeddings are cached on disk
+    per model, so boilerplate repeated across RFIs is only embedded once.
+    EMBEDDING_PROVIDER=fake returns offline hash-based embeddings instead.
+    """
+    if EMBEDDING_PROVIDER == "fake":
+        return get_fake_embeddings()
+    key = (model_name or EMBEDDING_MODEL_NAME, device or EMBEDDING_DEVICE)
+    with _shared_embeddings_lock:
+        if key not in _shared_embeddings:
+            embeddings = SharedEmbeddings(*key)
+            if EMBEDDING_CACHE_ENABLED:
+                cache_dir = os.path.join(EMBEDDING_CACHE_PATH, key[0].replace("/", "__"))
+                embeddings = CachedEmbeddings(embeddings, EmbeddingCache(cache_dir), EMBEDDING_BATCH_SIZE)
+            _shared_embeddings[key] = embeddings
+        return _shared_embeddings[key]
@@ -0,0 +1,116 @@
+import os
+import base64
+from io import BytesIO
+from dataclasses import dataclass
+from typing import List
+
+from PIL import Image
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# Longest side sent to the vision model; larger images are downscaled
+IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", "1600"))
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "JPEG").upper()
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "80"))
+IMAGE_GRAYSCALE = os.getenv("IMAGE_GRAYSCALE", "false").lower() in ("1", "true", "yes")
+# Pages taller than this height/width ratio are split into tiles
+IMAGE_MAX_ASPECT = float(os.getenv("IMAGE_MAX_ASPECT", "2.0"))
+IMAGE_TILE_OVERLAP = float(os.getenv("IMAGE_TILE_OVERLAP", "0.05"))
+# Base64 bytes allowed for all images of one request
+IMAGE_MAX_REQUEST_BYTES = int(os.getenv("IMAGE_MAX_REQUEST_BYTES", "1500000"))
+
+MIN_JPEG_QUALITY = 40
+MIN_DIMENSION = 512
+
+
+@dataclass
+class ImagePayload:
+    data: str
+    mime_type: str
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.data}"
+
+
+def load_image(image):
+    """Accept a PIL image or a path to an image file"""
+    if isinstance(image, Image.Image):
+        return image
+    with Image.open(image) as opened:
+        opened.load()
+        return opened.copy()
+
+
+def split_tall_image(image, max_aspect: float = IMAGE_MAX_ASPECT, overlap: float = IMAGE_TILE_OVERLAP):
+    """Split a very tall image into overlapping tiles of at most max_aspect height/width"""
+    width, height = image.size
+    tile_height = int(width * max_aspect)
+    if max_aspect <= 0 or height <= tile_height:
+        return [image]
+
+    step = max(1, int(tile_height * (1 - overlap)))
+    tiles = []
+    top = 0
+    while True:
+        bottom = min(top + tile_height, height)
+        tiles.append(image.crop((0, top, width, bottom)))
+        if bottom >= height:
+            return tiles
+        top += step
+
+
+def prepare_image(image, max_dimension: int = IMAGE_MAX_DIMENSION, grayscale: bool = IMAGE_GRAYSCALE):
+    """Downscale to max_dimension and convert to a mode the output format can store"""
+    if grayscale:
+        image = image.convert("L")
+    elif image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    if max(image.size) > max_dimension:
+        image = image.copy()
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    return image
+
+
+def encode_payload(image, image_format: str = IMAGE_FORMAT, quality: int = IMAGE_JPEG_QUALITY) -> ImagePayload:
+    buffer = BytesIO()
+    if image_format == "PNG":
+        image.save(buffer, format="PNG", optimize=True)
+    else:
+        image_format = "JPEG"
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    data = base64.b64encode(buffer.getvalue()).decode("utf-8")
+    return ImagePayload(data=data, mime_type=f"image/{image_format.lower()}")
+
+
+def build_image_payloads(image, max_bytes: int = IMAGE_MAX_REQUEST_BYTES) -> List[ImagePayload]:
+    """Encode an image for one vision request, as one or more tiles within a byte budget.
+
+    JPEG quality is lowered first, then the tiles are shrunk, until the total
+    base64 size fits max_bytes or the minimum quality and size are reached.
+    """
+    image = load_image(image)
+    tiles = split_tall_image(image)
+    max_dimension = IMAGE_MAX_DIMENSION
+    quality = IMAGE_JPEG_QUALITY
+
+    while True:
+        prepared = [prepare_image(tile, max_dimension) for tile in tiles]
+        payloads = [encode_payload(tile, quality=quality) for tile in prepared]
+        total_size = sum(payload.size for payload in payloads)
+        if total_size <= max_bytes:
+            return payloads
+
+        if IMAGE_FORMAT != "PNG" and quality > MIN_JPEG_QUALITY:
+            quality = max(MIN_JPEG_QUALITY, quality - 15)
+        elif max_dimension > MIN_DIMENSION:
+            max_dimension = max(MIN_DIMENSION, int(max_dimension * 0.75))
+        else:
+            print(f"Image payload is {total_size} bytes, over the {max_bytes} byte budget")
+            return payloads
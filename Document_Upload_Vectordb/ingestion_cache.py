@@ -0,0 +1,86 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+from dotenv import load_dotenv
+load_dotenv()
+
+chroma_path = os.getenv("CHROMA_PATH")
+
+# Manifest lives next to the vector stores it describes unless overridden
+MANIFEST_PATH = os.getenv("INGESTION_MANIFEST_PATH") or os.path.join(chroma_path or ".", "ingestion_manifest.json")
+
+_manifest_lock = threading.Lock()
+
+
+def make_ingestion_key(file_hash: str, company_name: str, chunk_params: dict, embedding_model: str):
+    """Build the manifest key for a file ingested with the given chunking and embedding settings"""
+    if not file_hash:
+        return None
+    payload = json.dumps({
+        'file_hash': file_hash,
+        'company_name': company_name,
+        'chunk_params': chunk_params,
+        'embedding_model': embedding_model
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _load_manifest():
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Error reading ingestion manifest: {e}")
+        return {}
+
+
+def _save_manifest(manifest: dict):
+    """Write the manifest atomically so concurrent readers never see a partial file"""
+    os.makedirs(os.path.dirname(MANIFEST_PATH) or ".", exist_ok=True)
+    tmp_path = f"{MANIFEST_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def lookup_ingestion(key: str):
+    """Return the manifest entry for a key if its vector store still exists on disk"""
+    if not key:
+        return None
+    with _manifest_lock:
+        entry = _load_manifest().get(key)
+    if not entry:
+        return None
+    if not os.path.isdir(entry.get('persist_directory') or ""):
+        forget_ingestion(key)
+        return None
+    return entry
+
+
+def record_ingestion(key: str, entry: dict):
+    """Store a manifest entry for a successfully ingested file"""
+    if not key:
+        return
+    try:
+        with _manifest_lock:
+            manifest = _load_manifest()
+            manifest[key] = dict(entry, recorded_timestamp=datetime.now().isoformat())
+            _save_manifest(manifest)
+    except Exception as e:
+        print(f"Error updating ingestion manifest: {e}")
+
+
+def forget_ingestion(key: str):
+    """Drop a manifest entry, e.g. when its vector store was deleted"""
+    try:
+        with _manifest_lock:
+            manifest = _load_manifest()
+            if manifest.pop(key, None) is not None:
+                _save_manifest(manifest)
+    except Exception as e:
+        print(f"Error updating ingestion manifest: {e}")
@@ -0,0 +1,99 @@
+"""Move legacy per-file Chroma stores into the per-company collection layout.
+
+Old layout:  <root>/<company>/<filename>/chroma.sqlite3   (one collection per file)
+New layout:  <CHROMA_PATH>/<company>/chroma.sqlite3       (one collection per company)
+
+Embeddings are copied as stored, nothing is re-embedded. Chunks without a
+file_hash (error placeholders) are skipped.
+
+Usage:
+    python -m Document_Upload_Vectordb.migrate_chroma [--root PATH ...] [--dry-run] [--remove-legacy]
+"""
+import os
+import shutil
+import argparse
+
+import chromadb
+
+from .company_store import chroma_path, get_company_store, get_chunk_id
+
+LEGACY_ROOTS = [chroma_path, "chroma_store"]
+BATCH_SIZE = 500
+
+
+def find_legacy_stores(root: str):
+    """Yield (company_name, legacy_directory) for every per-file store under root"""
+    if not root or not os.path.isdir(root):
+        return
+    for company_name in sorted(os.listdir(root)):
+        company_dir = os.path.join(root, company_name)
+        if not os.path.isdir(company_dir):
+            continue
+        for entry in sorted(os.listdir(company_dir)):
+            legacy_dir = os.path.join(company_dir, entry)
+            if os.path.isfile(os.path.join(legacy_dir, "chroma.sqlite3")):
+                yield company_name, legacy_dir
+
+
+def migrate_legacy_store(company_name: str, legacy_dir: str, dry_run: bool = False):
+    """Copy every collection of one legacy store into the company collection; returns (copied, skipped)"""
+    client = chromadb.PersistentClient(path=legacy_dir)
+    target = None if dry_run else get_company_store(company_name)._collection
+    copied = skipped = 0
+
+    for collection in client.list_collections():
+        name = collection if isinstance(collection, str) else collection.name
+        legacy_collection = client.get_collection(name)
+        offset = 0
+        while True:
+            batch = legacy_collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=BATCH_SIZE,
+                offset=offset
+            )
+            if not batch['ids']:
+                break
+            offset += len(batch['ids'])
+
+            rows = [
+                (metadata, document, embedding)
+                for metadata, document, embedding in zip(batch['metadatas'], batch['documents'], batch['embeddings'])
+                if metadata and metadata.get('file_hash')
+            ]
+            skipped += len(batch['ids']) - len(rows)
+            if not rows:
+                continue
+
+            ids = [get_chunk_id(metadata['file_hash'], metadata.get('chunk_index', 0)) for metadata, _, _ in rows]
+            if not dry_run:
+                target.upsert(
+                    ids=ids,
+                    metadatas=[row[0] for row in rows],
+                    documents=[row[1] for row in rows],
+                    embeddings=[list(row[2]) for row in rows]
+                )
+            copied += len(rows)
+
+    return copied, skipped
+
+
+def migrate_legacy_stores(roots=None, dry_run: bool = False, remove_legacy: bool = False):
+    """Migrate all legacy stores found under the given roots"""
+    for root in roots or LEGACY_ROOTS:
+        for company_name, legacy_dir in find_legacy_stores(root):
+            try:
+                copied, skipped = migrate_legacy_store(company_name, legacy_dir, dry_run)
+                print(f"{legacy_dir} -> {company_name}: {copied} chunks copied, {skipped} skipped")
+                if remove_legacy and not dry_run:
+                    shutil.rmtree(legacy_dir)
+            except Exception as e:
+                print(f"Error migrating {legacy_dir}: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate per-file Chroma stores to per-company collections")
+    parser.add_argument("--root", action="append", help="Legacy root directory (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be migrated")
+    parser.add_argument("--remove-legacy", action="store_true", help="Delete legacy directories after copying")
+    args = parser.parse_args()
+    migrate_legacy_stores(args.root, args.dry_run, args.remove_legacy)
@@ -0,0 +1,102 @@
+"""Optional local OCR for scanned pages.
+
+With OCR_BACKEND=tesseract (needs `pip install pytesseract` and the tesseract
+binary) scanned pages are read locally first. The vision model is only called
+for pages where OCR is unsure or finds too little text, e.g. diagrams and
+photos. Any other value, a missing package or a missing binary disables OCR and
+every page goes to the vision model as before.
+"""
+import os
+import threading
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+load_dotenv()
+
+OCR_BACKEND = os.getenv("OCR_BACKEND", "none").lower()
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+# Mean word confidence (0-100) below which the page goes to the vision model
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "75"))
+# Pages with fewer recognised words are treated as mostly graphics
+OCR_MIN_WORDS = int(os.getenv("OCR_MIN_WORDS", "40"))
+
+
+@dataclass
+class OcrResult:
+    text: str
+    confidence: float
+    word_count: int
+
+    @property
+    def is_usable(self) -> bool:
+        return self.word_count >= OCR_MIN_WORDS and self.confidence >= OCR_MIN_CONFIDENCE
+
+
+class TesseractOcr:
+    """Tesseract through pytesseract; lines are rebuilt from word boxes in reading order"""
+
+    name = "tesseract"
+
+    def __init__(self, lang: str = OCR_LANG):
+        import pytesseract
+        pytesseract.get_tesseract_version()  # fail early when the binary is missing
+        self._pytesseract = pytesseract
+        self.lang = lang
+
+    def extract(self, image) -> OcrResult:
+        data = self._pytesseract.image_to_data(image, lang=self.lang, output_type=self._pytesseract.Output.DICT)
+
+        lines = {}
+        confidences = []
+        for i, word in enumerate(data['text']):
+            confidence = float(data['conf'][i])
+            if not word.strip() or confidence < 0:
+                continue
+            line_key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(line_key, []).append(word)
+            confidences.append(confidence)
+
+        text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+        mean_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return OcrResult(text=text, confidence=mean_confidence, word_count=len(confidences))
+
+
+OCR_BACKENDS = {
+    'tesseract': TesseractOcr,
+}
+
+_ocr_backend = None
+_ocr_backend_loaded = False
+_ocr_backend_lock = threading.Lock()
+
+
+def get_ocr_backend():
+    """The configured OCR backend, or None when OCR is disabled or unavailable"""
+    global _ocr_backend, _ocr_backend_loaded
+    with _ocr_backend_lock:
+        if not _ocr_backend_loaded:
+            _ocr_backend_loaded = True
+            backend_class = OCR_BACKENDS.get(OCR_BACKEND)
+            if backend_class is not None:
+                try:
+                    _ocr_backend = backend_class()
+                    print(f"Using {backend_class.name} OCR for scanned pages")
+                except Exception as e:
+                    print(f"OCR backend {OCR_BACKEND} unavailable, using the vision model only: {e}")
+        return _ocr_backend
+
+
+def ocr_page_text(image):
+    """OCR text of a page image, or None when the vision model should read it instead"""
+    backend = get_ocr_backend()
+    if backend is None:
+        return None
+    try:
+        result = backend.extract(image)
+    except Exception as e:
+        print(f"Error running OCR: {e}")
+        return None
+    if not result.is_usable:
+        print(f"OCR not usable ({result.word_count} words, {result.confidence:.0f}% confidence), using the vision model")
+        return None
+    return result.text
@@ -0,0 +1,88 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from dotenv import load_dotenv
+load_dotenv()
+
+PAGE_SUMMARY_WORKERS = int(os.getenv("PAGE_SUMMARY_WORKERS", "4"))
+# Page-level retries on top of the LLM gateway's, which only retries rate limits and transient API errors
+PAGE_SUMMARY_RETRIES = int(os.getenv("PAGE_SUMMARY_RETRIES", "2"))
+PAGE_SUMMARY_RETRY_BACKOFF = float(os.getenv("PAGE_SUMMARY_RETRY_BACKOFF", "1.5"))
+
+
+def summarize_page(summarize_fn, page, page_number: int, retries: int = None):
+    """Summarize one page, retrying with exponential backoff; None if every attempt failed"""
+    if page is None:
+        print(f"Page {page_number} rendered no image")
+        return None
+    retries = PAGE_SUMMARY_RETRIES if retries is None else retries
+    for attempt in range(retries + 1):
+        try:
+            return summarize_fn(page)
+        except Exception as e:
+            if attempt == retries:
+                print(f"Error summarizing page {page_number} after {retries + 1} attempts: {e}")
+                return None
+            delay = PAGE_SUMMARY_RETRY_BACKOFF * (2 ** attempt)
+            print(f"Retrying page {page_number} in {delay:.1f}s: {e}")
+            time.sleep(delay)
+
+
+def summarize_and_release_page(summarize_fn, page, page_number: int):
+    """Summarize a page and free its image as soon as the summary is back"""
+    try:
+        return summarize_page(summarize_fn, page, page_number)
+    finally:
+        close = getattr(page, 'close', None)
+        if close:
+            close()
+
+
+def summarize_pages(pages, summarize_fn, max_workers: int = None, progress_callback=None, total: int = None):
+    """Summarize page images concurrently and return {page_number: summary} in page order.
+
+    pages yields (page_number, image) pairs, image None for a page that
+    rendered nothing. A page that could not be summarized is None in the
+    result; callers must not embed a placeholder for it or record the file
+    as fully ingested.
+
+    pages may be a lazy iterator: a new page is only pulled once a worker slot
+    frees up, so at most max_workers pages are held in memory at a time.
+
+    progress_callback(stage, done, total) is called from the calling thread each
+    time a page finishes, so it may safely update Streamlit elements.
+    """
+    if total is None and hasattr(pages, '__len__'):
+        total = len(pages)
+    max_workers = max(1, max_workers or PAGE_SUMMARY_WORKERS)
+    page_iter = iter(pages)
+    summaries = {}
+    in_flight = {}
+
+    if progress_callback:
+        progress_callback('summarizing', 0, total or 0)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def submit_next_page():
+            try:
+                page_number, page = next(page_iter)
+            except StopIteration:
+                return False
+            future = executor.submit(summarize_and_release_page, summarize_fn, page, page_number)
+            in_flight[future] = page_number
+            return True
+
+        for _ in range(max_workers):
+            if not submit_next_page():
+                break
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                summaries[in_flight.pop(future)] = future.result()
+                if progress_callback:
+                    progress_callback('summarizing', len(summaries), max(total or 0, len(summaries)))
+                submit_next_page()
+
+    return {page_number: summaries[page_number] for page_number in sorted(summaries)}
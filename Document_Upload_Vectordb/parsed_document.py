@@ -0,0 +1,86 @@
+import os
+from dataclasses import dataclass
+from functools import cached_property
+from typing import List, Optional
+
+import filetype
+from langchain_community.document_loaders import PyPDFLoader
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# Pages with less extractable text than this are treated as scanned images
+PDF_MIN_TEXT_CHARS = int(os.getenv("PDF_MIN_TEXT_CHARS", "20"))
+
+
+@dataclass
+class ParsedDocument:
+    """A file parsed once and shared by routing, chunking and metadata creation.
+
+    PDF pages are loaded lazily on first access, so a document that is served
+    from the ingestion cache is never parsed at all.
+    """
+
+    filepath: str
+    file_hash: Optional[str] = None
+    file_size_bytes: Optional[int] = None
+    mime_type: Optional[str] = None
+
+    @property
+    def file_extension(self) -> str:
+        return os.path.splitext(self.filepath)[1].lower()
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.mime_type == 'application/pdf' or self.file_extension == '.pdf'
+
+    @cached_property
+    def pages(self) -> List:
+        """PyPDFLoader pages of a PDF, loaded a single time"""
+        if not self.is_pdf:
+            return []
+        return PyPDFLoader(self.filepath).load()
+
+    @cached_property
+    def text_page_numbers(self) -> List[int]:
+        """1-based numbers of pages that carry extractable text"""
+        return [i + 1 for i, page in enumerate(self.pages) if len(page.page_content.strip()) >= PDF_MIN_TEXT_CHARS]
+
+    @cached_property
+    def image_page_numbers(self) -> List[int]:
+        """1-based numbers of scanned pages that need the image path"""
+        text_pages = set(self.text_page_numbers)
+        return [n for n in range(1, len(self.pages) + 1) if n not in text_pages]
+
+    @property
+    def text_pages(self) -> List:
+        return [self.pages[n - 1] for n in self.text_page_numbers]
+
+    @cached_property
+    def route(self) -> str:
+        """Processing route for the file: powerpoint, word_document, imagesingle, pdf, imagepdf, mixedpdf or Unknown"""
+        if self.file_extension in ['.ppt', '.pptx']:
+            return 'powerpoint'
+        if self.file_extension in ['.doc', '.docx']:
+            return 'word_document'
+
+        if self.mime_type is None and not self.is_pdf:
+            return "Unknown"
+        if self.mime_type and self.mime_type.startswith("image/"):
+            return 'imagesingle'
+
+        if self.is_pdf:
+            if not self.pages or not self.text_page_numbers:
+                return 'imagepdf'
+            if self.image_page_numbers:
+                return 'mixedpdf'
+        return 'pdf'
+
+
+def guess_mime_type(filepath: str):
+    try:
+        kind = filetype.guess(filepath)
+        return kind.mime if kind else None
+    except Exception as e:
+        print(f"Error guessing file type: {e}")
+        return None
@@ -0,0 +1,45 @@
+import os
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+from dotenv import load_dotenv
+load_dotenv()
+
+PDF_RASTER_DPI = int(os.getenv("PDF_RASTER_DPI", "200"))
+PDF_RASTER_GRAYSCALE = os.getenv("PDF_RASTER_GRAYSCALE", "false").lower() in ("1", "true", "yes")
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "0"))  # 0 means no cap
+
+
+def get_pdf_page_count(pdf_path: str, max_pages: int = None):
+    """Number of pages that will be rasterized, honouring the page cap"""
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    page_count = int(pdfinfo_from_path(pdf_path).get("Pages", 0))
+    return min(page_count, max_pages) if max_pages else page_count
+
+
+def iter_pdf_pages(pdf_path: str, dpi: int = None, grayscale: bool = None, max_pages: int = None, page_numbers=None):
+    """Yield (page_number, PIL image) for PDF pages one at a time.
+
+    Only the requested page is rendered on each step, so the caller controls
+    how many pages are held in memory at once. page_numbers (1-based) limits
+    rendering to specific pages, e.g. the scanned pages of a mixed PDF. The
+    image is None for a page that rendered nothing, so callers keep the real
+    page numbers and can report it as failed.
+    """
+    dpi = dpi or PDF_RASTER_DPI
+    grayscale = PDF_RASTER_GRAYSCALE if grayscale is None else grayscale
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+
+    if page_numbers is None:
+        page_numbers = range(1, get_pdf_page_count(pdf_path, max_pages) + 1)
+    elif max_pages:
+        page_numbers = list(page_numbers)[:max_pages]
+
+    for page_number in page_numbers:
+        images = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            grayscale=grayscale,
+            first_page=page_number,
+            last_page=page_number
+        )
+        yield page_number, images[0] if images else None
@@ -37,3 +37,22 @@ Respond with **only** a valid JSON dictionary using the following format:
 ❌ Do **not** add any explanation, text before or after the dictionary, markdown, comments, or labels.  
 ✅ Return **only** the raw JSON dictionary — nothing else.
 """
+
+rfi_painpoint_reduce_prompt = """
+You are a highly capable business analyst AI. The pain points below were extracted from different sections of the same RFI (Request for Information) document.
+
+Merge them into the **{max_items} most important business pain points** of the client organization. Combine pain points that describe the same concern, keep the most specific wording, and drop generic or repeated ones.
+
+Here are the extracted pain points:
+{pain_points}
+
+Respond with **only** a valid JSON dictionary using the following format:
+
+{{
+    "Category 1": "Insightful and concise pain point summary.",
+    "Category 2": "Another brief and relevant pain point summary."
+}}
+
+❌ Do **not** add any explanation, text before or after the dictionary, markdown, comments, or labels.  
+✅ Return **only** the raw JSON dictionary — nothing else.
+"""
@@ -1,10 +1,9 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import time
 from datetime import datetime
 import os
 from Generate_proposal.generate_proposal_css import *
-from SalesProposalWriting.src.main import get_presentation,inline_editable_html_component
+from SalesProposalWriting.src.main import stream_presentation,inline_editable_html_component
 from Common_Utils.logo_creator import create_text_image
 
 def render_template_preview(template_name, template_key):
@@ -147,66 +146,79 @@ def render_preview_tab(client_data, seller_data, project_specs):
                                                 }
                                                 </style>
                                                 """, unsafe_allow_html=True)
-        st.markdown("### 🔄 Generating Your Professional Proposal")
-        
-        # Progress bar and status
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        # Progress stages with actual timing
-        stages = [
-            ("🔍 Validating project details...", 0.2),
-            (f"🎨 Applying professional template...", 0.4),
-            ("📝 Generating proposal content...", 0.6),
-            ("⚖️ Adding terms and conditions...", 0.8),
-            ("✨ Final review and formatting...", 1.0)
-        ]
-        
-        output_file = None
-        
-        try:
-            # Show progress stages with realistic timing
-            for i, (stage_text, progress) in enumerate(stages):
-                status_text.text(stage_text)
-                progress_bar.progress(progress)
-                
-                # Add realistic delay for user experience
-                time.sleep(0.6)
+        # Generate once; reruns from the buttons below reuse the stored proposal
+        if not st.session_state.get('proposal_generation_success', False):
+            st.markdown("### 🔄 Generating Your Professional Proposal")
+            
+            # Progress bar, status and the live preview, filled in as sections are written
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            preview = st.empty()
+            
+            output_file = None
+            file_path = None
+            total_sections = 0
+            written_sections = 0
+            
+            try:
+                status_text.text("📝 Outlining proposal sections...")
+                for event in stream_presentation(
+                    client=client_data,
+                    seller=seller_data,
+                    project_specs=project_specs,
+                    fresh=st.session_state.get('proposal_regenerate', False)
+                ):
+                    if event['event'] == 'outline':
+                        total_sections = len(event['sections'])
+                        progress_bar.progress(0.1)
+                        status_text.text(f"📝 Writing {total_sections} sections...")
+                    elif event['event'] == 'section':
+                        written_sections += 1
+                        total_sections = max(total_sections, written_sections)
+                        progress_bar.progress(0.1 + 0.8 * written_sections / total_sections)
+                        status_text.text(f"📝 Written {written_sections}/{total_sections}: {event['title']}")
+                        with preview.container():
+                            components.html(event['preview'], height=800, scrolling=True)
+                    elif event['event'] == 'done':
+                        progress_bar.progress(0.95)
+                        status_text.text("✨ Final review and formatting...")
+                        output_file, file_path = event['html'], event['file_path']
                 
-                # Generate the file only once at the end of the progress
-                if i == len(stages) - 1:  # Last stage
-                    output_file,file_path = get_presentation(
-                        client=client_data,
-                        seller=seller_data,
-                        project_specs=project_specs
-                    )
+                # Swap the live preview for the assembled, editable document
+                preview.empty()
+                st.session_state.pop('inline_html_editor_content', None)
+                if output_file:
                     output_file = inline_editable_html_component(output_file)
                     with open(file_path, "w", encoding="utf-8") as file:
                         file.write(output_file)
+                
+                # Complete the progress
+                progress_bar.progress(1.0)
+                status_text.text("✅ Proposal generation completed!")
+                
+                # Clear progress indicators
+                progress_bar.empty()
+                status_text.empty()
+                
+                # Store the output file path in session state for download
+                if output_file and os.path.exists(file_path):
+                    st.session_state.proposal_file_path = file_path
+                    st.session_state.proposal_generation_success = True
+                    st.session_state.proposal_regenerate = False
+                else:
+                    st.error("❌ Error generating proposal file. Please try again.")
+                    return
                     
-            
-            # Complete the progress
-            progress_bar.progress(1.0)
-            status_text.text("✅ Proposal generation completed!")
-            time.sleep(0.5)
-            
-            # Clear progress indicators
-            progress_bar.empty()
-            status_text.empty()
-            
-            # Store the output file path in session state for download
-            if output_file and os.path.exists(file_path):
-                st.session_state.proposal_file_path = file_path
-                st.session_state.proposal_generation_success = True
-            else:
-                st.error("❌ Error generating proposal file. Please try again.")
+            except Exception as e:
+                progress_bar.empty()
+                status_text.empty()
+                st.error(f"❌ Error during proposal generation: {str(e)}")
                 return
-                
-        except Exception as e:
-            progress_bar.empty()
-            status_text.empty()
-            st.error(f"❌ Error during proposal generation: {str(e)}")
-            return
+        else:
+            output_file = inline_editable_html_component()
+            if output_file and os.path.exists(st.session_state.get('proposal_file_path', '')):
+                with open(st.session_state.proposal_file_path, "w", encoding="utf-8") as file:
+                    file.write(output_file)
 
     # Display success section if generation was successful
     if st.session_state.get('proposal_generation_success', False):
@@ -255,6 +267,8 @@ def render_preview_tab(client_data, seller_data, project_specs):
         if st.button("🔄 Generate New Proposal", use_container_width=True):
             # Clear session state to allow new generation
             st.session_state.proposal_generation_success = False
+            # Ask the model again instead of replaying cached sections
+            st.session_state.proposal_regenerate = True
             if 'proposal_file_path' in st.session_state:
                 del st.session_state.proposal_file_path
             st.rerun()
@@ -1,206 +1,131 @@
 import streamlit as st
-import asyncio
-from typing import Tuple, Dict, Optional
-from concurrent.futures import ThreadPoolExecutor
+import uuid
 import time
+import hashlib
+from typing import Tuple, Dict, Optional
 from ProjectSpecification.proj_spec_css import proj_spec_css
+from ProjectSpecification.spec_engine import (
+    SPEC_PROMPTS, DEFAULT_SPEC_DATA, SPEC_PREFETCH_STABLE_SECONDS, get_spec_input_hash, submit_spec_section,
+    get_spec_job, cancel_spec_job, get_spec_prefetch_queue, merge_accepted_items
+)
 from Common_Utils.ai_suggestion_utils import render_two_column_selector
-from Recommendation.recommendation_utils import get_ai_proj_sepc_recommendations
-from Recommendation.prompts import *
+from Common_Utils.background_jobs import JOB_DONE, JOB_QUEUED
 from Common_Utils.common_utils import *
 
-# Initialize session state for async results
+SPEC_SECTION_LABELS = {
+    'scope': "scope of work",
+    'timeline': "project timeline",
+    'effort': "effort breakdown",
+    'team': "team structure",
+    'pricing': "pricing models"
+}
+
+# Initialize session state for background AI results
 def init_async_session_state():
-    """Initialize session state variables for async AI recommendations"""
-    if 'ai_recommendations_loading' not in st.session_state:
-        st.session_state.ai_recommendations_loading = True
+    """Initialize session state variables for background AI recommendations"""
+    if 'spec_session_id' not in st.session_state:
+        st.session_state.spec_session_id = uuid.uuid4().hex
     if 'ai_recommendations_ready' not in st.session_state:
         st.session_state.ai_recommendations_ready = {}
     if 'ai_recommendation_data' not in st.session_state:
         st.session_state.ai_recommendation_data = {}
-    if 'loading_progress' not in st.session_state:
-        st.session_state.loading_progress = 0
-    if 'current_analysis_step' not in st.session_state:
-        st.session_state.current_analysis_step = ""
-    if 'current_step' not in st.session_state:
-        st.session_state.current_step = 0
-    if 'ai_processing_started' not in st.session_state:
-        st.session_state.ai_processing_started = False
-    if 'analysis_complete' not in st.session_state:
-        st.session_state.analysis_complete = False
-
-def get_ai_recommendations_async(section_name, prompt, client_data, seller_data, default_data):
+    if 'spec_jobs' not in st.session_state:
+        st.session_state.spec_jobs = {}
+    if 'spec_input_hashes' not in st.session_state:
+        st.session_state.spec_input_hashes = {}
+
+def start_async_recommendations(client_data, seller_data, prefetch=False, fresh=False):
     """
-    Async wrapper to get AI recommendations in background
+    Queue only the sections whose input slices changed since they were last generated; returns immediately.
+    fresh=True regenerates every section and bypasses the LLM response cache.
     """
-    try:
-        ai_data = get_ai_proj_sepc_recommendations(prompt, client_data, seller_data)
-        if ai_data and isinstance(ai_data, dict) and len(ai_data) > 0:
-            return ai_data
-        else:
-            return default_data
-    except Exception as e:
-        # Log the error if needed
-        return default_data
-
-def update_progress(step, progress_value, analysis_text):
-    """Update the progress bar and analysis text"""
-    st.session_state.loading_progress = progress_value
-    st.session_state.current_analysis_step = analysis_text
-    # Force UI update
-    time.sleep(0.1)
-
-# Global variable to store AI processing results (accessible from threads)
-ai_processing_results = {}
-
-def start_async_recommendations(client_data, seller_data):
+    for section_name in SPEC_PROMPTS:
+        input_hash = get_spec_input_hash(section_name, client_data, seller_data)
+        job_id = st.session_state.spec_jobs.get(section_name)
+        if not fresh and st.session_state.spec_input_hashes.get(section_name) == input_hash:
+            # Prefetched but not started yet: the user is waiting for it now, move it to the main pool
+            prefetched = get_spec_prefetch_queue().get(job_id) if job_id and not prefetch else None
+            if prefetched is not None and prefetched.state == JOB_QUEUED:
+                prefetched.cancel()
+                job = submit_spec_section(st.session_state.spec_session_id, section_name, client_data, seller_data, input_hash)
+                st.session_state.spec_jobs[section_name] = job.job_id
+            continue
+
+        # A result for the old inputs would be discarded anyway
+        if job_id:
+            cancel_spec_job(job_id)
+
+        job = submit_spec_section(st.session_state.spec_session_id, section_name, client_data, seller_data, input_hash,
+                                  prefetch, fresh)
+        st.session_state.spec_jobs[section_name] = job.job_id
+        st.session_state.spec_input_hashes[section_name] = input_hash
+        st.session_state.ai_recommendations_ready[section_name] = False
+
+def prefetch_recommendations(client_data, seller_data, force=False):
     """
-    Start async loading of all AI recommendations with progress tracking
+    Speculatively start the recommendations on the prefetch pool once client and seller data are valid,
+    so the tab usually opens with them ready.
+
+    Debounced, since a model call in flight cannot be cancelled: inputs are only prefetched once they
+    stayed the same for SPEC_PREFETCH_STABLE_SECONDS across reruns, or right away with force=True
+    (the user moved to another tab or is leaving the seller tab). Stale results are never applied.
     """
-    if st.session_state.ai_recommendations_loading:
-        
-        # Analysis steps with corresponding messages
-        analysis_steps = [
-            "🔍 Analyzing client requirements and business context...",
-            "🏢 Processing seller capabilities and expertise...", 
-            "📋 Generating intelligent scope recommendations...",
-            "⏱️ Creating optimized timeline structure...",
-            "💪 Calculating effort estimations and resource needs...",
-            "👥 Designing optimal team composition...",
-            "💰 Formulating competitive pricing strategies...",
-            "✨ Finalizing AI-enhanced recommendations..."
-        ]
-        
-        # Default data definitions
-        default_data_map = {
-            'scope': {
-                "Project Planning": "**Project Planning** • Define project objectives and success criteria\n• Create detailed work breakdown structure\n• Establish project milestones and deliverables\n\n",
-                "Requirements Analysis": "**Requirements Analysis** • Conduct stakeholder interviews and workshops\n• Document functional and non-functional requirements\n• Create user stories and acceptance criteria\n\n",
-                "Solution Design": "**Solution Design** • Develop system architecture and technical specifications\n• Create wireframes and user interface mockups\n• Design database schema and integration points\n\n"
-            },
-            'timeline': {
-                "Phase 1 - Discovery": "**Phase 1 - Discovery (2-3 weeks)** • Stakeholder interviews and requirement gathering\n• Current state analysis and gap assessment\n• Technical feasibility study\n\n",
-                "Phase 2 - Design": "**Phase 2 - Design (3-4 weeks)** • System architecture and technical design\n• User experience and interface design\n• Development environment setup\n\n",
-                "Phase 3 - Development": "**Phase 3 - Development (8-12 weeks)** • Core functionality development\n• Integration with existing systems\n• Unit testing and code reviews\n\n"
-            },
-            'effort': {
-                "Business Analysis": "**Business Analysis (120-160 hours)** • Requirements gathering and documentation\n• Process mapping and workflow analysis\n• Stakeholder management and communication\n\n",
-                "Technical Development": "**Technical Development (400-600 hours)** • Frontend and backend development\n• Database design and implementation\n• API development and integration\n\n",
-                "Testing & QA": "**Testing & QA (80-120 hours)** • Test planning and test case creation\n• Manual and automated testing execution\n• Bug fixing and regression testing\n\n"
-            },
-            'team': {
-                "Core Team": "**Core Team (4-6 members)** • Project Manager and Scrum Master\n• Senior Business Analyst\n• Lead Developer and Frontend Developer\n• QA Engineer and DevOps Specialist\n\n",
-                "Extended Team": "**Extended Team (2-3 members)** • UI/UX Designer for user experience\n• Database Administrator for data management\n• Security Specialist for compliance review\n\n",
-                "Support Team": "**Support Team (1-2 members)** • Technical Writer for documentation\n• Change Management Specialist\n• Subject Matter Experts as needed\n\n"
-            },
-            'pricing': {
-                "Fixed Price Model": "**Fixed Price Model** • Total project cost: $150,000 - $200,000\n• 30% upfront, 40% at milestone delivery, 30% on completion\n• Includes 3 months post-launch support\n\n",
-                "Time & Materials": "**Time & Materials Model** • Senior resources: $150-180/hour\n• Mid-level resources: $100-130/hour\n• Junior resources: $70-90/hour\n\n",
-                "Hybrid Approach": "**Hybrid Approach** • Fixed price for core deliverables: $120,000\n• T&M for additional features and changes\n• Monthly retainer for ongoing support: $8,000/month\n\n"
-            }
-        }
-        
-        prompt_map = {
-            'scope': scope_prompt,
-            'timeline': timeline_prompt,
-            'effort': effort_prompt,
-            'team': team_prompt,
-            'pricing': pricing_prompt
-        }
-        
-        # Initialize with default data immediately
-        for section in default_data_map.keys():
-            if section not in st.session_state.ai_recommendation_data:
-                st.session_state.ai_recommendation_data[section] = default_data_map[section]
-                st.session_state.ai_recommendations_ready[section] = False
-        
-        # Simulate progress for the first few steps
-        current_step = st.session_state.get('current_step', 0)
-        
-        if current_step < len(analysis_steps):
-            progress = min(95, 10 + (current_step * 12))
-            update_progress(current_step, progress, analysis_steps[current_step])
-            st.session_state.current_step = current_step + 1
-            
-            # If we're at the processing steps, start AI calls
-            if current_step >= 2 and not st.session_state.get('ai_processing_started', False):
-                st.session_state.ai_processing_started = True
-                
-                # Start AI processing in background using ThreadPoolExecutor
-                with ThreadPoolExecutor(max_workers=5) as executor:
-                    futures = {}
-                    for section_name, prompt in prompt_map.items():
-                        future = executor.submit(
-                            get_ai_recommendations_async,
-                            section_name,
-                            prompt,
-                            client_data,
-                            seller_data,
-                            default_data_map[section_name]
-                        )
-                        futures[section_name] = future
-                    
-                    # Store futures in session state for later processing
-                    st.session_state.ai_futures = futures
-            
-            # Check if AI processing is complete
-            if hasattr(st.session_state, 'ai_futures') and current_step >= len(analysis_steps) - 1:
-                all_complete = True
-                for section_name, future in st.session_state.ai_futures.items():
-                    if future.done():
-                        try:
-                            result = future.result()
-                            st.session_state.ai_recommendation_data[section_name] = result
-                            st.session_state.ai_recommendations_ready[section_name] = True
-                        except Exception as e:
-                            # Keep default data if AI fails
-                            st.session_state.ai_recommendations_ready[section_name] = True
-                    else:
-                        all_complete = False
-                
-                if all_complete:
-                    # Final completion - set both flags to False to stop loading
-                    update_progress(len(analysis_steps), 100, "🎉 Analysis complete! Loading your personalized recommendations...")
-                    st.session_state.ai_recommendations_loading = False
-                    st.session_state.analysis_complete = True
+    init_async_session_state()
+    fingerprint = hashlib.sha256("".join(
+        get_spec_input_hash(section_name, client_data, seller_data) for section_name in SPEC_PROMPTS
+    ).encode('utf-8')).hexdigest()
+    now = time.time()
+    candidate = st.session_state.get('spec_prefetch_candidate')
+    if candidate is None or candidate[0] != fingerprint:
+        st.session_state.spec_prefetch_candidate = (fingerprint, now)
+        if not force:
+            return
+    elif not force and now - candidate[1] < SPEC_PREFETCH_STABLE_SECONDS:
+        return
+    start_async_recommendations(client_data, seller_data, prefetch=True)
+
+def apply_finished_recommendations() -> bool:
+    """Move results of finished section jobs into session state; True if any section landed"""
+    landed = False
+    for section_name, job_id in list(st.session_state.spec_jobs.items()):
+        job = get_spec_job(job_id)
+        if job is not None and not job.is_finished:
+            continue
+        if job is not None and job.state == JOB_DONE:
+            new_data = job.result
+        else:
+            # Failed, or lost with a server restart: keep what is shown, or fall back to the default suggestions
+            if job is not None and job.error:
+                print(f"Error generating {section_name} recommendations: {job.error}")
+            new_data = st.session_state.ai_recommendation_data.get(section_name) or DEFAULT_SPEC_DATA[section_name]
+        # Items the user already added stay, with the text they accepted
+        accepted = st.session_state.get(f"{section_name}_content_map", {})
+        st.session_state.ai_recommendation_data[section_name] = merge_accepted_items(new_data, accepted)
+        st.session_state.ai_recommendations_ready[section_name] = True
+        del st.session_state.spec_jobs[section_name]
+        landed = True
+    return landed
 
 def show_loading_screen():
-    """Display the loading screen with progress bar and analysis steps"""
-    st.markdown("""
-        <div style="text-align: center; padding: 2rem;">
-            <h2>🤖 AI-Powered Project Analysis</h2>
-            <p style="color: #666; margin-bottom: 2rem;">
-                Our AI is analyzing your requirements to create personalized recommendations
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    # Progress bar
-    progress_bar = st.progress(st.session_state.loading_progress / 100)
-    
-    # Current analysis step
-    if st.session_state.current_analysis_step:
-        st.markdown(f"""
-            <div style="text-align: center; padding: 1rem; background-color: #f8f9fa; 
-                        border-radius: 8px; margin: 1rem 0;">
-                <p style="margin: 0; font-weight: 500; color: #2c3e50;">
-                    {st.session_state.current_analysis_step}
-                </p>
-            </div>
-        """, unsafe_allow_html=True)
-    
-    # Show estimated time remaining
-    if st.session_state.loading_progress < 100:
-        estimated_time = max(1, int((100 - st.session_state.loading_progress) / 10))
-        st.markdown(f"""
-            <div style="text-align: center; margin-top: 1rem;">
-                <small style="color: #666;">
-                    Estimated time remaining: ~{estimated_time} seconds
-                </small>
-            </div>
-        """, unsafe_allow_html=True)
-    
-    return progress_bar
+    """Progress of the section jobs still running"""
+    total = len(SPEC_PROMPTS)
+    ready = sum(1 for section_name in SPEC_PROMPTS if st.session_state.ai_recommendations_ready.get(section_name))
+    pending = [SPEC_SECTION_LABELS[section_name] for section_name in SPEC_PROMPTS
+               if not st.session_state.ai_recommendations_ready.get(section_name)]
+    st.progress(ready / total, text=f"🤖 AI recommendations ready for {ready} of {total} sections — generating {', '.join(pending)}...")
+    # Suggestions of running sections, as they stream in
+    for section_name, job_id in st.session_state.spec_jobs.items():
+        job = get_spec_job(job_id)
+        if job is not None and not job.is_finished and job.partial:
+            st.caption(f"✍️ {SPEC_SECTION_LABELS[section_name].capitalize()}: {', '.join(job.partial)}...")
+
+@st.fragment(run_every=1)
+def render_recommendations_progress():
+    """Poll the section jobs; each result triggers a rerun so its section renders right away"""
+    if apply_finished_recommendations():
+        st.rerun()
+    if st.session_state.spec_jobs:
+        show_loading_screen()
 
 def get_section_data(section_name):
     """Get data for a specific section"""
@@ -209,25 +134,28 @@ def get_section_data(section_name):
     else:
         return {}
 
+def render_spec_section(section_name, **selector_kwargs):
+    """Two-column selector for a section once it has recommendations, a placeholder until the first land"""
+    if not get_section_data(section_name):
+        st.markdown(f"**{selector_kwargs['left_title']}**")
+        st.info(f"⏳ Generating AI suggested {SPEC_SECTION_LABELS[section_name]}...")
+        return st.session_state.get(selector_kwargs['textarea_session_key'], "")
+    if not st.session_state.ai_recommendations_ready.get(section_name):
+        # Inputs changed: keep the current suggestions usable while the section is regenerated
+        st.caption(f"🔄 Updating AI suggested {SPEC_SECTION_LABELS[section_name]} for your latest changes...")
+    content, _ = render_two_column_selector(default_data=get_section_data(section_name), **selector_kwargs)
+    return content
+
 def proj_specification_tab(client_data, seller_data,is_locked):
 
     # Initialize async session state
     init_async_session_state()
-    
-    # Show loading screen if still loading
-    if st.session_state.ai_recommendations_loading:
-        show_loading_screen()
-        
-        # Start async loading if not already started
-        start_async_recommendations(client_data, seller_data)
-        
-        # Auto-refresh every 1 second during loading
-        time.sleep(1)
-        st.rerun()
-        return None  # Don't render the main content yet
 
-    
-    # Main content - only shown after loading is complete
+    # Queue sections whose inputs changed and pick up results that landed since the last run
+    start_async_recommendations(client_data, seller_data)
+    apply_finished_recommendations()
+
+    # Main content, with a placeholder for each section still being generated
     content_area_css = """
             <style>
             /* More aggressive targeting for Streamlit's structure */
@@ -438,9 +366,17 @@ def proj_specification_tab(client_data, seller_data,is_locked):
     
 
     
+    if st.button("🔄 Regenerate AI suggestions", key="regenerate_spec_btn",
+                 disabled=is_locked or bool(st.session_state.spec_jobs),
+                 help="Ask the AI for new suggestions instead of reusing the previous ones"):
+        start_async_recommendations(client_data, seller_data, fresh=True)
+
+    if st.session_state.spec_jobs:
+        render_recommendations_progress()
+
     # Section 1: Scope of Work
-    scope_data = get_section_data('scope')
-    scope_content, scope_provided = render_two_column_selector(
+    scope_content = render_spec_section(
+        'scope',
         left_title="Scope of Work",
         left_tooltip="Define the detailed scope of work including all tasks, deliverables, and project boundaries.",
         textarea_session_key="scope_content",
@@ -448,7 +384,6 @@ def proj_specification_tab(client_data, seller_data,is_locked):
         textarea_placeholder="Click/Enter to get the AI suggested Project Scope",
         selected_items_key="scope_selected",
         content_map_key="scope_content_map",
-        default_data=scope_data,
         right_title="Scope Options",
         right_tooltip="Select scope elements to include in your project definition.",
         selected_border_color="#4a90e2",
@@ -458,8 +393,8 @@ def proj_specification_tab(client_data, seller_data,is_locked):
     st.markdown("---")
     
     # Section 2: Timeline
-    timeline_data = get_section_data('timeline')
-    timeline_content, timeline_provided = render_two_column_selector(
+    timeline_content = render_spec_section(
+        'timeline',
         left_title="Project Timeline",
         left_tooltip="Outline the project phases, key milestones, and delivery dates.",
         textarea_session_key="timeline_content",
@@ -467,7 +402,6 @@ def proj_specification_tab(client_data, seller_data,is_locked):
         textarea_placeholder="Click/Enter to get the AI suggested Project Timeline for detailed breakdown",
         selected_items_key="timeline_selected",
         content_map_key="timeline_content_map",
-        default_data=timeline_data,
         right_title="Timeline Phases",
         right_tooltip="Select timeline phases to include in your project schedule.",
         selected_color="#d2ebfb",
@@ -477,8 +411,8 @@ def proj_specification_tab(client_data, seller_data,is_locked):
     st.markdown("---")
     
     # Section 3: Effort Estimation
-    effort_data = get_section_data('effort')
-    effort_content, effort_provided = render_two_column_selector(
+    effort_content = render_spec_section(
+        'effort',
         left_title="Effort Breakdown",
         left_tooltip="Detail the estimated effort required for each work stream and activity.",
         textarea_placeholder="Click/Enter to get the AI suggested Estimation and effort analysis",
@@ -486,7 +420,6 @@ def proj_specification_tab(client_data, seller_data,is_locked):
         textarea_widget_key="effort_textarea",
         selected_items_key="effort_selected",
         content_map_key="effort_content_map",
-        default_data=effort_data,
         right_title="Effort Categories",
         right_tooltip="Select effort categories to include in your estimation.",
         selected_color="#d2ebfb",
@@ -496,8 +429,8 @@ def proj_specification_tab(client_data, seller_data,is_locked):
     st.markdown("---")
     
     # Section 4: Team Size
-    team_data = get_section_data('team')
-    team_content, team_provided = render_two_column_selector(
+    team_content = render_spec_section(
+        'team',
         left_title="Team Structure",
         left_tooltip="Define the team composition, roles, and responsibilities for the project.",
         textarea_session_key="team_content",
@@ -505,7 +438,6 @@ def proj_specification_tab(client_data, seller_data,is_locked):
         textarea_placeholder="Click/Enter to get the AI suggested Team analysis",
         selected_items_key="team_selected",
         content_map_key="team_content_map",
-        default_data=team_data,
         right_title="Team Options",
         right_tooltip="Select team structures to include in your project staffing.",
         selected_color="#d2ebfb",
@@ -515,8 +447,8 @@ def proj_specification_tab(client_data, seller_data,is_locked):
     st.markdown("---")
     
     # Section 5: Pricing & Commercial
-    pricing_data = get_section_data('pricing')
-    pricing_content, pricing_provided = render_two_column_selector(
+    pricing_content = render_spec_section(
+        'pricing',
         left_title="Commercial Proposal",
         left_tooltip="Outline pricing models, payment terms, and commercial arrangements.",
         textarea_session_key="pricing_content",
@@ -524,7 +456,6 @@ def proj_specification_tab(client_data, seller_data,is_locked):
         selected_items_key="pricing_selected",
         textarea_placeholder="Click/Enter to get the AI suggested Pricing",
         content_map_key="pricing_content_map",
-        default_data=pricing_data,
         right_title="Pricing Models",
         right_tooltip="Select pricing models to include in your commercial proposal.",
         selected_color="#d2ebfb",
@@ -0,0 +1,189 @@
+import os
+import json
+import hashlib
+from typing import Any, Dict, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from Common_Utils.background_jobs import get_job_queue, PRIORITY_NORMAL, PRIORITY_LOW
+from Recommendation.recommendation_utils import get_ai_proj_sepc_recommendations
+from Recommendation.prompts import scope_prompt, timeline_prompt, effort_prompt, team_prompt, pricing_prompt
+
+PROJECT_SPEC_WORKERS = int(os.getenv("PROJECT_SPEC_WORKERS", "5"))
+# Speculative sections run in their own small pool so they never occupy the workers of an open tab
+PROJECT_SPEC_PREFETCH_WORKERS = int(os.getenv("PROJECT_SPEC_PREFETCH_WORKERS", "1"))
+# Client/seller inputs must stay unchanged this long (across reruns) before they are prefetched
+SPEC_PREFETCH_STABLE_SECONDS = float(os.getenv("SPEC_PREFETCH_STABLE_SECONDS", "2"))
+
+SPEC_PROMPTS = {
+    'scope': scope_prompt,
+    'timeline': timeline_prompt,
+    'effort': effort_prompt,
+    'team': team_prompt,
+    'pricing': pricing_prompt
+}
+
+# Shown when a section's recommendation fails or returns nothing usable
+DEFAULT_SPEC_DATA = {
+    'scope': {
+        "Project Planning": "**Project Planning** • Define project objectives and success criteria\n• Create detailed work breakdown structure\n• Establish project milestones and deliverables\n\n",
+        "Requirements Analysis": "**Requirements Analysis** • Conduct stakeholder interviews and workshops\n• Document functional and non-functional requirements\n• Create user stories and acceptance criteria\n\n",
+        "Solution Design": "**Solution Design** • Develop system architecture and technical specifications\n• Create wireframes and user interface mockups\n• Design database schema and integration points\n\n"
+    },
+    'timeline': {
+        "Phase 1 - Discovery": "**Phase 1 - Discovery (2-3 weeks)** • Stakeholder interviews and requirement gathering\n• Current state analysis and gap assessment\n• Technical feasibility study\n\n",
+        "Phase 2 - Design": "**Phase 2 - Design (3-4 weeks)** • System architecture and technical design\n• User experience and interface design\n• Development environment setup\n\n",
+        "Phase 3 - Development": "**Phase 3 - Development (8-12 weeks)** • Core functionality development\n• Integration with existing systems\n• Unit testing and code reviews\n\n"
+    },
+    'effort': {
+        "Business Analysis": "**Business Analysis (120-160 hours)** • Requirements gathering and documentation\n• Process mapping and workflow analysis\n• Stakeholder management and communication\n\n",
+        "Technical Development": "**Technical Development (400-600 hours)** • Frontend and backend development\n• Database design and implementation\n• API development and integration\n\n",
+        "Testing & QA": "**Testing & QA (80-120 hours)** • Test planning and test case creation\n• Manual and automated testing execution\n• Bug fixing and regression testing\n\n"
+    },
+    'team': {
+        "Core Team": "**Core Team (4-6 members)** • Project Manager and Scrum Master\n• Senior Business Analyst\n• Lead Developer and Frontend Developer\n• QA Engineer and DevOps Specialist\n\n",
+        "Extended Team": "**Extended Team (2-3 members)** • UI/UX Designer for user experience\n• Database Administrator for data management\n• Security Specialist for compliance review\n\n",
+        "Support Team": "**Support Team (1-2 members)** • Technical Writer for documentation\n• Change Management Specialist\n• Subject Matter Experts as needed\n\n"
+    },
+    'pricing': {
+        "Fixed Price Model": "**Fixed Price Model** • Total project cost: $150,000 - $200,000\n• 30% upfront, 40% at milestone delivery, 30% on completion\n• Includes 3 months post-launch support\n\n",
+        "Time & Materials": "**Time & Materials Model** • Senior resources: $150-180/hour\n• Mid-level resources: $100-130/hour\n• Junior resources: $70-90/hour\n\n",
+        "Hybrid Approach": "**Hybrid Approach** • Fixed price for core deliverables: $120,000\n• T&M for additional features and changes\n• Monthly retainer for ongoing support: $8,000/month\n\n"
+    }
+}
+
+
+def get_spec_job_queue():
+    """Process-wide queue for project spec sections; jobs outlive the rerun that started them"""
+    return get_job_queue("project_spec", PROJECT_SPEC_WORKERS)
+
+
+def get_spec_prefetch_queue():
+    """Low-concurrency queue for sections prefetched before the tab is opened"""
+    return get_job_queue("project_spec_prefetch", PROJECT_SPEC_PREFETCH_WORKERS)
+
+
+def get_spec_job(job_id: str):
+    """A section job from either queue"""
+    return get_spec_job_queue().get(job_id) or get_spec_prefetch_queue().get(job_id)
+
+
+def cancel_spec_job(job_id: str) -> bool:
+    return get_spec_job_queue().cancel(job_id) or get_spec_prefetch_queue().cancel(job_id)
+
+
+# ClientTabState / SellerTabState attributes each spec prompt is given, grouped by what they describe.
+# UI and processing flags change on reruns but never reach a prompt, so they are left out.
+CLIENT_PROFILE_FIELDS = ('enterprise_name', 'website_url', 'enterprise_details_content')
+CLIENT_NEEDS_FIELDS = (
+    'client_requirements_content', 'client_additional_requirements_content',
+    'selected_additional_specs', 'additional_specs_content_map'
+)
+CLIENT_PAIN_POINT_FIELDS = ('selected_pain_points', 'pain_point_content_map')
+CLIENT_STAKEHOLDER_FIELDS = (
+    'spoc_name', 'spoc_linkedin_profile', 'selected_target_role', 'selected_target_roles',
+    'selected_business_priorities'
+)
+SELLER_PROFILE_FIELDS = ('seller_enterprise_name', 'seller_website_url', 'seller_enterprise_details_content')
+SELLER_SERVICE_FIELDS = ('seller_requirements_content', 'selected_services_offered', 'services_content_map')
+SELLER_CAPABILITY_FIELDS = ('selected_additional_capabilities', 'capabilities_content_map')
+
+# Only a section whose slice changed is regenerated, e.g. editing pain points reruns scope and effort only
+SPEC_INPUT_FIELDS = {
+    'scope': {
+        'client': CLIENT_PROFILE_FIELDS + CLIENT_NEEDS_FIELDS + CLIENT_PAIN_POINT_FIELDS + CLIENT_STAKEHOLDER_FIELDS,
+        'seller': SELLER_PROFILE_FIELDS + SELLER_SERVICE_FIELDS + SELLER_CAPABILITY_FIELDS
+    },
+    'timeline': {
+        'client': CLIENT_PROFILE_FIELDS + CLIENT_NEEDS_FIELDS,
+        'seller': SELLER_SERVICE_FIELDS
+    },
+    'effort': {
+        'client': CLIENT_NEEDS_FIELDS + CLIENT_PAIN_POINT_FIELDS,
+        'seller': SELLER_SERVICE_FIELDS + SELLER_CAPABILITY_FIELDS
+    },
+    'team': {
+        'client': CLIENT_PROFILE_FIELDS + CLIENT_NEEDS_FIELDS,
+        'seller': SELLER_SERVICE_FIELDS + SELLER_CAPABILITY_FIELDS
+    },
+    'pricing': {
+        'client': CLIENT_PROFILE_FIELDS + CLIENT_NEEDS_FIELDS,
+        'seller': SELLER_PROFILE_FIELDS + SELLER_SERVICE_FIELDS
+    }
+}
+
+
+def _slice(data: Any, fields) -> Dict[str, Any]:
+    if data is None:
+        return {}
+    getter = data.get if isinstance(data, dict) else lambda name: getattr(data, name, None)
+    sliced = {}
+    for name in fields:
+        value = getter(name)
+        # Sets have no stable order for the prompt or the hash
+        sliced[name] = sorted(value) if isinstance(value, set) else value
+    return sliced
+
+
+def get_spec_inputs(section: str, client_data: Any, seller_data: Any) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(client slice, seller slice) a section's prompt is rendered with"""
+    fields = SPEC_INPUT_FIELDS[section]
+    return _slice(client_data, fields['client']), _slice(seller_data, fields['seller'])
+
+
+def get_spec_input_hash(section: str, client_data: Any, seller_data: Any) -> str:
+    """Fingerprint of the prompt and the input slices a section's recommendation depends on"""
+    client_slice, seller_slice = get_spec_inputs(section, client_data, seller_data)
+    payload = json.dumps({
+        'section': section,
+        'prompt': SPEC_PROMPTS[section],
+        'client_data': client_slice,
+        'seller_data': seller_slice
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def run_spec_section_job(job, section: str, client_slice: Dict[str, Any], seller_slice: Dict[str, Any],
+                         fresh: bool = False) -> Dict[str, str]:
+    """Background job body for one project spec section; fresh=True skips the LLM response cache.
+
+    Suggestions are published on job.partial as they stream in.
+    """
+    partial = {}
+
+    def on_item(key, value):
+        job.check_cancelled()
+        partial[key] = value
+        job.partial = dict(partial)
+
+    result = get_ai_proj_sepc_recommendations(SPEC_PROMPTS[section], client_slice, seller_slice, section, fresh, on_item)
+    if not result or not isinstance(result, dict):
+        raise ValueError(f"No usable {section} recommendations in model output")
+    return result
+
+
+def submit_spec_section(session_id: str, section: str, client_data: Any, seller_data: Any, input_hash: str = None,
+                        prefetch: bool = False, fresh: bool = False):
+    """Queue one section; the same session and inputs share a job that is still running.
+
+    prefetch=True queues it at low priority on the prefetch pool instead of the main one.
+    fresh=True asks the model again instead of reusing a cached answer (regenerate).
+    """
+    input_hash = input_hash or get_spec_input_hash(section, client_data, seller_data)
+    client_slice, seller_slice = get_spec_inputs(section, client_data, seller_data)
+    queue = get_spec_prefetch_queue() if prefetch else get_spec_job_queue()
+    return queue.submit(
+        run_spec_section_job, section, client_slice, seller_slice, fresh,
+        name=f"project_spec:{section}",
+        key=f"{session_id}:{section}:{input_hash}" + (":fresh" if fresh else ""),
+        priority=PRIORITY_LOW if prefetch else PRIORITY_NORMAL
+    )
+
+
+def merge_accepted_items(new_data: Dict[str, str], accepted: Dict[str, str]) -> Dict[str, str]:
+    """New suggestions for a section, keeping the items the user already added (with their accepted text) first"""
+    merged = dict(accepted or {})
+    for key, value in (new_data or {}).items():
+        merged.setdefault(key, value)
+    return merged
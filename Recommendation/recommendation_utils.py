@@ -1,53 +1,54 @@
 from langchain_core.prompts import ChatPromptTemplate
 from .prompts import *
-from langchain_google_genai import ChatGoogleGenerativeAI
+from Common_Utils.llm_gateway import get_llm
 from langchain_core.output_parsers import JsonOutputParser,StrOutputParser
 from dotenv import load_dotenv
-from Document_Upload_Vectordb.doc_xtraction_utils import clean_to_list
+from Common_Utils.json_stream import parse_llm_json, iter_json_items
+from Common_Utils.single_flight import single_flight
 load_dotenv()
 import json
 from Recommendation.prompts import *
 
-llm = ChatGoogleGenerativeAI(model = 'gemini-1.5-flash')
-
-def clean_to_list(result:str) :
-    result = result.strip()
-    if result.startswith('```python'):
-        result = result[len('```python'):].strip()
-    elif result.startswith('```json'):
-        result = result[len('```json'):].strip()
-    elif result.startswith('```'):
-        result = result[len('```'):].strip()
-    if result.endswith('```'):
-        result = result[:-3].strip()
-    first_brace = result.find('{')
-    if first_brace != -1:
-        result = result[first_brace:]
-    return result
-
+# Suggestions for the same inputs are reused until the user asks to regenerate them
+llm = get_llm('gemini-1.5-flash', cache=True)
 
 
 
 def get_ai_client_requirements(enterprise_details,client_requirements):
     template = ChatPromptTemplate.from_template(ai_suggetion_for_additional_req_prompt)
     chain = template | llm | StrOutputParser()
-    result = chain.invoke({'enterprise_details':enterprise_details,'client_requirements':client_requirements})
+    result = chain.invoke({'enterprise_details':enterprise_details,'client_requirements':client_requirements},
+                          config={'metadata': {'chain_name': 'client_requirements'}})
     return result
 
+@single_flight()
 def get_ai_business_priorities(spoc_role="CEO"):
     template = ChatPromptTemplate.from_template(business_priotiiry_recommendation_prompt)
     chain = template | llm | JsonOutputParser()
-    result = chain.invoke({'client_spoc_role':spoc_role})
+    result = chain.invoke({'client_spoc_role':spoc_role}, config={'metadata': {'chain_name': 'business_priorities'}})
     print(result)
     return result
 
-def get_ai_proj_sepc_recommendations(prompts,client_data,seller_data):
+def get_ai_proj_sepc_recommendations(prompts,client_data,seller_data,section=None,fresh=False,on_item=None):
+    """on_item(key, value) is called for each suggestion as soon as it streams in; the full response is returned parsed"""
     template = ChatPromptTemplate.from_template(prompts)
     chain = template | llm | StrOutputParser()
-    result = chain.invoke({'client_data':client_data,'seller_data':seller_data})
+    metadata = {'chain_name': f'project_spec_{section}' if section else 'project_spec'}
+    if fresh:
+        metadata['llm_cache'] = False
+    inputs = {'client_data':client_data,'seller_data':seller_data}
+    if on_item is None:
+        result = chain.invoke(inputs, config={'metadata': metadata})
+    else:
+        chunks = []
+        def collect():
+            for chunk in chain.stream(inputs, config={'metadata': metadata}):
+                chunks.append(chunk)
+                yield chunk
+        for key, value in iter_json_items(collect()):
+            on_item(key, value)
+        result = ''.join(chunks)
     print(result)
-    print(type(json.loads(clean_to_list(result))))
-    print(json.loads(clean_to_list(result)))
-    return json.loads(clean_to_list(result))
+    return parse_llm_json(result)
 
 
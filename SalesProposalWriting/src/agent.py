@@ -1,8 +1,19 @@
 from langgraph.graph import StateGraph,START,END
+from langgraph.types import RetryPolicy
 from .states import State
 from .nodes import clean_data
 from .sections import create_sections
 from .sales_proposal_content_writing import write_sales_proposal
+from .section_writing import fan_out_sections, write_section, assemble_proposal
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+# 'parallel' writes each section in its own node, 'single' asks for the whole proposal in one completion
+PROPOSAL_GRAPH_MODE = os.getenv("PROPOSAL_GRAPH_MODE", "parallel").lower()
+PROPOSAL_SECTION_MAX_ATTEMPTS = int(os.getenv("PROPOSAL_SECTION_MAX_ATTEMPTS", "3"))
+# Sections written at once; the LLM gateway still enforces the shared rate limits
+PROPOSAL_MAX_CONCURRENCY = int(os.getenv("PROPOSAL_MAX_CONCURRENCY", "8"))
 
 
 builder = StateGraph(State)
@@ -18,3 +29,32 @@ builder.add_edge('clean_data',END)
 
 
 graph = builder.compile()
+
+
+# Fan-out / fan-in: create_sections -> write_section x N (concurrent) -> assemble_proposal -> clean_data
+parallel_builder = StateGraph(State)
+parallel_builder.add_node(create_sections)
+parallel_builder.add_node(write_section, retry=RetryPolicy(max_attempts=PROPOSAL_SECTION_MAX_ATTEMPTS))
+parallel_builder.add_node(assemble_proposal)
+parallel_builder.add_node(clean_data)
+
+parallel_builder.add_edge(START,'create_sections')
+parallel_builder.add_conditional_edges('create_sections', fan_out_sections, ['write_section'])
+parallel_builder.add_edge('write_section','assemble_proposal')
+parallel_builder.add_edge('assemble_proposal','clean_data')
+parallel_builder.add_edge('clean_data',END)
+
+parallel_graph = parallel_builder.compile()
+
+
+def get_proposal_graph(mode: str = None):
+    """Compiled proposal graph for a mode ('parallel' or 'single'), PROPOSAL_GRAPH_MODE by default"""
+    return parallel_graph if (mode or PROPOSAL_GRAPH_MODE) == 'parallel' else graph
+
+
+def get_graph_config(fresh: bool = False) -> dict:
+    """Run config for the proposal graphs; fresh=True skips the LLM response cache (regenerate)"""
+    config = {'max_concurrency': PROPOSAL_MAX_CONCURRENCY}
+    if fresh:
+        config['metadata'] = {'llm_cache': False}
+    return config
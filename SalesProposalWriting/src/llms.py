@@ -1,6 +1,16 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+from Common_Utils.llm_gateway import get_llm
 from dotenv import load_dotenv
 
 load_dotenv()
 
-llm = ChatGoogleGenerativeAI(model = 'gemini-2.0-flash')
\ No newline at end of file
+# Cached so the same seller/client reuse their sections; "Generate New Proposal" runs with fresh=True
+llm = get_llm('gemini-2.0-flash', cache=True)
+
+def chain_config(config, chain_name: str) -> dict:
+    """Config for a chain called inside a graph node: names the chain and keeps the run's llm_cache choice,
+    which LangGraph does not pass on to runnables invoked by the node"""
+    metadata = {'chain_name': chain_name}
+    llm_cache = ((config or {}).get('metadata') or {}).get('llm_cache')
+    if llm_cache is not None:
+        metadata['llm_cache'] = llm_cache
+    return {'metadata': metadata}
@@ -1,11 +1,14 @@
-from SalesProposalWriting.src.agent import graph
+from SalesProposalWriting.src.agent import graph, get_proposal_graph, get_graph_config
 from SalesProposalWriting.src.states import State
+from SalesProposalWriting.src.section_writing import TITLE_SECTION
 from WebScraper.state import User
-from SalesProposalWriting.src.sales_proposal_html_writing import generate_modern_presentation
+from SalesProposalWriting.src.sales_proposal_html_writing import generate_modern_presentation, generate_preview_html
 from SalesProposalWriting.src.utils import  *
 from dotenv import load_dotenv
 load_dotenv()
 import os 
+import re
+from datetime import datetime
 OUTPUT_FILE_DIRECTORY = os.getenv("OUTPUT_PATH")
 
 
@@ -110,3 +113,82 @@ def get_presentation(client , seller , project_specs ):
     return html_content,html_file_name
 
 
+def _proposal_file_path(client) -> str:
+    client_name = re.sub(r'[^\w\-]+', '_', getattr(client, 'enterprise_name', None) or 'client').strip('_') or 'client'
+    target = os.path.join(OUTPUT_FILE_DIRECTORY or 'SalesProposalsGenerated', client_name)
+    os.makedirs(target, exist_ok=True)
+    return os.path.join(target, f"salesproposal_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+
+
+def _split_title(sections):
+    """(cover title, body sections as {'title', 'content'}) from written sections in outline order"""
+    cover_title = None
+    body = []
+    for section in sections:
+        if section['title'].strip().lower() == TITLE_SECTION:
+            cover_title = cover_title or section['text'].strip()
+        else:
+            body.append({'title': section['title'], 'content': section['text']})
+    return cover_title, body
+
+
+def stream_presentation(client, seller, project_specs, mode: str = None, fresh: bool = False):
+    """
+    Generate the proposal, yielding events as the graph makes progress:
+
+        {'event': 'outline', 'sections': [...]}                   section titles to be written
+        {'event': 'section', 'index', 'title', 'text', 'preview'}  one finished section; preview is the
+                                                                   HTML page of every section written so far
+        {'event': 'done', 'html', 'file_path'}                    the assembled document
+
+    Sections arrive in completion order, the preview and the final document keep outline order.
+    The single-completion graph has no per-section updates, its sections are all emitted at the end.
+    fresh=True bypasses the LLM response cache, for "Generate New Proposal".
+    """
+    state = State(client=client, seller=seller, project_specs=project_specs, sections=[], final_result='')
+    client_logo = client.enterprise_logo
+    seller_logo = seller.enterprise_logo
+
+    written = {}
+    final_result = None
+
+    def section_event(index, title, text):
+        written[index] = {'title': title, 'text': text}
+        cover_title, body = _split_title([written[i] for i in sorted(written)])
+        return {
+            'event': 'section',
+            'index': index,
+            'title': title,
+            'text': text,
+            'preview': generate_preview_html(cover_title, body, client_logo, seller_logo)
+        }
+
+    for update in get_proposal_graph(mode).stream(state, config=get_graph_config(fresh), stream_mode="updates"):
+        for node, values in update.items():
+            values = values or {}
+            if node == 'create_sections':
+                yield {'event': 'outline', 'sections': [s for s in values.get('sections', []) if s.strip()]}
+            for result in values.get('section_results', []):
+                yield section_event(result['index'], result['title'], result['text'])
+            if values.get('final_result'):
+                final_result = values['final_result']
+
+    if final_result is None:
+        raise ValueError("Proposal graph finished without a result")
+    if not written:
+        for index, entry in enumerate(parse_llm_json(final_result)):
+            yield section_event(index, entry['title'], entry['text'])
+
+    cover_title, body = _split_title([written[i] for i in sorted(written)])
+    file_path = _proposal_file_path(client)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for section in body:
+            f.write(f"Title: {section['title']}\n")
+            f.write(f"Text: {section['content']}\n\n")
+
+    result = generate_modern_presentation(filename=file_path, logo_url=client_logo, logo_url_2=seller_logo,
+                                          cover_title=cover_title)
+    if not result:
+        raise ValueError("Could not assemble the proposal document")
+    html_content, html_file_name = result
+    yield {'event': 'done', 'html': html_content, 'file_path': html_file_name}
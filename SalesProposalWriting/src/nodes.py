@@ -1,7 +1,6 @@
 
-from .utils import clean_to_list
+from .utils import parse_llm_json
 from .states import State 
-import ast 
 from dotenv import load_dotenv
 import os 
 load_dotenv()
@@ -12,8 +11,7 @@ output_path = os.getenv("OUTPUT_FILE_PATH")
 
 
 def clean_data(state:State):
-    result = clean_to_list(state.final_result)
-    result = ast.literal_eval(result)
+    result = parse_llm_json(state.final_result)
     # for the output file use client_seller_datetime.txt
     
     with open('output.txt', 'w', encoding='utf-8') as f:
@@ -122,4 +122,59 @@ The first element **must always be**:
 
 Do not include any introduction text or headings outside the dictionary list.
 
-'''
\ No newline at end of file
+'''
+
+proposal_title_template = '''You are a senior enterprise consultant writing a B2B sales proposal.
+
+## 🧩 Client Organization
+```python
+{client_details}
+```
+
+## 🏢 Seller Organization
+```python
+{seller_details}
+```
+
+Write the title of the sales proposal: **short and one-line only**, like a document heading
+(e.g. "A Unified Data Platform for Tata Steel by DataNova").
+
+Return only the title, with no quotes, labels or explanation.
+'''
+
+
+section_writing_template = '''You are a senior enterprise consultant and proposal strategist writing one section of an executive-grade B2B sales proposal.
+
+## 🧩 Client Organization
+```python
+{client_details}
+```
+
+## 🏢 Seller Organization
+```python
+{seller_details}
+```
+
+## 📦 Project Specifications
+```python
+{project_specs}
+```
+
+## 📄 Proposal Outline
+The full proposal has these sections, in this order; other sections are written separately:
+{section_list}
+
+## ✍️ Section to Write
+**{section_title}**
+
+Write only the content of this one section:
+- 2–4 paragraphs in an executive, persuasive business tone, related directly to the client's domain, goals and challenges
+- Bullet points (`- `) for scope, deliverables and timelines
+- Do not repeat the section title, and do not cover topics that belong to other sections of the outline
+
+If this section is the **Scope of Work** or project breakdown, make it very detailed and structured:
+phase-wise subheadings such as **Discovery & Planning (Week 1–2)**, each with at least 4–5 bullet points,
+focused on how each task contributes to the client's goals.
+
+Return only the section text, with no introduction, headings outside the section, or code fences.
+'''
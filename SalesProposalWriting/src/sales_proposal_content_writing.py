@@ -1,6 +1,7 @@
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from .llms import llm
+from langchain_core.runnables import RunnableConfig
+from .llms import llm, chain_config
 from .states import State
 from .prompts import *
 
@@ -12,7 +13,7 @@ p_prompt = ChatPromptTemplate.from_template(proposal_template)
 p_chain = p_prompt | llm | StrOutputParser()
 
 # Function to generate the full proposal
-def write_sales_proposal(state:State):
+def write_sales_proposal(state:State, config: RunnableConfig):
     section_string = "\n".join([f"- {s}" for s in state.sections])
 
     result = p_chain.invoke({
@@ -21,6 +22,6 @@ def write_sales_proposal(state:State):
         'project_specs':state.project_specs,
         'section_list':section_string
 
-    })
+    }, config=chain_config(config, 'proposal_writing'))
 
     return {'final_result': result}
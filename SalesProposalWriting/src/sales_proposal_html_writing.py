@@ -610,6 +610,143 @@ class ModernPresentationConfig:
         }}
         """
 
+def process_content(content: str) -> str:
+    """Enhanced content processing with better formatting"""
+    # Clean up any remaining "Title:" or "Text:" artifacts
+    content = re.sub(r'^(Title|Text):\s*', '', content, flags=re.MULTILINE)
+
+    # Enhanced markdown processing
+    content = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', content)
+    content = re.sub(r'\*(.*?)\*', r'<em>\1</em>', content)
+    content = re.sub(r'`(.*?)`', r'<code>\1</code>', content)
+
+    lines = content.split('\n')
+    processed_lines = []
+    in_list = False
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if in_list:
+                processed_lines.append('</ul>')
+                in_list = False
+            processed_lines.append('')
+            continue
+
+        if line.startswith('• ') or line.startswith('* ') or line.startswith('- '):
+            if not in_list:
+                processed_lines.append('<ul>')
+                in_list = True
+            bullet_text = line[2:].strip()
+            processed_lines.append(f'<li>{bullet_text}</li>')
+        else:
+            if in_list:
+                processed_lines.append('</ul>')
+                in_list = False
+            if line:
+                processed_lines.append(f'<p>{line}</p>')
+
+    if in_list:
+        processed_lines.append('</ul>')
+
+    return '\n'.join(processed_lines)
+
+
+def render_section_html(section: Dict[str, str]) -> str:
+    """HTML block for one {'title', 'content'} section, styled by what the section is about"""
+    processed_content = process_content(section['content'])
+    
+    # Enhanced pricing section detection and styling
+    if any(keyword in section['title'].lower() for keyword in ['pricing', 'cost', 'investment', 'budget']) or '$' in section['content']:
+        price_match = re.search(r'\$[\d,]+(?:\.\d{2})?', section['content'])
+        if price_match:
+            price = price_match.group()
+            content_without_price = section['content'].replace(price, '').strip()
+            return f'''
+            <div class="pricing-highlight">
+                <div class="price-amount">{price}</div>
+                <div class="section-content">
+                    {process_content(content_without_price)}
+                </div>
+            </div>
+'''
+    
+    # Enhanced section categorization and styling
+    title_lower = section['title'].lower()
+    
+    if any(keyword in title_lower for keyword in ['who we are', 'what we do', 'team', 'expertise', 'about us', 'company', 'our services', 'capabilities', 'enterprise', 'organization', 'business', 'firm', 'corporate', 'details', 'profile', 'overview']):
+        return f'''
+            <div class="company-info">
+                <h3 class="company-title">{section['title']}</h3>
+                <div class="company-content">
+                    {processed_content}
+                </div>
+            </div>
+'''
+    elif any(keyword in title_lower for keyword in ['conclusion', 'call to action', 'contact', 'next steps', 'get started', 'ready to begin']):
+        return f'''
+            <div class="cta-section">
+                <h3 class="cta-title">{section['title']}</h3>
+                <div class="cta-content">
+                    {processed_content}
+                </div>
+            </div>
+'''
+    elif any(keyword in title_lower for keyword in ['scope', 'project breakdown', 'timeline', 'milestone', 'phases', 'roadmap', 'schedule']):
+        return f'''
+            <div class="phase-section">
+                <h3 class="phase-title">{section['title']}</h3>
+                <div class="section-content">
+                {processed_content}
+                </div>
+            </div>
+'''
+    else:
+        # Standard section styling
+        return f'''
+            <div class="section">
+                <h3 class="section-title">{section['title']}</h3>
+                <div class="section-content">
+                    {processed_content}
+                </div>
+            </div>
+'''
+
+
+def generate_preview_html(
+    main_title: str,
+    sections: List[Dict[str, str]],
+    logo_url: str,
+    logo_url_2: str = None,
+    theme: str = "corporate",
+    custom_colors: Dict[str, str] = None
+) -> str:
+    """Standalone page with the cover and the sections written so far, for the progressive preview"""
+    css = ModernPresentationConfig(theme, custom_colors).get_modern_css(logo_url, logo_url_2)
+    blocks = "".join(render_section_html(section) for section in sections)
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <style>{css}</style>
+</head>
+<body>
+    <div class="cover-page">
+        <div class="cover-logos">
+            <div class="cover-logo cover-logo-1"></div>
+            <div class="cover-logo cover-logo-2"></div>
+        </div>
+        <h1 class="cover-title">{main_title or ""}</h1>
+    </div>
+    <div class="content-page">
+        <div class="presentation-container">
+{blocks}
+        </div>
+    </div>
+</body>
+</html>'''
+
+
 def generate_modern_presentation(
     filename: str,
     logo_url: str,
@@ -713,47 +850,6 @@ def generate_modern_presentation(
         print(f"✅ Parsed {len(sections)} sections with main title: '{main_title}'")
         return main_title, sections
         
-    def process_content(content: str) -> str:
-        """Enhanced content processing with better formatting"""
-        # Clean up any remaining "Title:" or "Text:" artifacts
-        content = re.sub(r'^(Title|Text):\s*', '', content, flags=re.MULTILINE)
-        
-        # Enhanced markdown processing
-        content = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', content)
-        content = re.sub(r'\*(.*?)\*', r'<em>\1</em>', content)
-        content = re.sub(r'`(.*?)`', r'<code>\1</code>', content)
-        
-        lines = content.split('\n')
-        processed_lines = []
-        in_list = False
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                if in_list:
-                    processed_lines.append('</ul>')
-                    in_list = False
-                processed_lines.append('')
-                continue
-                
-            if line.startswith('• ') or line.startswith('* ') or line.startswith('- '):
-                if not in_list:
-                    processed_lines.append('<ul>')
-                    in_list = True
-                bullet_text = line[2:].strip()
-                processed_lines.append(f'<li>{bullet_text}</li>')
-            else:
-                if in_list:
-                    processed_lines.append('</ul>')
-                    in_list = False
-                if line:
-                    processed_lines.append(f'<p>{line}</p>')
-        
-        if in_list:
-            processed_lines.append('</ul>')
-        
-        return '\n'.join(processed_lines)
-    
     def generate_html(main_title: str, sections: List[Dict[str, str]]) -> str:
         # Use provided cover_title or the extracted main_title
         title_for_cover = cover_title or main_title
@@ -786,64 +882,7 @@ def generate_modern_presentation(
         
         # Process all sections normally
         for section in sections:
-            processed_content = process_content(section['content'])
-            
-            # Enhanced pricing section detection and styling
-            if any(keyword in section['title'].lower() for keyword in ['pricing', 'cost', 'investment', 'budget']) or '$' in section['content']:
-                price_match = re.search(r'\$[\d,]+(?:\.\d{2})?', section['content'])
-                if price_match:
-                    price = price_match.group()
-                    content_without_price = section['content'].replace(price, '').strip()
-                    html_template += f'''
-            <div class="pricing-highlight">
-                <div class="price-amount">{price}</div>
-                <div class="section-content">
-                    {process_content(content_without_price)}
-                </div>
-            </div>
-'''
-                    continue
-            
-            # Enhanced section categorization and styling
-            title_lower = section['title'].lower()
-            
-            if any(keyword in title_lower for keyword in ['who we are', 'what we do', 'team', 'expertise', 'about us', 'company', 'our services', 'capabilities', 'enterprise', 'organization', 'business', 'firm', 'corporate', 'details', 'profile', 'overview']):
-                html_template += f'''
-            <div class="company-info">
-                <h3 class="company-title">{section['title']}</h3>
-                <div class="company-content">
-                    {processed_content}
-                </div>
-            </div>
-'''
-            elif any(keyword in title_lower for keyword in ['conclusion', 'call to action', 'contact', 'next steps', 'get started', 'ready to begin']):
-                html_template += f'''
-            <div class="cta-section">
-                <h3 class="cta-title">{section['title']}</h3>
-                <div class="cta-content">
-                    {processed_content}
-                </div>
-            </div>
-'''
-            elif any(keyword in title_lower for keyword in ['scope', 'project breakdown', 'timeline', 'milestone', 'phases', 'roadmap', 'schedule']):
-                html_template += f'''
-            <div class="phase-section">
-                <h3 class="phase-title">{section['title']}</h3>
-                <div class="section-content">
-                {processed_content}
-                </div>
-            </div>
-'''
-            else:
-                # Standard section styling
-                html_template += f'''
-            <div class="section">
-                <h3 class="section-title">{section['title']}</h3>
-                <div class="section-content">
-                    {processed_content}
-                </div>
-            </div>
-'''
+            html_template += render_section_html(section)
         
         # Close the HTML template
         html_template += '''
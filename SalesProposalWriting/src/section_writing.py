@@ -0,0 +1,65 @@
+import json
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from langgraph.types import Send
+from langchain_core.runnables import RunnableConfig
+from .llms import llm, chain_config
+from .states import State, SectionTask
+from .utils import strip_code_fences
+from .prompts import *
+
+
+TITLE_SECTION = "title of the sales proposal"
+
+title_chain = ChatPromptTemplate.from_template(proposal_title_template) | llm | StrOutputParser()
+section_chain = ChatPromptTemplate.from_template(section_writing_template) | llm | StrOutputParser()
+
+
+def fan_out_sections(state: State):
+    """One write_section task per section of the outline; they run concurrently"""
+    titles = [title.strip().lstrip('-•* ').strip() for title in state.sections]
+    titles = [title for title in titles if title]
+    return [
+        Send('write_section', SectionTask(
+            index=index,
+            title=title,
+            sections=titles,
+            client=state.client,
+            seller=state.seller,
+            project_specs=state.project_specs
+        ))
+        for index, title in enumerate(titles)
+    ]
+
+
+def write_section(task: SectionTask, config: RunnableConfig):
+    """Write one section; a failure is retried for this section only (see the node's RetryPolicy)"""
+    if task.index == 0 or task.title.lower() == TITLE_SECTION:
+        text = title_chain.invoke({
+            'client_details': task.client,
+            'seller_details': task.seller
+        }, config=chain_config(config, 'proposal_title'))
+        # The HTML writer takes the first section as the cover title
+        title = TITLE_SECTION
+        text = strip_code_fences(text).strip().strip('"').splitlines()[0]
+    else:
+        text = section_chain.invoke({
+            'client_details': task.client,
+            'seller_details': task.seller,
+            'project_specs': task.project_specs,
+            'section_list': "\n".join(f"- {s}" for s in task.sections),
+            'section_title': task.title
+        }, config=chain_config(config, 'proposal_section'))
+        title = task.title
+        text = strip_code_fences(text)
+
+    if not text.strip():
+        raise ValueError(f"Empty text for section '{task.title}'")
+    return {'section_results': [{'index': task.index, 'title': title, 'text': text}]}
+
+
+def assemble_proposal(state: State):
+    """Fan-in: order the written sections and store them in the format clean_data expects"""
+    ordered = sorted(state.section_results, key=lambda section: section['index'])
+    result = [{'title': section['title'], 'text': section['text']} for section in ordered]
+    return {'final_result': json.dumps(result, ensure_ascii=False)}
@@ -1,6 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from .llms import llm
+from langchain_core.runnables import RunnableConfig
+from .llms import llm, chain_config
 from .states import State
 from .utils import clean_to_list
 from .prompts import *
@@ -13,7 +14,7 @@ chain = prompt | llm | StrOutputParser()
 
 
 
-def create_sections(state:State):
-    result = chain.invoke({'services':state.seller})
+def create_sections(state:State, config: RunnableConfig):
+    result = chain.invoke({'services':state.seller}, config=chain_config(config, 'proposal_sections'))
     p = clean_to_list(result)
     return {'sections':["Title of the sales proposal"]+p.split('\n')}
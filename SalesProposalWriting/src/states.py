@@ -9,4 +9,16 @@ class State(BaseModel):
     project_specs : Any
     sections : List[str] 
     final_result : str 
+    # Written sections ({'index', 'title', 'text'}), appended by the parallel write_section nodes
+    section_results : Annotated[List[Dict[str, Any]], operator.add] = []
+
+
+class SectionTask(BaseModel):
+    """Input of one write_section node in the parallel graph"""
+    index : int
+    title : str
+    sections : List[str]
+    client : Any
+    seller : Any
+    project_specs : Any
     
\ No newline at end of file
@@ -16,17 +16,9 @@ def get_color_from_image(image_url):
 
 
 
-def clean_to_list(result:str) :
-    result = result.strip()
-    if result.startswith('```python'):
-        result = result[len('```python'):].strip()
-    elif result.startswith('```json'):
-        result = result[len('```json'):].strip()
-    elif result.startswith('```'):
-        result = result[len('```'):].strip()
-    if result.endswith('```'):
-        result = result[:-3].strip()
-    return result
+from Common_Utils.json_stream import strip_code_fences, parse_llm_json
+
+clean_to_list = strip_code_fences
 
 import streamlit as st
 from datetime import datetime
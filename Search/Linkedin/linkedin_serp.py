@@ -4,11 +4,14 @@ from dotenv import load_dotenv
 load_dotenv()
 import os
 import streamlit as st
+from Common_Utils.single_flight import single_flight
+from Common_Utils.fake_providers import SEARCH_PROVIDER, fake_search_linkedin
 
 def infer_priorities(title):
     # Placeholder function: replace with your actual priority inference logic
     return [" Scalability & Risk Mitigation","Operational Efficiency","Scalability & Risk Mitigation"]
 
+@single_flight()
 def search_linkedin_serpapi(name):
     params = {
         "q": f'site:linkedin.com/in "{name}"',
@@ -18,6 +21,8 @@ def search_linkedin_serpapi(name):
     }
     
     try:
+        if SEARCH_PROVIDER == "fake":
+            return fake_search_linkedin(name)
         response = requests.get("https://serpapi.com/search", params=params).json()
         results = {}
         
@@ -8,6 +8,9 @@ from google.genai import types
 import ast 
 import re
 from Search.WebsiteUrl_Agent.agent import *
+from Common_Utils.json_stream import parse_llm_json
+from Common_Utils.single_flight import single_flight
+from Common_Utils.fake_providers import SEARCH_PROVIDER, fake_get_urls
 
 
 # Setup session and runner
@@ -27,20 +30,21 @@ runner = Runner(
     agent=search_agent
 )
 def extract_list_from_string(s):
-    # Remove any prefix like 'json' and extract the JSON array part
-    match = re.search(r"\[.*\]", s, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group())
-        except json.JSONDecodeError:
-            print("Failed to parse list.")
-    else:
-        print("No list found.")
+    try:
+        result = parse_llm_json(s)
+        return result if isinstance(result, list) else None
+    except (ValueError, SyntaxError):
+        print("Failed to parse list.")
     return None
 
 
 import json
+
+# Reps opening the same client at once share one agent run
+@single_flight(key=lambda company_name, *args, **kwargs: company_name)
 async def get_urls(company_name: str, runner=runner, user_id=USER_ID, session_id=SESSION_ID):
+    if SEARCH_PROVIDER == "fake":
+        return await fake_get_urls(company_name)
     content = types.Content(role='user', parts=[types.Part(text=company_name)])
     final_msg = ""
     
@@ -50,17 +54,6 @@ async def get_urls(company_name: str, runner=runner, user_id=USER_ID, session_id
                 final_msg = event.content.parts[0].text
             elif event.actions and event.actions.escalate:
                 final_msg = event.error_message
-    result = final_msg
-    result = result.strip()
-    if result.startswith('```python'):
-        result = result[len('```python'):].strip()
-    elif result.startswith('```json'):
-        result = result[len('```json'):].strip()
-    elif result.startswith('```'):
-        result = result[len('```'):].strip()
-    if result.endswith('```'):
-        result = result[:-3].strip()
-    final_msg = result
     print(final_msg)
-    return json.loads(final_msg)
+    return parse_llm_json(final_msg)
 
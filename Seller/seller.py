@@ -10,6 +10,7 @@ from Common_Utils.ai_suggestion_utils import *
 from WebScraper.webscraper_without_ai import get_url_details_without_ai
 from Common_Utils.common_utils import *
 from Common_Utils.common_utils import set_global_message
+from Common_Utils.background_jobs import get_job_queue, JOB_DONE, JOB_FAILED, JOB_CANCELLED
 # Configure logger
 logger = logging.getLogger(__name__)
 
@@ -43,6 +44,7 @@ class SellerTabState:
     seller_scraping_in_progress: bool = False
     seller_pending_scrape_url: Optional[str] = None
     processing_all_seller_documents: bool = False
+    seller_document_jobs: Dict[str, str] = field(default_factory=dict)
     
     # LinkedIn related
     seller_linkedin_profiles: Dict[str, Any] = field(default_factory=dict)
@@ -343,6 +345,7 @@ def _render_seller_name_input(seller_state: SellerTabState, is_locked: bool):
 
 def _handle_find_urls_button(seller_state: SellerTabState, seller_enterprise_name: str, is_locked: bool):
     """Handle find URLs button functionality."""
+    rerun = False
     try:
         # Find URLs button - disabled when locked OR when conditions not met
         find_urls_disabled = is_locked or not (seller_enterprise_name and len(seller_enterprise_name.strip()) > 2)
@@ -358,12 +361,15 @@ def _handle_find_urls_button(seller_state: SellerTabState, seller_enterprise_nam
                 # Set search in progress flag
                 seller_state.update_field('url_search_in_progress', True)
                 seller_state.update_field('url_search_company', seller_enterprise_name.strip())
-                st.rerun()
+                rerun = True
                     
     except Exception as e:
         logger.error(f"Error in find URLs button handler: {str(e)}", exc_info=True)
         set_global_message("An error occurred with the URL search functionality. Please try again.", "error")
 
+    if rerun:
+        st.rerun()
+
 
 def _handle_company_name_changes(seller_state: SellerTabState, seller_enterprise_name: str):
     """Handle changes in company name and clear URLs if needed."""
@@ -379,6 +385,7 @@ def _handle_company_name_changes(seller_state: SellerTabState, seller_enterprise
 
 def _display_url_search_status(seller_state: SellerTabState, seller_enterprise_name: str):
     """Display URL search status in a common area under name input and button."""
+    rerun = False
     try:
         # Check if URL search is in progress
         if seller_state.url_search_in_progress:
@@ -403,7 +410,7 @@ def _display_url_search_status(seller_state: SellerTabState, seller_enterprise_n
                     else:
                         st.warning(f"⚠️ No websites found for {search_company}")
                     
-                    st.rerun()
+                    rerun = True
                     
                 except Exception as e:
                     logger.error(f"Error finding URLs for {search_company}: {str(e)}", exc_info=True)
@@ -422,6 +429,9 @@ def _display_url_search_status(seller_state: SellerTabState, seller_enterprise_n
         logger.error(f"Error displaying URL search status: {str(e)}", exc_info=True)
         set_global_message("An error occurred while displaying URL search status. Please try again.", "error")
 
+    if rerun:
+        st.rerun()
+
 
 def _render_url_dropdown(seller_state: SellerTabState, is_locked: bool):
     """Render URL dropdown selection."""
@@ -479,6 +489,7 @@ def _render_visit_website_button(seller_website_url: str):
 
 def _handle_refresh_urls(seller_state: SellerTabState):
     """Handle URL refresh functionality."""
+    rerun = False
     try:
         seller_name_provided = bool(seller_state.seller_enterprise_name and seller_state.seller_enterprise_name.strip())
         
@@ -490,7 +501,7 @@ def _handle_refresh_urls(seller_state: SellerTabState):
                     urls_list = get_urls_list(seller_state.seller_enterprise_name)
                     seller_state.update_field('seller_website_urls_list', urls_list)
                     st.success("Website URLs refreshed!")
-                    st.rerun()
+                    rerun = True
                     
                     logger.info(f"Successfully refreshed {len(urls_list)} URLs")
                     
@@ -502,6 +513,9 @@ def _handle_refresh_urls(seller_state: SellerTabState):
         logger.error(f"Error in refresh URLs handler: {str(e)}", exc_info=True)
         set_global_message("Failed to refresh URLs. Please try again.", "error")
 
+    if rerun:
+        st.rerun()
+
 def _render_website_url_section(seller_state: SellerTabState, is_locked: bool):
     """Render website URL selection and action buttons."""
     try:
@@ -591,6 +605,7 @@ def _render_refresh_urls_button(seller_state: SellerTabState,is_locked: bool):
 
 def _render_scrape_website_button(seller_state: SellerTabState, seller_website_url: str, is_locked: bool):
     """Render scrape website button."""
+    rerun = False
     try:
         scrape_clicked = st.button("📑 Get Details", help="Get enterprise details", 
                                  key="scrape_seller_website_btn", use_container_width=True,
@@ -600,14 +615,18 @@ def _render_scrape_website_button(seller_state: SellerTabState, seller_website_u
             logger.info(f"Initiating website scraping for: {seller_website_url}")
             seller_state.update_field('seller_pending_scrape_url', seller_website_url)
             seller_state.update_field('seller_scraping_in_progress', True)
-            st.rerun()
+            rerun = True
             
     except Exception as e:
         logger.error(f"Error with scrape website button: {str(e)}", exc_info=True)
         set_global_message("An error occurred with the website scraping functionality. Please try again.", "error")
 
+    if rerun:
+        st.rerun()
+
 def _handle_pending_scraping(seller_state: SellerTabState):
     """Handle pending website scraping operation."""
+    rerun = False
     try:
         if seller_state.seller_scraping_in_progress and seller_state.seller_pending_scrape_url:
             scrape_url = seller_state.seller_pending_scrape_url
@@ -647,7 +666,7 @@ def _handle_pending_scraping(seller_state: SellerTabState):
                     # Show success message with logo info
                     
                     logger.info(f"Successfully scraped website: {scrape_url}")
-                    st.rerun()
+                    rerun = True
                     
                 except Exception as e:
                     logger.error(f"Error scraping website {scrape_url}: {str(e)}", exc_info=True)
@@ -660,8 +679,12 @@ def _handle_pending_scraping(seller_state: SellerTabState):
         logger.error(f"Error handling pending scraping: {str(e)}", exc_info=True)
         set_global_message("Failed to handle website scraping. Please try again.", "error")
 
+    if rerun:
+        st.rerun()
+
 def _render_document_upload_section(seller_state: SellerTabState, is_locked: bool):
     """Render document upload section with comprehensive error handling."""
+    rerun = False
     try:
         logger.debug("Rendering document upload section")
         
@@ -724,7 +747,7 @@ def _render_document_upload_section(seller_state: SellerTabState, is_locked: boo
                     seller_state.update_field('seller_enterprise_details_content', '')
                     seller_state.update_field('last_analyzed_seller_url', None)
                     seller_state.update_field('enterprise_logo', '')
-                    st.rerun()
+                    rerun = True
                 
         logger.debug("Document upload section rendered successfully")
         
@@ -732,6 +755,9 @@ def _render_document_upload_section(seller_state: SellerTabState, is_locked: boo
         logger.error(f"Error rendering document upload section: {str(e)}", exc_info=True)
         set_global_message("Unable to load document upload section. Please refresh the page and try again.", "error")
 
+    if rerun:
+        st.rerun()
+
 def _add_document_upload_css():
     """Add CSS for document upload section."""
     try:
@@ -833,6 +859,7 @@ def _display_uploaded_files(seller_state: SellerTabState, seller_documents_uploa
 
 def _render_process_all_button(seller_state: SellerTabState, seller_documents_upload, is_locked: bool):
     """Render button to process all documents."""
+    rerun = False
     try:
         all_processed = all(
             f"{file.name}_{file.size}" in seller_state.seller_services_by_file
@@ -884,59 +911,127 @@ def _render_process_all_button(seller_state: SellerTabState, seller_documents_up
                 else:
                     seller_state.update_field('processing_all_seller_documents', True)
                     logger.info("Started processing all seller documents")
-                    st.rerun()
+                    rerun = True
 
     except Exception as e:
         logger.error(f"Error rendering process all button: {str(e)}", exc_info=True)
 
+    if rerun:
+        st.rerun()
+
 def _process_all_documents(seller_state: SellerTabState, seller_documents_upload):
-    """Process all uploaded documents."""
+    """Queue every unprocessed document on the shared ingestion pool and poll their progress."""
+    rerun = False
     try:
         logger.info(f"Processing {len(seller_documents_upload)} documents")
         st.markdown("**🔍 Processing all documents and extracting services...**")
 
-        processed_count = 0
-        total_files = len(seller_documents_upload)
-
-        for idx, uploaded_file in enumerate(seller_documents_upload):
+        queue = get_job_queue()
+        for uploaded_file in seller_documents_upload:
             file_key = f"{uploaded_file.name}_{uploaded_file.size}"
-            progress_text = f"Processing {uploaded_file.name} ({idx + 1}/{total_files})..."
+            if seller_state.is_file_processed(file_key) or file_key in seller_state.seller_document_jobs:
+                continue
 
-            with st.spinner(progress_text):
-                try:
-                    file_path = save_uploaded_file_and_get_path(uploaded_file)
-                    seller_state.seller_uploaded_files_paths[file_key] = file_path
-
-                    if file_path and seller_state.seller_enterprise_name:
-                        services = get_seller_services(file_path, seller_state.seller_enterprise_name)
-                        seller_state.add_processed_file(file_key, uploaded_file.name, services, file_path)
-                        st.success(f"✅ {uploaded_file.name} processed successfully!")
-                        logger.info(f"Successfully processed: {uploaded_file.name}")
-                        processed_count += 1
-                    else:
-                        set_global_message(f"Unable to save or process {uploaded_file.name}. Please try again.", "error")
-                        logger.error(f"File path invalid for {uploaded_file.name}")
-                except Exception as e:
-                    set_global_message(f"Failed to process {uploaded_file.name}. Please check the file format and try again.", "error")
-                    logger.error(f"Error processing file {uploaded_file.name}: {str(e)}", exc_info=True)
+            try:
+                file_path, file_hash, file_size = save_seller_file_with_hash(
+                    uploaded_file, seller_state.seller_enterprise_name or "unknown_seller"
+                )
+                logger.info(f"Saved {uploaded_file.name} to {file_path} ({file_size} bytes, sha256 {file_hash[:12]})")
+                seller_state.seller_uploaded_files_paths[file_key] = file_path
+
+                if file_path and seller_state.seller_enterprise_name:
+                    job = queue.submit(
+                        run_seller_services_job,
+                        uploaded_file.name,
+                        file_path,
+                        seller_state.seller_enterprise_name,
+                        file_hash,
+                        name=uploaded_file.name,
+                        key=f"seller:{seller_state.seller_enterprise_name}:{file_key}"
+                    )
+                    seller_state.seller_document_jobs[file_key] = job.job_id
+                    logger.info(f"Queued seller job {job.job_id} for {uploaded_file.name}")
+                else:
+                    set_global_message(f"Unable to save or process {uploaded_file.name}. Please try again.", "error")
+                    logger.error(f"File path invalid for {uploaded_file.name}")
+            except Exception as e:
+                set_global_message(f"Failed to process {uploaded_file.name}. Please check the file format and try again.", "error")
+                logger.error(f"Error processing file {uploaded_file.name}: {str(e)}", exc_info=True)
+
+        seller_state.to_session_state()
+
+        if not seller_state.seller_document_jobs:
+            seller_state.update_field('processing_all_seller_documents', False)
+            rerun = True
 
+    except Exception as e:
         seller_state.update_field('processing_all_seller_documents', False)
+        logger.error(f"Error processing documents: {str(e)}", exc_info=True)
+        set_global_message("Document processing failed. Please try again or contact support.", "error")
+
+    # Outside the try: st.rerun() raises Streamlit's rerun exception, and the job fragment may call it
+    if rerun:
+        st.rerun()
+    if seller_state.seller_document_jobs:
+        _render_seller_document_jobs()
+
+@st.fragment(run_every=1)
+def _render_seller_document_jobs():
+    """Show per-document progress and record results once every queued job has finished."""
+    rerun = False
+    try:
+        seller_state = SellerTabState.from_session_state()
+        queue = get_job_queue()
+        jobs = {file_key: queue.get(job_id) for file_key, job_id in seller_state.seller_document_jobs.items()}
+
+        if not all(job is None or job.is_finished for job in jobs.values()):
+            for file_key, job in jobs.items():
+                if job is None:
+                    continue
+                if job.is_finished:
+                    st.markdown(f"<span style='font-size:0.8em'>✅ {job.name[:30]}</span>", unsafe_allow_html=True)
+                else:
+                    stage_text = f"page {job.done} of {job.total}" if job.total > 1 else job.state
+                    st.progress(job.progress, text=f"{job.name[:30]} ({stage_text})")
+            if st.button("Cancel", key="cancel_seller_jobs_btn", type="secondary", use_container_width=True):
+                for job in jobs.values():
+                    if job is not None:
+                        queue.cancel(job.job_id)
+                logger.info("Cancellation requested for seller document jobs")
+            return
+
+        processed_count = 0
+        for file_key, job in jobs.items():
+            file_path = seller_state.seller_uploaded_files_paths.get(file_key)
+            if job is not None and job.state == JOB_DONE:
+                seller_state.add_processed_file(file_key, job.name, job.result, file_path)
+                logger.info(f"Successfully processed: {job.name}")
+                processed_count += 1
+            elif job is not None and job.state == JOB_FAILED:
+                logger.error(f"Error processing file {job.name}: {job.error}")
+
+        total_files = len(jobs)
+        seller_state.seller_document_jobs = {}
+        seller_state.processing_all_seller_documents = False
+        seller_state.to_session_state()
 
         if processed_count == total_files:
-            #st.success(f"🎉 All {total_files} documents processed successfully!")
             pass
         elif processed_count > 0:
-            st.warning(f"⚠️ {processed_count} out of {total_files} documents processed.")
+            set_global_message(f"⚠️ {processed_count} out of {total_files} documents processed.", "warning")
+        elif any(job is not None and job.state == JOB_CANCELLED for job in jobs.values()):
+            set_global_message("Document processing cancelled.", "warning")
         else:
             set_global_message("No documents could be processed. Please check your files and try again.", "error")
 
         logger.info(f"Document processing completed: {processed_count}/{total_files}")
-        st.rerun()
+        rerun = True
 
     except Exception as e:
-        seller_state.update_field('processing_all_seller_documents', False)
-        logger.error(f"Error processing documents: {str(e)}", exc_info=True)
-        set_global_message("Document processing failed. Please try again or contact support.", "error")
+        logger.error(f"Error polling seller document jobs: {str(e)}", exc_info=True)
+
+    if rerun:
+        st.rerun()
 
 def _render_enterprise_details_section(seller_state: SellerTabState, is_locked: bool):
     """Render the enterprise details section."""
@@ -6,6 +6,8 @@ import os
 from Search.WebsiteUrl_Agent.agent_runner import get_urls
 import asyncio 
 from Common_Utils.pain_points_extractor import *
+from Common_Utils.upload_persistence import persist_uploaded_file
+from Document_Upload_Vectordb.doc_vectorizer import vectorize, parse_document
 from WebScraper.webscraper_without_ai import get_url_details_without_ai
 from Common_Utils.common_utils import *
 
@@ -48,5 +50,22 @@ def save_uploaded_file_and_get_path(file):
     return "saved"
 
 
+def save_seller_file_with_hash(uploaded_file, seller_enterprise_name):
+    """Stream a seller upload to FILE_SAVE_PATH/<seller>; returns (file_path, sha256, size) like the client upload"""
+    upload_dir = os.path.join(os.getenv("FILE_SAVE_PATH") or "uploads", seller_enterprise_name)
+    return persist_uploaded_file(uploaded_file, upload_dir)
+
+
 def get_seller_services(filename , filepath):
-    return "pain points"
\ No newline at end of file
+    return "pain points"
+
+
+def run_seller_services_job(job, filename, file_path, company_name=None, file_hash=None):
+    """Background job body for a seller document; see Common_Utils.background_jobs.
+
+    The document is ingested into the seller's collection first, reusing the
+    hash computed while it was saved.
+    """
+    if company_name:
+        vectorize(parse_document(file_path, file_hash), company_name, job.report_progress)
+    return get_seller_services(filename, file_path)
@@ -3,7 +3,7 @@ from streamlit_extras.stylable_container import stylable_container
 import time
 from Client.client import client_tab,validate_client_mandatory_fields
 from Seller.seller import seller_tab
-from ProjectSpecification.project_spec import proj_specification_tab
+from ProjectSpecification.project_spec import proj_specification_tab, prefetch_recommendations
 from Generate_proposal.proposal_generator import generate_tab
 from Client.client_dataclass import ClientTabState
 from Seller.seller import SellerTabState
@@ -892,6 +892,19 @@ else:  # Generate Proposal Tab
             st.session_state.project_specs_from_tab
         )
 
+# Warm up the Project Specification tab in the background once client and seller data validate.
+# Prefetching waits until the inputs stop changing for a moment, or runs at once when the user switches
+# tabs or clicks Next on the seller tab (the Lock & Continue confirmation is shown before the spec tab opens).
+tab_changed = st.session_state.get('prefetch_last_tab') != st.session_state.active_tab
+st.session_state.prefetch_last_tab = st.session_state.active_tab
+leaving_seller_tab = st.session_state.active_tab == 1 and st.session_state.get('show_confirmation_1', False)
+if (st.session_state.active_tab in (0, 1)
+        and st.session_state.client_data_from_tab is not None
+        and validate_client_mandatory_fields()
+        and validate_seller_mandatory_fields()):
+    prefetch_recommendations(st.session_state.client_data_from_tab, st.session_state.seller_data_from_tab,
+                             force=tab_changed or leaving_seller_tab)
+
 # Bottom navigation buttons with enhanced styling
 col1, col2, col3 = st.columns(3, gap="large")
 
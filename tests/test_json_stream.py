@@ -0,0 +1,36 @@
+import pytest
+
+from Common_Utils.json_stream import iter_json_items, parse_llm_json
+
+
+def test_bracketed_prose_before_the_object():
+    assert parse_llm_json('Note [1]: {"Scope": "Build it", "Team": ["PM", "Dev"]}') == \
+        {"Scope": "Build it", "Team": ["PM", "Dev"]}
+
+
+def test_bracketed_prose_after_the_list():
+    assert parse_llm_json('["Growth", "Cost"]\n\nSee [2] for details.') == ["Growth", "Cost"]
+
+
+def test_bracketed_prose_before_a_python_literal():
+    assert parse_llm_json("As requested [v2]:\n{'Scope': 'Build it', 'Done': True}") == \
+        {'Scope': 'Build it', 'Done': True}
+
+
+def test_fenced_response():
+    assert parse_llm_json('```json\n{"a": 1}\n```') == {"a": 1}
+
+
+def test_nothing_parses():
+    with pytest.raises(ValueError):
+        parse_llm_json('{"a": 1, "b": ')
+
+
+def test_items_stream_as_they_close():
+    chunks = iter(['Sure! {"Plan', 'ning": "Define goals", ', '"Design": "Draw it"}', ' Hope this helps', ' [1]'])
+    items = iter_json_items(chunks)
+    assert next(items) == ("Planning", "Define goals")
+    assert next(items) == ("Design", "Draw it")
+    assert list(items) == []
+    # The source is drained, so a stream that stores its result on completion gets to do so
+    assert list(chunks) == []
@@ -0,0 +1,57 @@
+from langchain_core.messages import AIMessage
+
+from Common_Utils import llm_gateway
+from Recommendation.prompts import scope_prompt
+from Recommendation.recommendation_utils import get_ai_proj_sepc_recommendations, get_ai_business_priorities
+
+
+class DictCache:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+def use_counting_model(monkeypatch, content):
+    calls = []
+
+    def fake_invoke(self, input, config=None, **kwargs):
+        calls.append(input)
+        return AIMessage(content=content)
+
+    monkeypatch.setattr(llm_gateway, '_response_cache', DictCache())
+    monkeypatch.setattr(llm_gateway.GatewayModel, '_invoke', fake_invoke)
+    return calls
+
+
+def test_identical_spec_call_skips_the_model(monkeypatch):
+    calls = use_counting_model(monkeypatch, '{"Project Planning": "Plan it"}')
+    client, seller = {'enterprise_name': 'Acme Corp'}, {'seller_enterprise_name': 'DataNova'}
+
+    first = get_ai_proj_sepc_recommendations(scope_prompt, client, seller, 'scope')
+    second = get_ai_proj_sepc_recommendations(scope_prompt, client, seller, 'scope')
+    assert first == second == {"Project Planning": "Plan it"}
+    assert len(calls) == 1
+
+    get_ai_proj_sepc_recommendations(scope_prompt, {'enterprise_name': 'Globex'}, seller, 'scope')
+    assert len(calls) == 2
+
+
+def test_regenerate_bypasses_the_cache(monkeypatch):
+    calls = use_counting_model(monkeypatch, '{"Project Planning": "Plan it"}')
+    client, seller = {'enterprise_name': 'Acme Corp'}, {'seller_enterprise_name': 'DataNova'}
+
+    get_ai_proj_sepc_recommendations(scope_prompt, client, seller, 'scope')
+    get_ai_proj_sepc_recommendations(scope_prompt, client, seller, 'scope', fresh=True)
+    assert len(calls) == 2
+
+
+def test_identical_business_priorities_call_skips_the_model(monkeypatch):
+    calls = use_counting_model(monkeypatch, '[{"title": "Growth", "icon": "📈"}]')
+
+    assert get_ai_business_priorities("CFO") == get_ai_business_priorities("CFO")
+    assert len(calls) == 1
@@ -0,0 +1,35 @@
+from Document_Upload_Vectordb import page_summarizer
+from Document_Upload_Vectordb.page_summarizer import summarize_pages
+
+
+def test_summaries_keep_real_page_numbers():
+    # Page 2 rendered no image
+    pages = [(1, "one"), (2, None), (3, "three"), (4, "four")]
+    summaries = summarize_pages(pages, str.upper, max_workers=2)
+    assert summaries == {1: "ONE", 2: None, 3: "THREE", 4: "FOUR"}
+
+
+def test_transient_failure_is_retried(monkeypatch):
+    monkeypatch.setattr(page_summarizer, 'PAGE_SUMMARY_RETRY_BACKOFF', 0)
+    attempts = []
+
+    def flaky(page):
+        attempts.append(page)
+        if len(attempts) == 1:
+            raise RuntimeError("503 unavailable")
+        return page.upper()
+
+    assert summarize_pages([(5, "five")], flaky) == {5: "FIVE"}
+    assert len(attempts) == 2
+
+
+def test_page_fails_after_bounded_retries(monkeypatch):
+    monkeypatch.setattr(page_summarizer, 'PAGE_SUMMARY_RETRY_BACKOFF', 0)
+    attempts = []
+
+    def broken(page):
+        attempts.append(page)
+        raise RuntimeError("500 internal")
+
+    assert summarize_pages([(7, "seven")], broken) == {7: None}
+    assert len(attempts) == page_summarizer.PAGE_SUMMARY_RETRIES + 1
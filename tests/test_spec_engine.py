@@ -0,0 +1,120 @@
+from dataclasses import replace
+from types import SimpleNamespace
+
+from Client.client_dataclass import ClientTabState
+from Seller.seller import SellerTabState
+from ProjectSpecification import project_spec
+from ProjectSpecification.spec_engine import SPEC_PROMPTS, get_spec_inputs, get_spec_input_hash
+
+
+def make_client(**overrides):
+    client = ClientTabState(
+        enterprise_name="Acme Corp",
+        enterprise_details_content="Acme builds industrial pumps.",
+        client_requirements_content="Cut maintenance costs by 20%.",
+        selected_pain_points={"Downtime", "Spare parts"},
+        pain_point_content_map={"Downtime": "Unplanned outages every month"}
+    )
+    return replace(client, **overrides)
+
+
+def make_seller(**overrides):
+    seller = SellerTabState(
+        seller_enterprise_name="DataNova",
+        seller_enterprise_details_content="Analytics consultancy.",
+        services_content_map={"Predictive maintenance": "ML models on sensor data"},
+        capabilities_content_map={"IoT": "Edge data pipelines"}
+    )
+    return replace(seller, **overrides)
+
+
+def changed_sections(client, seller, edited_client=None, edited_seller=None):
+    return {
+        section for section in SPEC_PROMPTS
+        if get_spec_input_hash(section, client, seller) !=
+        get_spec_input_hash(section, edited_client or client, edited_seller or seller)
+    }
+
+
+class SessionState(dict):
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+def test_prompts_get_only_their_slice():
+    client_slice, seller_slice = get_spec_inputs('timeline', make_client(), make_seller())
+    assert client_slice['client_requirements_content'] == "Cut maintenance costs by 20%."
+    assert 'pain_point_content_map' not in client_slice
+    assert 'seller_enterprise_name' not in seller_slice
+
+    client_slice, _ = get_spec_inputs('scope', make_client(), make_seller())
+    assert client_slice['selected_pain_points'] == ["Downtime", "Spare parts"]
+
+
+def test_edit_changes_only_the_sections_that_read_the_field():
+    client, seller = make_client(), make_seller()
+    assert changed_sections(client, seller, make_client(selected_pain_points={"Downtime"})) == {'scope', 'effort'}
+    assert changed_sections(client, seller, make_client(spoc_name="Jane Doe")) == {'scope'}
+    assert changed_sections(client, seller, edited_seller=make_seller(seller_enterprise_name="DataNova Labs")) == \
+        {'scope', 'pricing'}
+    assert changed_sections(client, seller, make_client(client_requirements_content="Grow sales by 10%.")) == \
+        set(SPEC_PROMPTS)
+
+
+def test_ui_flags_do_not_change_the_hash():
+    client, seller = make_client(), make_seller()
+    assert not changed_sections(client, seller, make_client(show_validation=True, css_applied=True))
+
+
+def test_unaffected_sections_keep_their_results(monkeypatch):
+    submitted = []
+
+    def fake_submit(session_id, section, client_data, seller_data, input_hash=None, prefetch=False, fresh=False):
+        submitted.append(section)
+        return SimpleNamespace(job_id=f"{section}-{len(submitted)}")
+
+    monkeypatch.setattr(project_spec, 'st', SimpleNamespace(session_state=SessionState()))
+    monkeypatch.setattr(project_spec, 'submit_spec_section', fake_submit)
+    monkeypatch.setattr(project_spec, 'cancel_spec_job', lambda job_id: True)
+    project_spec.init_async_session_state()
+    session_state = project_spec.st.session_state
+
+    seller = make_seller()
+    project_spec.start_async_recommendations(make_client(), seller)
+    assert submitted == list(SPEC_PROMPTS)
+    results = {section: {section.title(): f"{section} suggestions"} for section in SPEC_PROMPTS}
+    session_state.ai_recommendation_data.update(results)
+    session_state.ai_recommendations_ready.update({section: True for section in SPEC_PROMPTS})
+    session_state.spec_jobs.clear()
+
+    submitted.clear()
+    project_spec.start_async_recommendations(make_client(selected_pain_points={"Downtime"}), seller)
+    assert sorted(submitted) == ['effort', 'scope']
+    for section in ('timeline', 'team', 'pricing'):
+        assert session_state.ai_recommendations_ready[section]
+        assert session_state.ai_recommendation_data[section] == results[section]
+        assert section not in session_state.spec_jobs
+
+
+def test_prefetch_waits_for_stable_inputs_unless_forced(monkeypatch):
+    submitted = []
+
+    def fake_submit(session_id, section, client_data, seller_data, input_hash=None, prefetch=False, fresh=False):
+        submitted.append((section, prefetch))
+        return SimpleNamespace(job_id=f"{section}-{len(submitted)}")
+
+    monkeypatch.setattr(project_spec, 'st', SimpleNamespace(session_state=SessionState()))
+    monkeypatch.setattr(project_spec, 'submit_spec_section', fake_submit)
+    monkeypatch.setattr(project_spec, 'cancel_spec_job', lambda job_id: True)
+    clock = [1000.0]
+    monkeypatch.setattr(project_spec.time, 'time', lambda: clock[0])
+
+    project_spec.prefetch_recommendations(make_client(), make_seller())
+    assert submitted == []
+    clock[0] += project_spec.SPEC_PREFETCH_STABLE_SECONDS
+    project_spec.prefetch_recommendations(make_client(), make_seller())
+    assert submitted == [(section, True) for section in SPEC_PROMPTS]
+
+    submitted.clear()
+    project_spec.prefetch_recommendations(make_client(spoc_name="Jane Doe"), make_seller(), force=True)
+    assert submitted == [('scope', True)]